@@ -1,9 +1,9 @@
-from pyexpat.errors import messages
+from django.contrib import messages
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from django.db.models import Count
-from .models import Worker, User, Job, Payment, Bid, Review
-from .utils import release_funds
+from .models import Worker, User, Job, Payment, Bid, Review, ArchivedJob
+from .utils import PaymentError, release_funds
+from . import dashboard, feed, rollups
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
@@ -43,16 +43,24 @@ class WorkerAdmin(admin.ModelAdmin):
 
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin):
-    list_display = ("title", "customer", "location", "budget", "status", "created_at",)
+    list_display = ("title", "customer", "location", "budget", "status", "bid_count", "created_at",)
     list_filter = ("status", "location",)
     search_fields = ("title", "customer__username", "location",)
+    # maintained by api.bidding; `manage.py repair_bid_counters` recomputes the counters
+    readonly_fields = ("best_bid", "bid_count", "lowest_bid",)
     date_hierarchy = "created_at"
     actions = ['print_popular_jobs']
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        feed.sync_job(obj)
+        dashboard.invalidate(obj.customer_id)
+
+    # reads the precomputed totals from `manage.py build_rollups`, not the selection
     def print_popular_jobs(self, request, queryset):
-        popular = queryset.values('title').annotate(count=Count('id')).order_by('-count')[:5]
-        for job in popular:
-            self.message_user(request, f"{job['title']}: {job['count']} postings")
+        for total in rollups.popular_titles(5):
+            self.message_user(request, f"{total.title}: {total.postings} postings")
+        self.message_user(request, f"Rolled up through {rollups.rolled_up_through() or 'never'}.")
     print_popular_jobs.short_description = "Show Top 5 Popular Job Titles"
 
 @admin.register(Bid)
@@ -60,13 +68,13 @@ class BidAdmin(admin.ModelAdmin):
     list_display = ("job", "worker", "bid_amount", "timestamp",)
     list_filter = ("timestamp",)
     search_fields = ("worker__user__username", "job__title",)
+    actions = ['most_hired_workers']
 
+    # hires are selected bids, counted by `manage.py build_rollups`
     def most_hired_workers(self, request, queryset):
-        top_workers = queryset.values('worker__user__username') \
-                               .annotate(count=Count('id')) \
-                               .order_by('-count')[:5]
-        for worker in top_workers:
-            self.message_user(request, f"{worker['worker__user__username']} - {worker['count']} jobs")
+        for total in rollups.most_hired_workers(5):
+            self.message_user(request, f"{total.worker.user.username} - {total.hires} jobs")
+        self.message_user(request, f"Rolled up through {rollups.rolled_up_through() or 'never'}.")
     most_hired_workers.short_description = "Show Top 5 Most Hired Workers"
 
 @admin.register(Review)
@@ -84,23 +92,20 @@ class PaymentAdmin(admin.ModelAdmin):
 
     def mark_as_completed(self, request, queryset):
         updated = 0
-        for payment in queryset:
-            if payment.status != 'completed':
-                payment.status = 'completed'
-                payment.save()
-                # Update job status
-                job = payment.job
-                job.status = 'completed'
-                job.save()
-                updated += 1
-        self.message_user(request, f'{updated} payment(s) marked as completed and jobs updated.')
-    mark_as_completed.short_description = "Mark selected payments as completed"
-
-    def release_payment(modeladmin, request, queryset):
-        for payment in queryset:
+        for payment in queryset.filter(status='pending'):
             try:
                 release_funds(payment)
-            except Exception as e:
-                modeladmin.message_user(request, f"Error: {e}", level=messages.ERROR)
+            except PaymentError as e:
+                self.message_user(request, f"Payment {payment.id}: {e}", level=messages.ERROR)
+            else:
+                updated += 1
+        self.message_user(request, f'{updated} payment(s) completed, jobs updated and wallets credited.')
+    mark_as_completed.short_description = "Mark selected payments as completed and release funds"
+
 
-    release_payment.short_description = "Release escrow to worker"
+@admin.register(ArchivedJob)
+class ArchivedJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'title', 'customer', 'assigned_worker', 'status', 'payment_amount', 'archived_at')
+    list_filter = ('status',)
+    search_fields = ('title', 'customer__username')
+    date_hierarchy = 'archived_at'
@@ -0,0 +1,126 @@
+import json
+from collections import defaultdict
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from . import dashboard
+from .models import ArchivedJob, Bid, Job, Payment, Review
+
+ARCHIVABLE_STATUSES = ("completed", "closed")
+
+
+def archivable_jobs(cutoff):
+    return Job.objects.filter(status__in=ARCHIVABLE_STATUSES, updated_at__lt=cutoff)
+
+
+def _plain(values):
+    # JSONField cannot store Decimal/datetime directly
+    return json.loads(json.dumps(values, cls=DjangoJSONEncoder))
+
+
+def archive_chunk(job_ids, cutoff):
+    """
+    Moves one chunk of jobs, with their bids, reviews and payment, into
+    ``ArchivedJob`` in a single transaction. Returns the number of jobs moved.
+    """
+    with transaction.atomic():
+        # re-check under lock: a job may have been reopened since it was selected
+        jobs = list(archivable_jobs(cutoff).select_for_update().filter(id__in=job_ids))
+        if not jobs:
+            return 0
+        ids = [job.id for job in jobs]
+
+        bids = defaultdict(list)
+        for bid in Bid.objects.filter(job_id__in=ids).values(
+            "id", "job_id", "worker_id", "bid_amount", "status", "timestamp", "selected_at",
+        ):
+            bids[bid.pop("job_id")].append(bid)
+
+        reviews = defaultdict(list)
+        for review in Review.objects.filter(job_id__in=ids).values(
+            "id", "job_id", "reviewer_id", "reviewee_id", "review_type", "rating", "comment", "created_at",
+        ):
+            reviews[review.pop("job_id")].append(review)
+
+        payments = {
+            payment.pop("job_id"): payment
+            for payment in Payment.objects.filter(job_id__in=ids).values(
+                "id", "job_id", "amount", "method", "status", "created_at", "completed_at",
+            )
+        }
+
+        archived = []
+        for job in jobs:
+            payment = payments.get(job.id)
+            archived.append(ArchivedJob(
+                id=job.id,
+                customer_id=job.customer_id,
+                assigned_worker_id=job.assigned_worker_id,
+                title=job.title,
+                location=job.location,
+                budget=job.budget,
+                status=job.status,
+                payment_amount=payment["amount"] if payment else None,
+                payment_status=payment["status"] if payment else "",
+                payment_completed_at=payment["completed_at"] if payment else None,
+                created_at=job.created_at,
+                updated_at=job.updated_at,
+                payload=_plain({
+                    "description": job.description,
+                    "urgency": job.urgency,
+                    "bids": bids.get(job.id, []),
+                    "reviews": reviews.get(job.id, []),
+                    "payment": payment,
+                }),
+            ))
+        ArchivedJob.objects.bulk_create(archived)
+
+        Review.objects.filter(job_id__in=ids).delete()
+        Bid.objects.filter(job_id__in=ids).delete()
+        Payment.objects.filter(job_id__in=ids).delete()
+        Job.objects.filter(id__in=ids).delete()
+        dashboard.invalidate(*{job.customer_id for job in jobs})
+    return len(ids)
+
+
+def archive_jobs(cutoff, chunk_size=500):
+    """Archives every eligible job in chunks, yielding the size of each chunk."""
+    last_id = 0
+    while True:
+        job_ids = list(
+            archivable_jobs(cutoff).filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:chunk_size]
+        )
+        if not job_ids:
+            return
+        last_id = job_ids[-1]
+        yield archive_chunk(job_ids, cutoff)
+
+
+def archived_reviews(jobs, review_type):
+    """Reviews of ``review_type`` kept in the payloads of ``jobs``, an ``ArchivedJob`` queryset."""
+    for reviews in jobs.values_list("payload__reviews", flat=True).iterator(chunk_size=2000):
+        for review in reviews or []:
+            if review["review_type"] == review_type:
+                yield review
+
+
+def archived_hires(jobs):
+    """``(worker_id, selected_at)`` of the selected bid of each of ``jobs``, an ``ArchivedJob`` queryset."""
+    rows = jobs.filter(assigned_worker__isnull=False).values_list("assigned_worker_id", "payload__bids")
+    for worker_id, bids in rows.iterator(chunk_size=2000):
+        for bid in bids or []:
+            # jobs archived before selected_at was kept fall back to when the bid was placed
+            selected_at = bid.get("selected_at") or bid["timestamp"]
+            if bid["status"] == "selected" and selected_at:
+                yield worker_id, parse_datetime(selected_at)
+
+
+def job_history(user):
+    # archived jobs the user took part in, as assigned worker or as customer
+    if user.is_worker:
+        history = ArchivedJob.objects.filter(assigned_worker__user=user)
+    else:
+        history = ArchivedJob.objects.filter(customer=user)
+    return history.select_related("assigned_worker__user").order_by("-created_at")
@@ -0,0 +1,424 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Min, Value
+from django.db.models.functions import Coalesce, Least
+from django.utils import timezone
+
+from . import dashboard, events, feed, pricing, schedule
+from .expiry import has_expired, not_expired
+from .leaderboard import location_key
+from .matching import plan_assignments
+from .models import Bid, Job, Worker, WorkerBooking, WorkerRatingStats
+from .utils import send_bid_notification
+
+DEFAULT_WEIGHTS = {
+    "price": 0.4,
+    "rating": 0.3,
+    "experience": 0.1,
+    "verified": 0.1,
+    "location": 0.1,
+}
+EXPERIENCE_CAP = 10  # years; more experience than this scores the same
+
+
+class AssignmentError(Exception):
+    pass
+
+
+# ======================================== Ranking ==================================
+def _clamp(value):
+    return max(0.0, min(1.0, value))
+
+
+def location_match(job_location, worker_location):
+    # jobs and workers only carry free-text locations, so "distance" is how well they match
+    job_location, worker_location = location_key(job_location), location_key(worker_location)
+    if not job_location or not worker_location:
+        return 0.0
+    if job_location == worker_location:
+        return 1.0
+    if job_location in worker_location or worker_location in job_location:
+        return 0.5
+    return 0.0
+
+
+def score_bid(bid, job, worker, rating=None):
+    """
+    Weighted sum of 0..1 components; higher is better. ``rating`` is the
+    worker's leaderboard score, or ``None`` for a worker with no reviews.
+    """
+    weights = getattr(settings, "BID_RANKING_WEIGHTS", DEFAULT_WEIGHTS)
+    if rating is None:
+        rating = getattr(settings, "LEADERBOARD_PRIOR_MEAN", 3.5)
+    ratio = float(bid.bid_amount) / float(job.budget) if job.budget else 1.0
+    components = {
+        # half the budget or less scores 1, the full budget 0.5, 150% or more 0
+        "price": _clamp(1.5 - ratio),
+        "rating": _clamp(rating / 5),
+        "experience": _clamp((worker.experience or 0) / EXPERIENCE_CAP),
+        "verified": 1.0 if worker.verified else 0.0,
+        "location": location_match(job.location, worker.location),
+    }
+    return round(sum(weights.get(name, 0) * value for name, value in components.items()), 6)
+
+
+def _outranks(bid, best):
+    # ties go to the earlier bid
+    return best is None or (bid.rank_score, -bid.id) > (best.rank_score or 0, -best.id)
+
+
+def best_pending_bid(job_id):
+    return (
+        Bid.objects.filter(job_id=job_id, status="not_selected")
+        .order_by(F("rank_score").desc(nulls_last=True), "id").first()
+    )
+
+
+def place_bid(worker, job, amount):
+    """
+    Inserts a bid, scored, and in the same transaction adds it to the job's
+    bid counters and the feed, and makes it the job's best bid if it ranks
+    above the current one.
+    """
+    amount = Bid._meta.get_field("bid_amount").to_python(amount)
+    rating = (
+        WorkerRatingStats.objects.filter(worker_id=worker.id).values_list("score", flat=True).first()
+    )
+    bid = Bid(worker=worker, job=job, bid_amount=amount)
+    bid.rank_score = score_bid(bid, job, worker, rating)
+    with transaction.atomic():
+        bid.save()
+        current = Job.objects.select_for_update().select_related("best_bid").get(id=job.id)
+        amount = Value(amount, output_field=DecimalField(max_digits=10, decimal_places=2))
+        changes = {
+            "bid_count": F("bid_count") + 1,
+            "lowest_bid": Least(Coalesce("lowest_bid", amount), amount),
+            # update() skips auto_now; the job list's ETag is built from updated_at
+            "updated_at": timezone.now(),
+        }
+        if _outranks(bid, current.best_bid):
+            changes["best_bid"] = bid
+        Job.objects.filter(id=job.id).update(**changes)
+        feed.bid_added(job.id, bid.bid_amount)
+    return bid
+
+
+def rescore_open_jobs(chunk_size=500):
+    """Re-scores every pending bid on open jobs, e.g. after the weights change."""
+    last_id = 0
+    rescored = 0
+    while True:
+        current = dict(
+            Job.objects.filter(status="open", id__gt=last_id).order_by("id").values_list("id", "best_bid_id")[:chunk_size]
+        )
+        if not current:
+            return rescored
+        job_ids = list(current)
+        last_id = job_ids[-1]
+        bids = list(
+            Bid.objects.filter(job_id__in=job_ids, status="not_selected").select_related("job", "worker")
+        )
+        ratings = dict(
+            WorkerRatingStats.objects.filter(worker_id__in={bid.worker_id for bid in bids})
+            .values_list("worker_id", "score")
+        )
+        best = {}
+        for bid in bids:
+            bid.rank_score = score_bid(bid, bid.job, bid.worker, ratings.get(bid.worker_id))
+            if _outranks(bid, best.get(bid.job_id)):
+                best[bid.job_id] = bid
+        now = timezone.now()
+        with transaction.atomic():
+            Bid.objects.bulk_update(bids, ["rank_score"], batch_size=500)
+            # only jobs whose best bid changed get a new updated_at
+            jobs = [
+                Job(id=job_id, best_bid=best.get(job_id), updated_at=now)
+                for job_id in job_ids
+                if current[job_id] != getattr(best.get(job_id), "id", None)
+            ]
+            Job.objects.bulk_update(jobs, ["best_bid", "updated_at"], batch_size=500)
+        rescored += len(bids)
+
+
+# ======================================== Withdrawal and counters ==================================
+def withdraw_bid(bid):
+    """
+    Deletes a pending bid and in the same transaction takes it off the job's
+    counters and the feed, picking a new best bid if it was the best one.
+    Raises ``AssignmentError`` once the bid is no longer pending.
+    """
+    with transaction.atomic():
+        # the job lock orders this against assign_bid
+        job = Job.objects.select_for_update().only("id", "status", "best_bid", "lowest_bid").get(id=bid.job_id)
+        if job.status != "open" or not Bid.objects.filter(id=bid.id, status="not_selected").exists():
+            raise AssignmentError("Only pending bids on open jobs can be withdrawn.")
+        Bid.objects.filter(id=bid.id).delete()
+
+        remaining = Bid.objects.filter(job_id=job.id)
+        changes = {"bid_count": F("bid_count") - 1, "updated_at": timezone.now()}
+        lowest = job.lowest_bid
+        if lowest is None or bid.bid_amount <= lowest:
+            lowest = changes["lowest_bid"] = remaining.aggregate(lowest=Min("bid_amount"))["lowest"]
+        if job.best_bid_id == bid.id:
+            changes["best_bid"] = best_pending_bid(job.id)
+        Job.objects.filter(id=job.id).update(**changes)
+        feed.bid_withdrawn(job.id, lowest)
+    return job
+
+
+def repair_bid_counters(fix=True, chunk_size=1000):
+    """
+    Recomputes ``bid_count`` and ``lowest_bid`` from the bids, one chunk of
+    jobs at a time, yielding ``(jobs_checked, wrong_job_ids)``. With ``fix``
+    the chunk is locked and wrong counters are written back, to the open
+    job feed as well.
+    """
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            jobs = Job.objects.filter(id__gt=last_id).order_by("id").only("id", "bid_count", "lowest_bid")
+            if fix:
+                jobs = jobs.select_for_update()
+            jobs = list(jobs[:chunk_size])
+            if not jobs:
+                return
+            last_id = jobs[-1].id
+
+            actual = {
+                job_id: (count, lowest)
+                for job_id, count, lowest in Bid.objects.filter(job_id__in=[job.id for job in jobs])
+                .values("job_id")
+                .annotate(count=Count("id"), lowest=Min("bid_amount"))
+                .values_list("job_id", "count", "lowest")
+            }
+            wrong = []
+            for job in jobs:
+                expected = actual.get(job.id, (0, None))
+                if (job.bid_count, job.lowest_bid) != expected:
+                    job.bid_count, job.lowest_bid = expected
+                    job.updated_at = timezone.now()
+                    wrong.append(job)
+            if fix and wrong:
+                Job.objects.bulk_update(wrong, ["bid_count", "lowest_bid", "updated_at"], batch_size=500)
+                feed.bid_counters_repaired(wrong)
+        yield len(jobs), [job.id for job in wrong]
+
+
+# ======================================== Assignment ==================================
+def assign_bid(bid_id):
+    """
+    Selects a pending bid on an open job: assigns its worker to the job,
+    ignores the other bids and notifies the worker once the transaction
+    commits. Shared by ``AssignWorkerView`` and auto-award. Raises
+    ``AssignmentError``.
+    """
+    with transaction.atomic():
+        bid = Bid.objects.select_related("worker__user").get(id=bid_id)
+        # lock the job so a customer and the auto-award run cannot both assign it
+        try:
+            job = Job.objects.select_for_update().get(id=bid.job_id)
+        except Job.DoesNotExist:
+            raise AssignmentError("This job has been deleted.")
+        if job.assigned_worker_id:
+            raise AssignmentError("This job has already been assigned.")
+        # auto-award runs once bidding has closed; anyone else has to pick before then
+        if job.status != "open" or (has_expired(job) and not job.auto_award):
+            raise AssignmentError("Only open jobs can be assigned.")
+        if not Bid.objects.filter(id=bid.id, status="not_selected").exists():
+            raise AssignmentError("Only pending bids can be selected.")
+        if job.starts_at and job.ends_at:
+            # lock the worker so two overlapping jobs cannot both book them
+            Worker.objects.select_for_update().only("id").get(id=bid.worker_id)
+            clash = schedule.conflicts(bid.worker_id, job.starts_at, job.ends_at).first()
+            if clash is not None:
+                raise AssignmentError(
+                    f"This worker is already booked from {clash.starts_at:%Y-%m-%d %H:%M} "
+                    f"to {clash.ends_at:%Y-%m-%d %H:%M} (job {clash.job_id})."
+                )
+
+        now = timezone.now()
+        job.assigned_worker = bid.worker
+        job.status = "in-progress"
+        job.budget = bid.bid_amount
+        job.save()
+        if job.starts_at and job.ends_at:
+            schedule.sync_job(job)
+        feed.sync_job(job)
+        dashboard.invalidate(job.customer_id)
+
+        bid.status = "selected"
+        bid.selected_at = now
+        bid.save()
+        Bid.objects.filter(job=job).exclude(id=bid.id).update(status="ignored", updated_at=now)
+        # no bid is pending any more
+        Job.objects.filter(id=job.id).update(best_bid=None)
+        pricing.bid_selected(job.title, job.location, bid.bid_amount)
+
+        events.publish_event(bid.worker.user_id, events.JOB_ASSIGNED, {
+            "job_id": job.id,
+            "job_title": job.title,
+            "bid_id": bid.id,
+            "bid_amount": bid.bid_amount,
+        })
+        # an email notification will send to the worker email if his bid is accepted
+        email, title = bid.worker.user.email, job.title
+        transaction.on_commit(lambda: send_bid_notification(email, title))
+    return job
+
+
+def unassign_worker(job):
+    """
+    Takes the assigned worker off a job and reopens it. Bids ignored when
+    the worker was selected stay ignored, so the best bid is picked again
+    from the pending ones, if any, and auto-award cannot re-award the old
+    selection.
+    """
+    with transaction.atomic():
+        job.assigned_worker = None
+        job.status = "open"
+        job.save()
+        Job.objects.filter(id=job.id).update(best_bid=best_pending_bid(job.id))
+        if job.starts_at and job.ends_at:
+            schedule.sync_job(job)
+        feed.sync_job(job)
+        dashboard.invalidate(job.customer_id)
+    return job
+
+
+# ======================================== Auto-award ==================================
+def awardable_jobs(now):
+    # served by the (auto_award, status, expires_at) index
+    return Job.objects.filter(
+        auto_award=True, status="open", expires_at__lte=now, assigned_worker__isnull=True, best_bid__isnull=False,
+    )
+
+
+def auto_award_jobs(now=None, batch_size=500):
+    """
+    Assigns the best bid of every auto-award job whose bidding window has
+    closed. A job whose best bid cannot be awarded loses it, so the next
+    ``expire_jobs`` run closes the job. Returns ``(awarded, skipped)``.
+    """
+    now = now or timezone.now()
+    awarded = skipped = 0
+    last_id = 0
+    while True:
+        batch = list(
+            awardable_jobs(now).filter(id__gt=last_id).order_by("id").values_list("id", "best_bid_id")[:batch_size]
+        )
+        if not batch:
+            return awarded, skipped
+        last_id = batch[-1][0]
+        for job_id, bid_id in batch:
+            try:
+                assign_bid(bid_id)
+            except (AssignmentError, Bid.DoesNotExist):
+                Job.objects.filter(id=job_id, best_bid_id=bid_id).update(best_bid=None, updated_at=timezone.now())
+                skipped += 1
+            else:
+                awarded += 1
+
+
+# ======================================== Bulk assignment ==================================
+def _job_windows(jobs):
+    return {
+        job_id: (starts_at, ends_at)
+        for job_id, starts_at, ends_at in jobs.filter(starts_at__isnull=False, ends_at__isnull=False)
+        .values_list("id", "starts_at", "ends_at")
+    }
+
+
+def _without_booked_workers(bids, windows):
+    # drops bids from workers already booked during the job's window
+    if not windows:
+        return bids
+    bookings = {}
+    for worker_id, starts_at, ends_at in schedule.overlapping(
+        WorkerBooking.objects.filter(worker_id__in={bid[2] for bid in bids if bid[1] in windows}),
+        min(start for start, _ in windows.values()),
+        max(end for _, end in windows.values()),
+    ).values_list("worker_id", "starts_at", "ends_at"):
+        bookings.setdefault(worker_id, []).append((starts_at, ends_at))
+
+    def booked(bid):
+        window = windows.get(bid[1])
+        return window is not None and any(
+            start < window[1] and end > window[0] for start, end in bookings.get(bid[2], ())
+        )
+
+    return [bid for bid in bids if not booked(bid)]
+
+
+def _clashing_bids(plan, by_id, windows):
+    """
+    Planned bids whose job overlaps an earlier job (by id) planned for the
+    same worker. The planner only knows about capacity, not about time.
+    """
+    kept, clashing = {}, set()
+    for job_id, bid_id in sorted(plan.items()):
+        window = windows.get(job_id)
+        if window is None:
+            continue
+        taken = kept.setdefault(by_id[bid_id][2], [])
+        if any(start < window[1] and end > window[0] for start, end in taken):
+            clashing.add(bid_id)
+        else:
+            taken.append(window)
+    return clashing
+
+
+def bulk_assign(customer, job_ids=None, capacity=1, optimize="amount", dry_run=False):
+    """
+    Assigns the customer's open jobs (all of them, or ``job_ids``) at the
+    lowest total bid amount, or best total rank with ``optimize="rank"``,
+    giving no worker more than ``capacity`` jobs in progress. Bids from
+    workers booked during a job's window are left out, and when the plan
+    gives one worker two overlapping jobs, the later job's bid is dropped
+    and the rest planned again. All assignments are made in one transaction
+    through ``assign_bid``. Returns ``(assignments, unassigned_job_ids)``.
+    """
+    with transaction.atomic():
+        jobs = not_expired(
+            Job.objects.select_for_update().filter(customer=customer, status="open", assigned_worker__isnull=True)
+        )
+        if job_ids is not None:
+            jobs = jobs.filter(id__in=job_ids)
+        job_ids = list(jobs.order_by("id").values_list("id", flat=True))
+
+        bids = list(
+            Bid.objects.filter(job_id__in=job_ids, status="not_selected")
+            .values_list("id", "job_id", "worker_id", "bid_amount", "rank_score")
+        )
+        windows = _job_windows(jobs)
+        bids = _without_booked_workers(bids, windows)
+        active = dict(
+            Job.objects.filter(status="in-progress", assigned_worker_id__in={bid[2] for bid in bids})
+            .values("assigned_worker_id").annotate(count=Count("id")).values_list("assigned_worker_id", "count")
+        )
+        remaining = {bid[2]: capacity - active.get(bid[2], 0) for bid in bids}
+        if optimize == "rank":
+            costs = [(bid_id, job_id, worker_id, 1 - (rank or 0)) for bid_id, job_id, worker_id, _, rank in bids]
+        else:
+            costs = [(bid_id, job_id, worker_id, float(amount)) for bid_id, job_id, worker_id, amount, _ in bids]
+        by_id = {bid[0]: bid for bid in bids}
+        while True:
+            plan = plan_assignments(job_ids, costs, remaining)
+            # each round drops at least one bid, so this ends
+            clashing = _clashing_bids(plan, by_id, windows)
+            if not clashing:
+                break
+            costs = [cost for cost in costs if cost[0] not in clashing]
+
+        assignments = [
+            {
+                "job_id": job_id,
+                "bid_id": bid_id,
+                "worker_id": by_id[bid_id][2],
+                "bid_amount": by_id[bid_id][3],
+            }
+            for job_id, bid_id in sorted(plan.items())
+        ]
+        if not dry_run:
+            for assignment in assignments:
+                assign_bid(assignment["bid_id"])
+    return assignments, [job_id for job_id in job_ids if job_id not in plan]
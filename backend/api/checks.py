@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+PROCESS_LOCAL_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    # replica pins and dashboard invalidation only reach every worker process
+    # through a shared cache
+    if settings.CACHES["default"]["BACKEND"] in PROCESS_LOCAL_CACHES:
+        return [
+            Warning(
+                "The default cache is local to each process.",
+                hint="Set REDIS_URL, or CACHES, to a cache shared by every worker process.",
+                id="api.W001",
+            )
+        ]
+    return []
@@ -0,0 +1,73 @@
+import hashlib
+from datetime import datetime
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+# Validators for conditional GET. They are built from row counts and the
+# newest ``updated_at`` of the rows behind a response, so a 304 can be
+# answered with one aggregate query per table and no serialization.
+
+
+def summarize(queryset, timestamp_fields=("updated_at",)):
+    aggregates = {"count": Count("pk")}
+    for index, field in enumerate(timestamp_fields):
+        aggregates[f"max_{index}"] = Max(field)
+    summary = queryset.order_by().aggregate(**aggregates)
+    return [summary["count"]] + [summary[f"max_{index}"] for index in range(len(timestamp_fields))]
+
+
+def build_validators(request, *parts):
+    """
+    ``(etag, last_modified)`` for a response built from ``parts``: summaries
+    of row sets and bare timestamps. The ETag covers every part. Only bare
+    timestamps feed Last-Modified: a row leaving a set does not advance the
+    newest ``updated_at`` of the rows that remain, so a summary changes only
+    the ETag and such responses have no Last-Modified.
+    """
+    # the same rows render differently per user and per query string
+    key = repr((request.user.pk, request.get_full_path(), parts))
+    etag = 'W/"%s"' % hashlib.md5(key.encode()).hexdigest()
+
+    if any(isinstance(part, (list, tuple)) for part in parts):
+        return etag, None
+    timestamps = [part for part in parts if isinstance(part, datetime)]
+    last_modified = int(max(timestamps).timestamp()) if timestamps else None
+    return etag, last_modified
+
+
+def not_modified(request, etag, last_modified):
+    # returns a 304 response, or None when the client copy is stale
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ("Authorization",))
+    return response
+
+
+class ConditionalListMixin:
+    """
+    Answers ``If-None-Match`` / ``If-Modified-Since`` for a ListAPIView before
+    the list is serialized. Views describe what their payload depends on in
+    ``get_validator_parts``.
+    """
+
+    def get_validator_parts(self):
+        return [summarize(self.get_queryset())]
+
+    def list(self, request, *args, **kwargs):
+        etag, last_modified = build_validators(request, *self.get_validator_parts())
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        response = super().list(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import ArchivedJob, Bid, Job
+
+ZERO = Value(0, output_field=IntegerField())
+
+
+def _cache_key(customer_id):
+    return f"customer-dashboard:{customer_id}"
+
+
+def invalidate(*customer_ids):
+    # drop the cached numbers once the write that changed them is committed
+    keys = [_cache_key(customer_id) for customer_id in customer_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def compute(customer_id):
+    """
+    The dashboard numbers in two aggregate queries, one over the live jobs
+    and one over the archived ones. Django cannot aggregate over a union,
+    and folding the archive into the live statement as a dozen correlated
+    subqueries would scan the customer's jobs once per number.
+    """
+    bid_counts = (
+        Bid.objects.filter(job=OuterRef("pk"))
+        .order_by()
+        .values("job")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    # one statement: the payment join is one-to-one, bids come from a correlated subquery
+    live = (
+        Job.objects.filter(customer_id=customer_id)
+        .annotate(num_bids=Coalesce(Subquery(bid_counts, output_field=IntegerField()), ZERO))
+        .aggregate(
+            total=Count("id"),
+            open=Count("id", filter=Q(status="open")),
+            in_progress=Count("id", filter=Q(status="in-progress")),
+            closed=Count("id", filter=Q(status="closed")),
+            completed=Count("id", filter=Q(status="completed")),
+            total_bids=Sum("num_bids"),
+            total_spent=Sum("payment__amount", filter=Q(payment__status="completed")),
+            pending_count=Count("payment", filter=Q(payment__status="pending")),
+            pending_amount=Sum("payment__amount", filter=Q(payment__status="pending")),
+        )
+    )
+    # jobs moved out by archive_jobs still count towards the totals
+    archived = ArchivedJob.objects.filter(customer_id=customer_id).aggregate(
+        total=Count("id"),
+        closed=Count("id", filter=Q(status="closed")),
+        completed=Count("id", filter=Q(status="completed")),
+        total_spent=Sum("payment_amount", filter=Q(payment_status="completed")),
+    )
+
+    return {
+        "jobs": {
+            "total": live["total"] + archived["total"],
+            "open": live["open"],
+            "in_progress": live["in_progress"],
+            "closed": live["closed"] + archived["closed"],
+            "completed": live["completed"] + archived["completed"],
+        },
+        "total_bids": live["total_bids"] or 0,
+        "total_spent": (live["total_spent"] or 0) + (archived["total_spent"] or 0),
+        "pending_payments": {
+            "count": live["pending_count"],
+            "amount": live["pending_amount"] or 0,
+        },
+    }
+
+
+def get_dashboard(customer_id):
+    key = _cache_key(customer_id)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute(customer_id)
+        cache.set(key, stats, getattr(settings, "DASHBOARD_CACHE_TIMEOUT", 300))
+    return stats
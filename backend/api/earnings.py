@@ -0,0 +1,114 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DateField, F, Sum
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
+
+from .models import ArchivedJob, MonthlyWorkerEarnings, Payment
+
+ZERO = Decimal("0.00")
+MAX_MONTHS = 120
+
+
+def month_of(value):
+    """First day of the (local) month of a date or datetime."""
+    if isinstance(value, datetime):
+        value = timezone.localdate(value)
+    return value.replace(day=1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _start_of(month):
+    return datetime.combine(month, time.min, tzinfo=timezone.get_current_timezone())
+
+
+# ======================================== Write path ==================================
+def payment_completed(worker_id, amount, completed_at):
+    """
+    Adds a completed payment to the worker's month. Called by
+    ``release_funds`` while it holds the worker's wallet lock, so two
+    payments for one worker cannot both try to create the row.
+    """
+    month = month_of(completed_at)
+    updated = MonthlyWorkerEarnings.objects.filter(worker_id=worker_id, month=month).update(
+        payments=F("payments") + 1, amount=F("amount") + amount,
+    )
+    if not updated:
+        MonthlyWorkerEarnings.objects.create(worker_id=worker_id, month=month, payments=1, amount=amount)
+
+
+# ======================================== Reads ==================================
+def current_month(worker_id, today=None):
+    """``(payments, amount)`` for the month so far, summed from the payments themselves."""
+    start = _start_of(month_of(today or timezone.localdate()))
+    totals = Payment.objects.filter(
+        status="completed", completed_at__gte=start, job__assigned_worker_id=worker_id,
+    ).aggregate(payments=Count("id"), amount=Sum("amount"))
+    return totals["payments"], totals["amount"] or ZERO
+
+
+def statement(worker_id, months=12, today=None):
+    """
+    Earnings for the last ``months`` calendar months, newest first, with
+    empty months included. Closed months come from the rollup, one row
+    each; only the current month is summed from payments, so the cost does
+    not depend on how long the worker has been earning.
+    """
+    this_month = month_of(today or timezone.localdate())
+    first = add_months(this_month, -(months - 1))
+    rows = {
+        month: (payments, amount)
+        for month, payments, amount in MonthlyWorkerEarnings.objects.filter(
+            worker_id=worker_id, month__gte=first, month__lt=this_month,
+        ).values_list("month", "payments", "amount")
+    }
+    rows[this_month] = current_month(worker_id, today)
+
+    result = []
+    for offset in range(months):
+        month = add_months(this_month, -offset)
+        payments, amount = rows.get(month, (0, ZERO))
+        result.append({"month": month.strftime("%Y-%m"), "payments": payments, "amount": amount})
+    return result
+
+
+# ======================================== Rebuild ==================================
+def rebuild():
+    """
+    Recomputes every row from completed payments and archived jobs, each
+    payment in the month it was completed. Returns the number of rows written.
+    """
+    totals = {}
+    sources = [
+        Payment.objects.filter(status="completed", completed_at__isnull=False, job__assigned_worker__isnull=False)
+        .annotate(month=TruncMonth("completed_at", output_field=DateField()))
+        .values("job__assigned_worker_id", "month")
+        .annotate(count=Count("id"), total=Sum("amount"))
+        .values_list("job__assigned_worker_id", "month", "count", "total"),
+        ArchivedJob.objects.filter(payment_status="completed", assigned_worker__isnull=False)
+        .annotate(month=TruncMonth(Coalesce("payment_completed_at", "updated_at"), output_field=DateField()))
+        .values("assigned_worker_id", "month")
+        .annotate(count=Count("id"), total=Sum("payment_amount"))
+        .values_list("assigned_worker_id", "month", "count", "total"),
+    ]
+    for rows in sources:
+        for worker_id, month, count, total in rows:
+            payments, amount = totals.get((worker_id, month), (0, ZERO))
+            totals[(worker_id, month)] = (payments + count, amount + (total or ZERO))
+
+    with transaction.atomic():
+        MonthlyWorkerEarnings.objects.all().delete()
+        MonthlyWorkerEarnings.objects.bulk_create(
+            [
+                MonthlyWorkerEarnings(worker_id=worker_id, month=month, payments=payments, amount=amount)
+                for (worker_id, month), (payments, amount) in totals.items()
+            ],
+            batch_size=500,
+        )
+    return len(totals)
@@ -0,0 +1,137 @@
+import asyncio
+import itertools
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+# event types pushed to clients over the event stream
+BID_CREATED = "bid.created"
+BID_WITHDRAWN = "bid.withdrawn"
+JOB_ASSIGNED = "job.assigned"
+PAYMENT_COMPLETED = "payment.completed"
+
+_event_ids = itertools.count(1)
+
+
+# ======================================== Backends ==================================
+class BaseEventBackend:
+    """
+    Fan-out of events to the subscribers of a single user.
+
+    ``publish`` may be called from any thread (sync views run in a worker
+    thread under ASGI); ``subscribe`` is called from the event loop serving
+    the stream. Backends shared between processes (Redis, Postgres
+    LISTEN/NOTIFY) plug in through ``EVENT_STREAM_BACKEND``.
+    """
+
+    def publish(self, user_id, event):
+        raise NotImplementedError
+
+    def subscribe(self, user_id):
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+
+class Subscription:
+    def __init__(self, backend, user_id, queue, loop):
+        self.backend = backend
+        self.user_id = user_id
+        self.queue = queue
+        self.loop = loop
+
+    async def get(self, timeout=None):
+        return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+
+    def close(self):
+        self.backend.unsubscribe(self)
+
+
+class InMemoryEventBackend(BaseEventBackend):
+    """In-process pub/sub, enough for a single ASGI worker or local development."""
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, user_id):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        subscription = Subscription(self, user_id, queue, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(_deliver, subscription.queue, event)
+            except RuntimeError:
+                # the loop serving this stream has already shut down
+                self.unsubscribe(subscription)
+
+
+def _deliver(queue, event):
+    # slow consumers lose events instead of growing the queue without bound
+    if not queue.full():
+        queue.put_nowait(event)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                backend_path = getattr(settings, "EVENT_STREAM_BACKEND", "api.events.InMemoryEventBackend")
+                _backend = import_string(backend_path)()
+    return _backend
+
+
+# ======================================== Publishing ==================================
+def publish_event(user_id, event_type, data):
+    # only push once the change is visible to clients that re-fetch on the event
+    event = {"id": next(_event_ids), "type": event_type, "data": data}
+    transaction.on_commit(lambda: get_backend().publish(user_id, event))
+
+
+def format_event(event):
+    payload = json.dumps(event["data"], cls=DjangoJSONEncoder)
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {payload}\n\n"
+
+
+async def stream_events(subscription, keepalive=None):
+    if keepalive is None:
+        keepalive = getattr(settings, "EVENT_STREAM_KEEPALIVE", 15)
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await subscription.get(timeout=keepalive)
+            except asyncio.TimeoutError:
+                # comment lines keep proxies from closing an idle connection
+                yield ": keepalive\n\n"
+                continue
+            yield format_event(event)
+    finally:
+        subscription.close()
@@ -0,0 +1,46 @@
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import dashboard, feed
+from .models import Bid, Job
+
+
+def expired_jobs(now):
+    # served by the (status, expires_at) index; auto-award jobs with a bid are
+    # left for `manage.py auto_award_jobs`, which drops the best bid of a job it
+    # cannot award so that it is closed here
+    return Job.objects.filter(status="open", expires_at__lte=now).exclude(auto_award=True, best_bid__isnull=False)
+
+
+def not_expired(queryset, now=None):
+    return queryset.filter(Q(expires_at__isnull=True) | Q(expires_at__gt=now or timezone.now()))
+
+
+def has_expired(job, now=None):
+    # the rule of not_expired for a loaded job
+    return job.expires_at is not None and job.expires_at <= (now or timezone.now())
+
+
+def expire_batch(now, batch_size):
+    with transaction.atomic():
+        batch = list(expired_jobs(now).order_by("expires_at").values_list("id", "customer_id")[:batch_size])
+        if not batch:
+            return 0
+        job_ids = [job_id for job_id, _ in batch]
+        closed = expired_jobs(now).filter(id__in=job_ids).update(status="closed", best_bid=None, updated_at=now)
+        Bid.objects.filter(job_id__in=job_ids, status="not_selected").update(status="ignored", updated_at=now)
+        feed.remove_jobs(job_ids)
+        dashboard.invalidate(*{customer_id for _, customer_id in batch})
+    return closed
+
+
+def expire_jobs(now=None, batch_size=1000):
+    """Closes expired open jobs and ignores their pending bids, one batch per transaction."""
+    now = now or timezone.now()
+    total = 0
+    while True:
+        closed = expire_batch(now, batch_size)
+        if not closed:
+            return total
+        total += closed
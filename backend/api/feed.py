@@ -0,0 +1,194 @@
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, F, Min, Sum, Value
+from django.db.models.functions import Coalesce, Least
+from django.utils import timezone
+
+from .archive import archived_reviews
+from .models import ArchivedJob, Job, OpenJobFeed, Review
+
+FEED_STATUS = "open"
+
+# columns compared by ``rebuild`` (everything except the bookkeeping timestamp)
+FEED_FIELDS = [
+    "customer_id", "title", "description", "location", "budget", "urgency", "status", "created_at",
+    "expires_at", "bid_count", "lowest_bid", "customer_rating", "assigned_worker_id", "assigned_worker_username",
+    "assigned_worker_skills", "assigned_worker_experience", "assigned_worker_location", "assigned_worker_picture",
+]
+
+
+def customer_ratings(customer_ids):
+    # reviews of archived jobs still count towards the customer's rating
+    totals = {
+        row["reviewee_id"]: [row["count"], row["total"]]
+        for row in Review.objects.filter(reviewee_id__in=customer_ids, review_type="customer")
+        .values("reviewee_id")
+        .annotate(count=Count("id"), total=Sum("rating"))
+    }
+    for review in archived_reviews(ArchivedJob.objects.filter(customer_id__in=customer_ids), "customer"):
+        if review["reviewee_id"] in customer_ids:
+            entry = totals.setdefault(review["reviewee_id"], [0, 0])
+            entry[0] += 1
+            entry[1] += review["rating"]
+    return {
+        customer_id: (Decimal(total) / count).quantize(Decimal("0.01"))
+        for customer_id, (count, total) in totals.items()
+    }
+
+
+def _worker_columns(worker):
+    if worker is None:
+        return {
+            "assigned_worker_id": None,
+            "assigned_worker_username": "",
+            "assigned_worker_skills": "",
+            "assigned_worker_experience": None,
+            "assigned_worker_location": None,
+            "assigned_worker_picture": "",
+        }
+    picture = worker.profile_picture or worker.user.profile_picture
+    return {
+        "assigned_worker_id": worker.id,
+        "assigned_worker_username": worker.user.username,
+        "assigned_worker_skills": worker.skills,
+        "assigned_worker_experience": worker.experience,
+        "assigned_worker_location": worker.location,
+        "assigned_worker_picture": picture.name if picture else "",
+    }
+
+
+def build_entry(job, bid_count, lowest_bid, customer_rating):
+    return OpenJobFeed(
+        job_id=job.id,
+        customer_id=job.customer_id,
+        title=job.title,
+        description=job.description,
+        location=job.location,
+        budget=job.budget,
+        urgency=job.urgency,
+        status=job.status,
+        created_at=job.created_at,
+        expires_at=job.expires_at,
+        bid_count=bid_count,
+        lowest_bid=lowest_bid,
+        customer_rating=customer_rating,
+        **_worker_columns(job.assigned_worker),
+    )
+
+
+# ======================================== Write paths ==================================
+def sync_job(job):
+    # called after any change to a job's own columns or status
+    if job.status != FEED_STATUS:
+        OpenJobFeed.objects.filter(job_id=job.id).delete()
+        return
+    # the counters are re-read: they change with every bid, without the job being saved
+    bid_count, lowest_bid = Job.objects.filter(id=job.id).values_list("bid_count", "lowest_bid").get()
+    entry = build_entry(
+        job,
+        bid_count=bid_count,
+        lowest_bid=lowest_bid,
+        customer_rating=customer_ratings([job.customer_id]).get(job.customer_id),
+    )
+    entry.save()
+
+
+def add_jobs(jobs):
+    # new jobs have no bids yet; one query for the customers' ratings, one insert
+    ratings = customer_ratings({job.customer_id for job in jobs})
+    OpenJobFeed.objects.bulk_create(
+        [build_entry(job, 0, None, ratings.get(job.customer_id)) for job in jobs if job.status == FEED_STATUS],
+        batch_size=500,
+    )
+
+
+def remove_jobs(job_ids):
+    OpenJobFeed.objects.filter(job_id__in=job_ids).delete()
+
+
+def bid_added(job_id, amount):
+    amount = Value(amount, output_field=DecimalField(max_digits=10, decimal_places=2))
+    OpenJobFeed.objects.filter(job_id=job_id).update(
+        bid_count=F("bid_count") + 1, lowest_bid=Least(Coalesce("lowest_bid", amount), amount), updated_at=timezone.now(),
+    )
+
+
+def bid_withdrawn(job_id, lowest_bid):
+    OpenJobFeed.objects.filter(job_id=job_id).update(
+        bid_count=F("bid_count") - 1, lowest_bid=lowest_bid, updated_at=timezone.now(),
+    )
+
+
+def bid_counters_repaired(jobs):
+    OpenJobFeed.objects.bulk_update(
+        [
+            OpenJobFeed(job_id=job.id, bid_count=job.bid_count, lowest_bid=job.lowest_bid, updated_at=timezone.now())
+            for job in jobs
+        ],
+        ["bid_count", "lowest_bid", "updated_at"],
+        batch_size=500,
+    )
+
+
+def customer_rating_changed(customer_id):
+    rating = customer_ratings([customer_id]).get(customer_id)
+    OpenJobFeed.objects.filter(customer_id=customer_id).update(customer_rating=rating, updated_at=timezone.now())
+
+
+def worker_profile_changed(worker):
+    OpenJobFeed.objects.filter(assigned_worker_id=worker.id).update(updated_at=timezone.now(), **_worker_columns(worker))
+
+
+# ======================================== Rebuild ==================================
+def expected_entries(job_ids):
+    jobs = list(
+        Job.objects.filter(id__in=job_ids, status=FEED_STATUS)
+        .select_related("assigned_worker__user")
+        .annotate(num_bids=Count("bids"), min_bid=Min("bids__bid_amount"))
+    )
+    ratings = customer_ratings({job.customer_id for job in jobs})
+    return {job.id: build_entry(job, job.num_bids, job.min_bid, ratings.get(job.customer_id)) for job in jobs}
+
+
+def rebuild(fix=True, chunk_size=1000):
+    """
+    Compares the feed with the source tables chunk by chunk. Returns
+    ``(missing, stale, orphaned)`` job id lists; with ``fix`` the differences
+    are written back as well.
+    """
+    missing, stale, orphaned = [], [], []
+
+    source_ids = Job.objects.filter(status=FEED_STATUS).order_by("id").values_list("id", flat=True)
+    last_id = 0
+    while True:
+        job_ids = list(source_ids.filter(id__gt=last_id)[:chunk_size])
+        if not job_ids:
+            break
+        last_id = job_ids[-1]
+
+        expected = expected_entries(job_ids)
+        current = {entry.job_id: entry for entry in OpenJobFeed.objects.filter(job_id__in=job_ids)}
+        to_write = []
+        for job_id, entry in expected.items():
+            if job_id not in current:
+                missing.append(job_id)
+            elif any(getattr(entry, field) != getattr(current[job_id], field) for field in FEED_FIELDS):
+                stale.append(job_id)
+            else:
+                continue
+            to_write.append(entry)
+        if fix and to_write:
+            OpenJobFeed.objects.bulk_create(
+                to_write,
+                update_conflicts=True,
+                unique_fields=["job"],
+                update_fields=FEED_FIELDS + ["updated_at"],
+            )
+
+    # rows whose job is no longer open
+    orphaned = list(
+        OpenJobFeed.objects.exclude(job__status=FEED_STATUS).values_list("job_id", flat=True)
+    )
+    if fix and orphaned:
+        remove_jobs(orphaned)
+    return missing, stale, orphaned
@@ -0,0 +1,61 @@
+from rest_framework import serializers
+
+
+def requested(request, param):
+    """``?fields=a,b`` -> ``{"a", "b"}``; ``None`` when the parameter is absent."""
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+def sparse_context(request):
+    return {"fields": requested(request, "fields"), "expand": requested(request, "expand")}
+
+
+def is_expanded(name, expand):
+    # embedded objects stay expanded unless the client sends an ``expand`` list without them
+    return expand is None or name in expand
+
+
+class SparseFieldsMixin:
+    """
+    Serializer support for ``?fields=`` and ``?expand=``, read from the
+    ``fields`` / ``expand`` context keys.
+
+    ``columns`` maps each output field to the model columns it reads, and
+    ``expandable`` maps an embedded field to the columns and joins it needs
+    when expanded; collapsed, it is rendered as the related id. The view
+    calls ``prune`` so unrequested columns and joins are never fetched.
+    """
+
+    columns = {}
+    expandable = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields, expand = self.context.get("fields"), self.context.get("expand")
+        if fields is not None:
+            for name in list(self.fields):
+                if name not in fields:
+                    self.fields.pop(name)
+        for name, spec in self.expandable.items():
+            if name in self.fields and not is_expanded(name, expand):
+                self.fields[name] = serializers.IntegerField(source=spec["id"], read_only=True, allow_null=True)
+
+    @classmethod
+    def prune(cls, queryset, fields=None, expand=None):
+        names = [name for name in cls.Meta.fields if fields is None or name in fields]
+        only, joins = [], []
+        for name in names:
+            spec = cls.expandable.get(name)
+            if spec is None:
+                only.extend(cls.columns.get(name, [name]))
+            elif is_expanded(name, expand):
+                only.extend(spec["columns"])
+                joins.extend(spec["joins"])
+            else:
+                only.append(spec["id"])
+        if joins:
+            queryset = queryset.select_related(*joins)
+        return queryset.only(*only)
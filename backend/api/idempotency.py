@@ -0,0 +1,171 @@
+import functools
+import hashlib
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL = 0.05
+
+# requests waiting on an execution in this process are woken directly;
+# duplicates that reach another process poll the table instead
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def _ttl():
+    return timedelta(seconds=getattr(settings, "IDEMPOTENCY_KEY_TTL", 24 * 60 * 60))
+
+
+def _hash(key):
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _fingerprint(request):
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(request.get_full_path().encode())
+    digest.update(request.body)
+    return digest.hexdigest()
+
+
+def _error(status_code, message):
+    return Response(
+        {
+            "success": False,
+            "statusCode": status_code,
+            "message": message,
+        },
+        status=status_code,
+    )
+
+
+def _replay(entry, fingerprint):
+    if entry.fingerprint != fingerprint:
+        return _error(
+            status.HTTP_422_UNPROCESSABLE_ENTITY,
+            f"This {HEADER} was already used for a different request.",
+        )
+    response = Response(entry.response, status=entry.status_code)
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _claim(user_id, key, fingerprint):
+    """
+    ``(True, None)`` when this request now holds the key, otherwise
+    ``(False, entry)`` with the row holding it, or ``None`` if that row went
+    away meanwhile. An expired row, or a claim whose request died without
+    releasing it, is taken over.
+    """
+    now = timezone.now()
+    locked_until = now + timedelta(seconds=getattr(settings, "IDEMPOTENCY_LOCK_SECONDS", 30))
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.create(
+                user_id=user_id, key=key, fingerprint=fingerprint, locked_until=locked_until, created_at=now,
+            )
+        return True, None
+    except IntegrityError:
+        pass
+    taken = IdempotencyKey.objects.filter(user_id=user_id, key=key).filter(
+        Q(created_at__lte=now - _ttl()) | Q(status_code__isnull=True, locked_until__lte=now),
+    ).update(fingerprint=fingerprint, locked_until=locked_until, status_code=None, response=None, created_at=now)
+    if taken:
+        return True, None
+    return False, IdempotencyKey.objects.filter(user_id=user_id, key=key).first()
+
+
+def _wait_for(user_id, key, fingerprint):
+    """Waits for the execution holding the key; ``None`` means it gave the key up."""
+    with _in_flight_lock:
+        event = _in_flight.get((user_id, key))
+    deadline = time.monotonic() + getattr(settings, "IDEMPOTENCY_WAIT_SECONDS", 10)
+    while time.monotonic() < deadline:
+        if event is not None:
+            event.wait(max(deadline - time.monotonic(), 0))
+        else:
+            time.sleep(POLL_INTERVAL)
+        entry = IdempotencyKey.objects.filter(user_id=user_id, key=key, fingerprint=fingerprint).first()
+        if entry is None:
+            return None
+        if entry.status_code is not None:
+            return _replay(entry, fingerprint)
+    return _error(
+        status.HTTP_409_CONFLICT,
+        f"A request with this {HEADER} is still being processed. Retry later.",
+    )
+
+
+def idempotent(handler):
+    """
+    View method decorator: requests carrying an ``Idempotency-Key`` header
+    run once per user and key. Repeats within ``IDEMPOTENCY_KEY_TTL`` get the
+    stored response back without running the view, and repeats that arrive
+    while the first is still running wait for its response. Keys are claimed
+    in the database, so this holds across worker processes.
+    """
+
+    @functools.wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        header = request.headers.get(HEADER)
+        if not header:
+            return handler(self, request, *args, **kwargs)
+        if len(header) > MAX_KEY_LENGTH:
+            return _error(status.HTTP_400_BAD_REQUEST, f"{HEADER} must be at most {MAX_KEY_LENGTH} characters.")
+
+        user_id, key = request.user.pk, _hash(header)
+        fingerprint = _fingerprint(request)
+        while True:
+            claimed, entry = _claim(user_id, key, fingerprint)
+            if claimed:
+                break
+            if entry is None:
+                continue
+            if entry.status_code is not None or entry.fingerprint != fingerprint:
+                return _replay(entry, fingerprint)
+            response = _wait_for(user_id, key, fingerprint)
+            if response is not None:
+                return response
+
+        held = IdempotencyKey.objects.filter(user_id=user_id, key=key, fingerprint=fingerprint, status_code=None)
+        event = threading.Event()
+        with _in_flight_lock:
+            _in_flight[(user_id, key)] = event
+        try:
+            response = handler(self, request, *args, **kwargs)
+            if response.status_code < 500:
+                held.update(status_code=response.status_code, response=response.data)
+            else:
+                held.delete()
+            return response
+        except Exception:
+            held.delete()
+            raise
+        finally:
+            with _in_flight_lock:
+                _in_flight.pop((user_id, key), None)
+            event.set()
+
+    return wrapper
+
+
+def purge_expired(batch_size=1000):
+    """Deletes keys older than ``IDEMPOTENCY_KEY_TTL``, a batch per query. Returns the number deleted."""
+    cutoff = timezone.now() - _ttl()
+    deleted = 0
+    while True:
+        ids = list(IdempotencyKey.objects.filter(created_at__lte=cutoff).values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,193 @@
+import logging
+import multiprocessing
+import os
+import posixpath
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+from django.db import transaction
+from django.template.defaultfilters import filesizeformat
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP"}
+THUMBNAIL_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+
+
+def max_upload_size():
+    return getattr(settings, "MAX_UPLOAD_SIZE", 5 * 1024 * 1024)
+
+
+def thumbnail_sizes():
+    return getattr(settings, "PROFILE_THUMBNAIL_SIZES", {"small": 96, "medium": 320})
+
+
+def thumbnail_workers():
+    return getattr(settings, "PROFILE_THUMBNAIL_WORKERS", 2)
+
+
+def _too_large_message():
+    return f"File is too large. The maximum size is {filesizeformat(max_upload_size())}."
+
+
+# ======================================== Upload limits ==================================
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams every uploaded file to a temporary file on disk and stops writing
+    once it grows past ``MAX_UPLOAD_SIZE``. The field is dropped from
+    ``request.FILES`` and its name recorded in ``request.rejected_uploads``.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > max_upload_size():
+            self.file.close()
+            rejected = getattr(self.request, "rejected_uploads", set())
+            rejected.add(self.field_name)
+            self.request.rejected_uploads = rejected
+            raise SkipFile()
+        return super().receive_data_chunk(raw_data, start)
+
+
+def rejected_upload_error(request, field_name):
+    if field_name in getattr(request, "rejected_uploads", ()):
+        return _too_large_message()
+    return None
+
+
+def validate_profile_picture(upload):
+    from PIL import Image
+
+    if upload.size > max_upload_size():
+        raise ValidationError(_too_large_message())
+
+    try:
+        upload.seek(0)
+        with Image.open(upload) as image:
+            image_format = image.format
+            width, height = image.size
+            image.verify()
+    except Exception:
+        raise ValidationError("Upload a valid image.")
+    finally:
+        upload.seek(0)
+
+    if image_format not in ALLOWED_FORMATS:
+        raise ValidationError("Unsupported image format. Use JPEG, PNG or WebP.")
+    if width * height > getattr(settings, "PROFILE_PICTURE_MAX_PIXELS", 40_000_000):
+        raise ValidationError("Image dimensions are too large.")
+    return upload
+
+
+# ======================================== Thumbnails ==================================
+def thumbnail_name(name, size_name, extension):
+    stem = posixpath.splitext(name)[0]
+    return f"thumbnails/{stem}_{size_name}.{extension}"
+
+
+def _rendition_url(name, size_name, extension):
+    # thumbnails are only rendered on storages with local paths and appear a
+    # moment after the upload; until then, or if rendering failed, the
+    # original picture stands in
+    thumbnail = thumbnail_name(name, size_name, extension)
+    try:
+        default_storage.path(thumbnail)
+    except NotImplementedError:
+        return default_storage.url(name)
+    return default_storage.url(thumbnail if default_storage.exists(thumbnail) else name)
+
+
+def thumbnail_urls(field_file):
+    if not field_file:
+        return None
+    return {
+        size_name: {
+            extension: _rendition_url(field_file.name, size_name, extension)
+            for extension in THUMBNAIL_FORMATS
+        }
+        for size_name in thumbnail_sizes()
+    }
+
+
+def thumbnail_url(field_file, size_name="small", extension="webp"):
+    # accepts a FieldFile or a stored file name
+    if not field_file:
+        return None
+    return _rendition_url(getattr(field_file, "name", field_file), size_name, extension)
+
+
+def render_thumbnails(source_path, targets):
+    # runs in a pool process: keep it free of ORM access
+    from PIL import Image, ImageOps
+
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGB")
+        for size, fmt, destination in targets:
+            thumbnail = image.copy()
+            thumbnail.thumbnail((size, size), Image.Resampling.LANCZOS)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            partial = f"{destination}.part"
+            if fmt == "JPEG":
+                thumbnail.save(partial, fmt, quality=82, optimize=True, progressive=True)
+            else:
+                thumbnail.save(partial, fmt, quality=80, method=4)
+            os.replace(partial, destination)
+    return len(targets)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(
+                    max_workers=thumbnail_workers(),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _executor
+
+
+def _thumbnail_targets(name):
+    targets = []
+    for size_name, size in thumbnail_sizes().items():
+        for extension, fmt in THUMBNAIL_FORMATS.items():
+            targets.append((size, fmt, default_storage.path(thumbnail_name(name, size_name, extension))))
+    return targets
+
+
+def _log_failure(future):
+    exception = future.exception()
+    if exception is not None:
+        logger.error("Thumbnail generation failed: %s", exception)
+
+
+def generate_thumbnails(name):
+    try:
+        source_path = default_storage.path(name)
+        targets = _thumbnail_targets(name)
+    except NotImplementedError:
+        logger.warning("Storage has no local paths; skipping thumbnails for %s", name)
+        return
+    if not thumbnail_workers():
+        render_thumbnails(source_path, targets)
+        return
+    get_executor().submit(render_thumbnails, source_path, targets).add_done_callback(_log_failure)
+
+
+def schedule_thumbnails(field_file):
+    if field_file:
+        name = field_file.name
+        transaction.on_commit(lambda: generate_thumbnails(name))
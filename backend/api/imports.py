@@ -0,0 +1,130 @@
+import csv
+import io
+import json
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework import serializers
+
+from . import dashboard, feed
+from .models import Job
+from .serializers import JobSerializer
+
+BATCH_SIZE = 500
+COLUMNS = ("title", "description", "location", "budget", "urgency", "expires_at", "auto_award", "starts_at", "ends_at")
+REQUIRED_COLUMNS = ("title", "description", "location", "budget")
+
+
+class JobImportError(Exception):
+    pass
+
+
+def max_rows():
+    return getattr(settings, "JOB_IMPORT_MAX_ROWS", 5000)
+
+
+# ======================================== Parsing ==================================
+def parse_csv(text):
+    """Rows of a CSV file with a header line; empty cells are left out so the defaults apply."""
+    reader = csv.DictReader(io.StringIO(text.lstrip("\ufeff")))
+    missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        raise JobImportError(f"Missing column(s): {', '.join(missing)}.")
+    return [
+        {column: value.strip() for column, value in row.items() if column in COLUMNS and value and value.strip()}
+        for row in reader
+    ]
+
+
+def parse_json(data):
+    """Rows from a JSON list of objects, or an object with a ``jobs`` list."""
+    if isinstance(data, (str, bytes)):
+        try:
+            data = json.loads(data)
+        except ValueError as exception:
+            raise JobImportError(f"Invalid JSON: {exception}.")
+    if isinstance(data, dict):
+        data = data.get("jobs")
+    if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+        raise JobImportError("Expected a list of job objects.")
+    return [{column: value for column, value in row.items() if column in COLUMNS} for row in data]
+
+
+def parse_file(name, content):
+    """Rows of an uploaded ``.csv`` or ``.json`` file, chosen by its name."""
+    try:
+        text = content.decode("utf-8")
+    except UnicodeDecodeError:
+        raise JobImportError("The file must be UTF-8 encoded.")
+    if name.lower().endswith(".json"):
+        return parse_json(text)
+    return parse_csv(text)
+
+
+# ======================================== Import ==================================
+def validate_rows(rows):
+    """
+    ``(validated, errors)`` for every row, in one pass in memory with the
+    rules of ``JobSerializer``; no row costs a query.
+    """
+    serializer = JobSerializer()
+    validated, errors = [], []
+    for row in rows:
+        try:
+            validated.append(serializer.run_validation(row))
+            errors.append(None)
+        except serializers.ValidationError as exception:
+            validated.append(None)
+            errors.append(exception.detail)
+    return validated, errors
+
+
+def existing_jobs(customer, validated):
+    """``(title, description)`` of the customer's jobs that share a title with a row; one query."""
+    titles = {data["title"] for data in validated if data is not None}
+    return set(
+        Job.objects.filter(customer=customer, title__in=titles).values_list("title", "description")
+    )
+
+
+def import_jobs(customer, rows, dry_run=False):
+    """
+    Validates the rows, skips those repeating a job the customer already
+    posted (same title and description) or an earlier row, and inserts the
+    rest with ``bulk_create``, ``BATCH_SIZE`` rows per statement, in one
+    transaction. Returns one result per row, in order; with ``dry_run``
+    the rows that would be created are reported as ``valid``.
+    """
+    if len(rows) > max_rows():
+        raise JobImportError(f"At most {max_rows()} jobs can be imported at once.")
+
+    validated, errors = validate_rows(rows)
+    seen = existing_jobs(customer, validated)
+    results, jobs = [], []
+    for number, (data, error) in enumerate(zip(validated, errors), 1):
+        if error is not None:
+            results.append({"row": number, "status": "invalid", "errors": error})
+            continue
+        key = (data["title"], data["description"])
+        if key in seen:
+            results.append({"row": number, "status": "duplicate"})
+            continue
+        seen.add(key)
+        results.append({"row": number, "status": "valid"})
+        jobs.append((results[-1], Job(customer=customer, **data)))
+
+    if jobs and not dry_run:
+        with transaction.atomic():
+            created = Job.objects.bulk_create([job for _, job in jobs], batch_size=BATCH_SIZE)
+            feed.add_jobs(created)
+            dashboard.invalidate(customer.id)
+        for (result, _), job in zip(jobs, created):
+            result.update(status="created", id=job.id)
+    return results
+
+
+def summarize(results):
+    counts = {"created": 0, "valid": 0, "duplicate": 0, "invalid": 0}
+    for result in results:
+        counts[result["status"]] += 1
+    return counts
@@ -0,0 +1,248 @@
+import threading
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from .archive import archived_reviews
+from .models import ArchivedJob, Job, LeaderboardState, Review, Worker, WorkerRatingStats
+
+
+def bayesian_score(rating_sum, rating_count):
+    # a fixed prior keeps every other worker's score unchanged when one worker is reviewed
+    weight = getattr(settings, "LEADERBOARD_PRIOR_WEIGHT", 5)
+    mean = getattr(settings, "LEADERBOARD_PRIOR_MEAN", 3.5)
+    return round((weight * mean + rating_sum) / (weight + rating_count), 6)
+
+
+def location_key(location):
+    return (location or "").strip().lower()
+
+
+def _sort_key(stats):
+    # best first: higher score, then more completed jobs, then the older worker id
+    return (-stats.score, -stats.completed_jobs, stats.worker_id)
+
+
+class RankedIndex:
+    """
+    Sort keys kept in order, in sublists of ``LOAD`` to ``2 * LOAD`` keys.
+    An update bisects the sublist maxima and shifts one short sublist, so it
+    costs O(log n + LOAD) rather than moving the whole list; a rank adds the
+    lengths of the sublists before the key's, and top-N reads the head.
+    """
+
+    LOAD = 500
+
+    def __init__(self):
+        self.sublists = []
+        self.maxes = []
+        self.by_worker = {}
+
+    def __len__(self):
+        return len(self.by_worker)
+
+    def add(self, worker_id, key):
+        self.discard(worker_id)
+        self.by_worker[worker_id] = key
+        if not self.sublists:
+            self.sublists.append([key])
+            self.maxes.append(key)
+            return
+        index = min(bisect_left(self.maxes, key), len(self.sublists) - 1)
+        sublist = self.sublists[index]
+        insort(sublist, key)
+        self.maxes[index] = sublist[-1]
+        if len(sublist) > 2 * self.LOAD:
+            self.sublists[index:index + 1] = [sublist[:self.LOAD], sublist[self.LOAD:]]
+            self.maxes[index:index + 1] = [sublist[self.LOAD - 1], sublist[-1]]
+
+    def discard(self, worker_id):
+        key = self.by_worker.pop(worker_id, None)
+        if key is None:
+            return
+        index = bisect_left(self.maxes, key)
+        sublist = self.sublists[index]
+        del sublist[bisect_left(sublist, key)]
+        if sublist:
+            self.maxes[index] = sublist[-1]
+        else:
+            del self.sublists[index]
+            del self.maxes[index]
+
+    def rank(self, worker_id):
+        key = self.by_worker.get(worker_id)
+        if key is None:
+            return None
+        index = bisect_left(self.maxes, key)
+        before = sum(len(sublist) for sublist in self.sublists[:index])
+        return before + bisect_left(self.sublists[index], key) + 1
+
+    def top(self, limit):
+        worker_ids = []
+        for sublist in self.sublists:
+            worker_ids.extend(key[2] for key in sublist[:limit - len(worker_ids)])
+            if len(worker_ids) >= limit:
+                break
+        return worker_ids
+
+
+class Leaderboard:
+    def __init__(self, generation, version):
+        self.generation = generation
+        self.version = version
+        self.overall = RankedIndex()
+        self.locations = {}
+        self.location_of = {}
+
+    @classmethod
+    def load(cls, generation, version):
+        board = cls(generation, version)
+        board._apply_all(WorkerRatingStats.objects.all())
+        return board
+
+    def catch_up(self, version):
+        # rows written after the state was read are applied again next time; apply is idempotent
+        self._apply_all(WorkerRatingStats.objects.filter(version__gt=self.version))
+        self.version = version
+
+    def _apply_all(self, stats):
+        for row in stats.only("worker_id", "location", "score", "completed_jobs").iterator(chunk_size=2000):
+            self.apply(row)
+
+    def index_for(self, location):
+        return self.locations.get(location_key(location)) if location else self.overall
+
+    def apply(self, stats):
+        key = _sort_key(stats)
+        self.overall.add(stats.worker_id, key)
+        old_location = self.location_of.get(stats.worker_id)
+        new_location = location_key(stats.location)
+        if old_location is not None and old_location != new_location:
+            self.locations[old_location].discard(stats.worker_id)
+        self.locations.setdefault(new_location, RankedIndex()).add(stats.worker_id, key)
+        self.location_of[stats.worker_id] = new_location
+
+
+# one board per process. Every change to the stats bumps the version in
+# LeaderboardState; a process reads it once per request and applies the rows
+# changed since its board was built, or reloads after a rebuild.
+_board = None
+_lock = threading.Lock()
+
+
+def _state():
+    return LeaderboardState.objects.values_list("generation", "version").first() or (0, 0)
+
+
+def _next_version():
+    """
+    Bumps the version for a change to the stats. Call it in the writing
+    transaction: the row lock it takes orders concurrent writers, so once a
+    version is visible every row stamped with it or below is committed.
+    """
+    if not LeaderboardState.objects.filter(id=1).update(version=F("version") + 1):
+        LeaderboardState.objects.get_or_create(id=1, defaults={"version": 1})
+    return LeaderboardState.objects.values_list("version", flat=True).get(id=1)
+
+
+def get_board():
+    global _board
+    generation, version = _state()
+    with _lock:
+        if _board is None or _board.generation != generation:
+            _board = Leaderboard.load(generation, version)
+        elif _board.version < version:
+            _board.catch_up(version)
+        return _board
+
+
+def _update_stats(worker, **increments):
+    with transaction.atomic():
+        stats, _ = WorkerRatingStats.objects.select_for_update().get_or_create(
+            worker=worker, defaults={"location": worker.location or ""},
+        )
+        for field, amount in increments.items():
+            setattr(stats, field, getattr(stats, field) + amount)
+        stats.location = worker.location or ""
+        stats.score = bayesian_score(stats.rating_sum, stats.rating_count)
+        stats.version = _next_version()
+        stats.save()
+    return stats
+
+
+# ======================================== Write paths ==================================
+def review_added(worker, rating):
+    return _update_stats(worker, rating_count=1, rating_sum=int(rating))
+
+
+def job_completed(worker):
+    return _update_stats(worker, completed_jobs=1)
+
+
+def worker_profile_changed(worker):
+    location = worker.location or ""
+    if WorkerRatingStats.objects.filter(worker=worker).exclude(location=location).exists():
+        with transaction.atomic():
+            WorkerRatingStats.objects.filter(worker=worker).update(location=location, version=_next_version())
+
+
+# ======================================== Reads ==================================
+def top_workers(limit=10, location=None):
+    index = get_board().index_for(location)
+    worker_ids = index.top(limit) if index else []
+    stats = WorkerRatingStats.objects.select_related("worker__user").in_bulk(worker_ids)
+    return [(position, stats[worker_id]) for position, worker_id in enumerate(worker_ids, 1) if worker_id in stats]
+
+
+def rank_of(worker_id):
+    """``(overall_rank, location_rank)``, or ``None`` for a worker with no stats."""
+    board = get_board()
+    overall = board.overall.rank(worker_id)
+    if overall is None:
+        return None
+    return overall, board.locations[board.location_of[worker_id]].rank(worker_id)
+
+
+def rebuild():
+    """Recomputes every worker's stats from reviews and completed jobs, archived ones included."""
+    ratings = {
+        row["reviewee_id"]: row
+        for row in Review.objects.filter(review_type="worker")
+        .values("reviewee_id").annotate(count=Count("id"), total=Sum("rating"))
+    }
+    for review in archived_reviews(ArchivedJob.objects.all(), "worker"):
+        rating = ratings.setdefault(review["reviewee_id"], {"count": 0, "total": 0})
+        rating["count"] += 1
+        rating["total"] += review["rating"]
+    completed = {}
+    for jobs in (Job.objects, ArchivedJob.objects):
+        for worker_id, count in (
+            jobs.filter(status="completed", assigned_worker__isnull=False)
+            .values("assigned_worker_id").annotate(count=Count("id")).values_list("assigned_worker_id", "count")
+        ):
+            completed[worker_id] = completed.get(worker_id, 0) + count
+    rows = []
+    for worker in Worker.objects.only("id", "user_id", "location").iterator(chunk_size=2000):
+        rating = ratings.get(worker.user_id)
+        if rating is None and worker.id not in completed:
+            continue
+        rating_count = rating["count"] if rating else 0
+        rating_sum = rating["total"] if rating else 0
+        rows.append(WorkerRatingStats(
+            worker_id=worker.id,
+            location=worker.location or "",
+            rating_count=rating_count,
+            rating_sum=rating_sum,
+            completed_jobs=completed.get(worker.id, 0),
+            score=bayesian_score(rating_sum, rating_count),
+        ))
+    with transaction.atomic():
+        version = _next_version()
+        for row in rows:
+            row.version = version
+        WorkerRatingStats.objects.all().delete()
+        WorkerRatingStats.objects.bulk_create(rows, batch_size=500)
+        LeaderboardState.objects.filter(id=1).update(generation=F("generation") + 1)
+    return len(rows)
@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.archive import archivable_jobs, archive_jobs
+
+
+class Command(BaseCommand):
+    help = "Move completed and closed jobs, with their bids, reviews and payments, into the archive table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            required=True,
+            metavar="DAYS",
+            help="Archive jobs whose last update is older than this many days.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=500, help="Jobs moved per transaction.")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the jobs that would be archived.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["older_than"])
+
+        if options["dry_run"]:
+            count = archivable_jobs(cutoff).count()
+            self.stdout.write(f"{count} job(s) would be archived.")
+            return
+
+        total = 0
+        for moved in archive_jobs(cutoff, chunk_size=options["chunk_size"]):
+            total += moved
+            self.stdout.write(f"Archived {total} job(s)...")
+        self.stdout.write(self.style.SUCCESS(f"Archived {total} job(s) last updated before {cutoff:%Y-%m-%d}."))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.bidding import auto_award_jobs
+
+
+class Command(BaseCommand):
+    help = "Assign the best-ranked bid of every auto-award job whose bidding window has closed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Jobs loaded per query.")
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            metavar="SECONDS",
+            help="Keep running and award jobs every SECONDS seconds instead of once.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            awarded, skipped = auto_award_jobs(batch_size=options["batch_size"])
+            self.stdout.write(f"Awarded {awarded} job(s); skipped {skipped} already assigned.")
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,37 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from api.rollups import build_rollups, reset_rollups
+
+
+class Command(BaseCommand):
+    help = "Roll up job postings and worker hires for every complete day not yet processed."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--through",
+            type=date.fromisoformat,
+            metavar="YYYY-MM-DD",
+            help="Last day to roll up (default: yesterday).",
+        )
+        parser.add_argument("--days-per-batch", type=int, default=31, help="Days rolled up per transaction.")
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Drop all rollups and rebuild them from the first job.",
+        )
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            reset_rollups()
+            self.stdout.write("Existing rollups removed.")
+
+        batches = 0
+        for first_day, last_day in build_rollups(options["through"], options["days_per_batch"]):
+            batches += 1
+            self.stdout.write(f"Rolled up {first_day} to {last_day}.")
+        if not batches:
+            self.stdout.write("Rollups are already up to date.")
+        else:
+            self.stdout.write(self.style.SUCCESS("Rollups updated."))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.expiry import expire_jobs
+
+
+class Command(BaseCommand):
+    help = "Close open jobs whose expires_at has passed and mark their pending bids as ignored."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Jobs closed per transaction.")
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            metavar="SECONDS",
+            help="Keep running and expire jobs every SECONDS seconds instead of once.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            closed = expire_jobs(batch_size=options["batch_size"])
+            self.stdout.write(f"Closed {closed} expired job(s).")
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,38 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.imports import JobImportError, import_jobs, parse_file, summarize
+from api.models import User
+
+
+class Command(BaseCommand):
+    help = "Import jobs for a customer from a CSV (header line) or JSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="A .csv or .json file.")
+        parser.add_argument("--customer", required=True, help="Username of the customer posting the jobs.")
+        parser.add_argument("--dry-run", action="store_true", help="Validate and check duplicates without inserting.")
+        parser.add_argument("--show", type=int, default=50, help="Rejected rows printed; the rest are counted.")
+
+    def handle(self, *args, **options):
+        customer = User.objects.filter(username=options["customer"], is_customer=True).first()
+        if customer is None:
+            raise CommandError(f"No customer named {options['customer']!r}.")
+        path = Path(options["path"])
+        try:
+            results = import_jobs(customer, parse_file(path.name, path.read_bytes()), dry_run=options["dry_run"])
+        except (OSError, JobImportError) as exception:
+            raise CommandError(str(exception))
+
+        rejected = [result for result in results if result["status"] in ("duplicate", "invalid")]
+        for result in rejected[:options["show"]]:
+            detail = json.dumps(result["errors"]) if result["status"] == "invalid" else "already posted"
+            self.stdout.write(f"Row {result['row']}: {result['status']} ({detail})")
+
+        summary = summarize(results)
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary['created']} created, {summary['valid']} valid (dry run), "
+            f"{summary['duplicate']} duplicate, {summary['invalid']} invalid."
+        ))
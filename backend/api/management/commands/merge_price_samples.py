@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.pricing import merge_samples
+
+
+class Command(BaseCommand):
+    help = "Add the accepted bid amounts queued since the last run to the price guide sketches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Samples merged per transaction.")
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            metavar="SECONDS",
+            help="Keep running and merge every SECONDS seconds instead of once.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            merged = merge_samples(batch_size=options["batch_size"])
+            self.stdout.write(f"Merged {merged} accepted bid(s) into the price guide.")
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,76 @@
+import io
+import pstats
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import profiling
+
+
+class Command(BaseCommand):
+    help = "List, summarize and inspect request profiles captured by ProfilerMiddleware."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--route", help="Only profiles of this URL name.")
+        parser.add_argument("--limit", type=int, default=20, help="Number of profiles listed or combined.")
+        parser.add_argument("--summary", action="store_true", help="Count and timings per route.")
+        parser.add_argument(
+            "--stats",
+            nargs="*",
+            metavar="NAME",
+            help="Print the combined function statistics of the named profiles, or of the listed ones.",
+        )
+        parser.add_argument("--sort", default="cumulative", help="pstats sort key for --stats.")
+        parser.add_argument("--lines", type=int, default=30, help="Functions printed by --stats.")
+        parser.add_argument("--token", action="store_true", help="Print a value for the X-Profile request header.")
+        parser.add_argument("--clear", action="store_true", help="Delete every stored profile.")
+
+    def handle(self, *args, **options):
+        if options["token"]:
+            self.stdout.write(profiling.make_token())
+            return
+        if options["clear"]:
+            removed = profiling.prune(keep=0)
+            self.stdout.write(self.style.SUCCESS(f"Deleted {removed} profile(s)."))
+            return
+
+        profiles = profiling.captured(options["route"])
+        if options["summary"]:
+            self.summarize(profiles)
+        elif options["stats"] is not None:
+            self.print_stats(options["stats"] or [profile.name for profile in profiles[:options["limit"]]], options)
+        elif not profiles:
+            self.stdout.write(f"No profiles in {profiling.profile_dir()}.")
+        else:
+            for profile in profiles[:options["limit"]]:
+                self.stdout.write(
+                    f"{profile.captured_at:%Y-%m-%d %H:%M:%S}  {profile.method:<6} {profile.route:<24} "
+                    f"{profile.status}  {profile.milliseconds:>6} ms  {profile.name}"
+                )
+
+    def summarize(self, profiles):
+        by_route = {}
+        for profile in profiles:
+            by_route.setdefault(profile.route, []).append(profile.milliseconds)
+        if not by_route:
+            self.stdout.write("No profiles captured.")
+            return
+        self.stdout.write(f"{'route':<24} {'count':>6} {'avg ms':>8} {'max ms':>8}")
+        for route, timings in sorted(by_route.items(), key=lambda item: -sum(item[1])):
+            self.stdout.write(
+                f"{route:<24} {len(timings):>6} {sum(timings) / len(timings):>8.0f} {max(timings):>8}"
+            )
+
+    def print_stats(self, names, options):
+        if not names:
+            raise CommandError("No profiles to print.")
+        paths = []
+        for name in names:
+            path = profiling.profile_dir() / name
+            if not path.is_file():
+                raise CommandError(f"Profile {name} not found.")
+            paths.append(str(path))
+        # OutputWrapper ends every write with a newline, and pstats writes piecemeal
+        output = io.StringIO()
+        stats = pstats.Stats(*paths, stream=output)
+        stats.strip_dirs().sort_stats(options["sort"]).print_stats(options["lines"])
+        self.stdout.write(output.getvalue(), ending="")
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.purge import purge_deleted_jobs
+
+
+class Command(BaseCommand):
+    help = "Hard-delete soft-deleted jobs with their bids, reviews and payment, in small transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="Deleted jobs looked up per query.")
+        parser.add_argument("--chunk-size", type=int, default=500, help="Bids or reviews deleted per transaction.")
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            metavar="SECONDS",
+            help="Keep running and purge every SECONDS seconds instead of once.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            purged = purge_deleted_jobs(batch_size=options["batch_size"], chunk_size=options["chunk_size"])
+            self.stdout.write(f"Purged {purged} deleted job(s).")
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.earnings import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the monthly worker earnings rollup from completed payments and archived jobs."
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Earnings rebuilt: {count} worker month(s)."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.leaderboard import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the worker leaderboard stats from reviews and completed jobs."
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Leaderboard rebuilt for {count} worker(s)."))
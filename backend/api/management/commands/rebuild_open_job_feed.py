@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.feed import rebuild
+
+
+class Command(BaseCommand):
+    help = "Check the open job feed against the job, bid and review tables and repair any differences."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report differences; exit with an error if any are found.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Jobs compared per query.")
+
+    def handle(self, *args, **options):
+        missing, stale, orphaned = rebuild(fix=not options["verify"], chunk_size=options["chunk_size"])
+
+        self.stdout.write(f"Missing rows: {len(missing)}")
+        self.stdout.write(f"Stale rows: {len(stale)}")
+        self.stdout.write(f"Rows for jobs that are no longer open: {len(orphaned)}")
+
+        differences = len(missing) + len(stale) + len(orphaned)
+        if options["verify"]:
+            if differences:
+                raise CommandError(f"Open job feed differs from the source tables in {differences} row(s).")
+            self.stdout.write(self.style.SUCCESS("Open job feed matches the source tables."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Open job feed rebuilt; {differences} row(s) repaired."))
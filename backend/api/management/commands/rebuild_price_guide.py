@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.pricing import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the accepted-bid price sketches from selected bids and archived jobs."
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Price guide rebuilt: {count} bucket(s)."))
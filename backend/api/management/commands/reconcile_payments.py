@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+
+from api.reconcile import job_mismatches, repair_jobs, repair_wallets, wallet_mismatches
+
+
+class Command(BaseCommand):
+    help = "Check that completed payments, job statuses and worker wallet balances agree."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repair", action="store_true", help="Fix the mismatches found, one chunk at a time.")
+        parser.add_argument(
+            "--allow-decrease",
+            action="store_true",
+            help="Let --repair lower wallets that hold more than their completed payments.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Payments or workers per query and update.")
+        parser.add_argument("--show", type=int, default=50, help="Mismatches printed per check; the rest are counted.")
+
+    def handle(self, *args, **options):
+        chunk_size, repair, show = options["chunk_size"], options["repair"], options["show"]
+
+        found = repaired = 0
+        for mismatches in job_mismatches(chunk_size):
+            for mismatch in mismatches:
+                found += 1
+                if found <= show:
+                    self.stdout.write(
+                        f"Payment {mismatch.payment_id} is completed but job {mismatch.job_id} is {mismatch.job_status}."
+                    )
+            if repair:
+                repaired += repair_jobs(mismatches)
+        self.report("Jobs", found, repaired, repair)
+        if repaired:
+            self.stdout.write("Run `manage.py rebuild_leaderboard` to count the newly completed jobs.")
+
+        checked = found = repaired = 0
+        for workers, mismatches in wallet_mismatches(chunk_size):
+            checked += workers
+            for mismatch in mismatches:
+                found += 1
+                if found <= show:
+                    balance = "no wallet" if mismatch.balance is None else mismatch.balance
+                    self.stdout.write(
+                        f"Worker {mismatch.worker_id}: wallet {balance}, completed payments {mismatch.expected}."
+                    )
+            if repair and mismatches:
+                repaired += repair_wallets(mismatches, allow_decrease=options["allow_decrease"])
+        self.report(f"Wallets ({checked} workers checked)", found, repaired, repair)
+        if repair and repaired < found and not options["allow_decrease"]:
+            self.stdout.write(
+                "Wallets holding more than their completed payments were left as they are; "
+                "check them and rerun with --allow-decrease to lower them."
+            )
+
+    def report(self, label, found, repaired, repair):
+        if not found:
+            self.stdout.write(self.style.SUCCESS(f"{label}: no mismatches."))
+        elif repair:
+            self.stdout.write(self.style.SUCCESS(f"{label}: {found} mismatch(es), {repaired} repaired."))
+        else:
+            self.stdout.write(self.style.WARNING(f"{label}: {found} mismatch(es); rerun with --repair to fix them."))
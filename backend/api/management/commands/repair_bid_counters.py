@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.bidding import repair_bid_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute each job's bid count and lowest bid from its bids and repair any that drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report wrong counters; exit with an error if any are found.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Jobs checked per query and update.")
+        parser.add_argument("--show", type=int, default=50, help="Job ids printed; the rest are counted.")
+
+    def handle(self, *args, **options):
+        verify, show = options["verify"], options["show"]
+
+        checked = found = 0
+        for jobs, job_ids in repair_bid_counters(fix=not verify, chunk_size=options["chunk_size"]):
+            checked += jobs
+            for job_id in job_ids:
+                found += 1
+                if found <= show:
+                    self.stdout.write(f"Job {job_id}: bid counters did not match its bids.")
+
+        self.stdout.write(f"Jobs checked: {checked}")
+        if verify:
+            if found:
+                raise CommandError(f"{found} job(s) have wrong bid counters; rerun without --verify to fix them.")
+            self.stdout.write(self.style.SUCCESS("Bid counters match the bids."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Bid counters checked; {found} job(s) repaired."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.bidding import rescore_open_jobs
+
+
+class Command(BaseCommand):
+    help = "Re-score the pending bids on open jobs and recompute each job's best bid."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500, help="Jobs re-scored per transaction.")
+
+    def handle(self, *args, **options):
+        rescored = rescore_open_jobs(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Re-scored {rescored} bid(s)."))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from api.models import QueryFingerprint
+
+ORDERINGS = {
+    "total": F("total_ms").desc(),
+    "calls": F("calls").desc(),
+    "avg": (F("total_ms") / F("calls")).desc(),
+    "max": F("max_ms").desc(),
+}
+
+
+class Command(BaseCommand):
+    help = "Print the SQL fingerprints that took the most database time, per view."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=20, help="Number of fingerprints printed.")
+        parser.add_argument("--view", help="Only queries issued by this view (URL name).")
+        parser.add_argument("--order", choices=ORDERINGS, default="total", help="Sort by total, calls, avg or max time.")
+        parser.add_argument("--width", type=int, default=160, help="Truncate SQL to this many characters; 0 for all.")
+        parser.add_argument("--reset", action="store_true", help="Delete the collected statistics.")
+
+    def handle(self, *args, **options):
+        if options["reset"]:
+            deleted, _ = QueryFingerprint.objects.all().delete()
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} fingerprint(s)."))
+            return
+
+        fingerprints = QueryFingerprint.objects.order_by(ORDERINGS[options["order"]])
+        if options["view"]:
+            fingerprints = fingerprints.filter(view=options["view"])
+        fingerprints = list(fingerprints[:options["limit"]])
+        if not fingerprints:
+            self.stdout.write("No query statistics collected yet.")
+            return
+
+        self.stdout.write(f"{'total ms':>10} {'calls':>8} {'avg ms':>8} {'max ms':>8}  {'view':<24} sql")
+        for entry in fingerprints:
+            sql = entry.sql
+            if options["width"] and len(sql) > options["width"]:
+                sql = sql[:options["width"] - 3] + "..."
+            self.stdout.write(
+                f"{entry.total_ms:>10.1f} {entry.calls:>8} {entry.total_ms / entry.calls:>8.1f} "
+                f"{entry.max_ms:>8.1f}  {entry.view:<24} {sql}"
+            )
@@ -0,0 +1,104 @@
+import numpy as np
+
+
+def min_cost_assignment(cost):
+    """
+    Hungarian algorithm (shortest augmenting paths with potentials) for an
+    ``n x m`` cost matrix with ``n <= m``. Every row is matched to a distinct
+    column; returns the column index for each row. The inner scan over the
+    columns is vectorized, so a run costs ``O(n^2)`` NumPy operations of
+    length ``m``.
+    """
+    cost = np.asarray(cost, dtype=float)
+    n, m = cost.shape
+    if n > m:
+        raise ValueError("min_cost_assignment needs at least as many columns as rows.")
+
+    # 1-based as in the textbook formulation; column 0 is the virtual root
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    match = np.zeros(m + 1, dtype=np.int64)  # row matched to each column, 0 = free
+    way = np.zeros(m + 1, dtype=np.int64)
+
+    for row in range(1, n + 1):
+        match[0] = row
+        col = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[col] = True
+            current_row = match[col]
+            reduced = cost[current_row - 1] - u[current_row] - v[1:]
+            free = ~used[1:]
+            better = free & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = col
+
+            candidates = np.where(free, minv[1:], np.inf)
+            next_col = int(np.argmin(candidates)) + 1
+            delta = candidates[next_col - 1]
+
+            u[match[used]] += delta
+            v[used] -= delta
+            minv[~used] -= delta
+            col = next_col
+            if match[col] == 0:
+                break
+
+        # flip the augmenting path back to the root
+        while col:
+            previous = way[col]
+            match[col] = match[previous]
+            col = previous
+
+    assignment = np.empty(n, dtype=np.int64)
+    columns = np.nonzero(match[1:])[0]
+    assignment[match[1:][columns] - 1] = columns
+    return assignment
+
+
+def plan_assignments(job_ids, bids, capacity):
+    """
+    Picks at most one bid per job, and at most ``capacity[worker_id]`` jobs
+    per worker, so that as many jobs as possible are assigned at the lowest
+    total cost. ``bids`` is a list of ``(bid_id, job_id, worker_id, cost)``.
+    Returns ``{job_id: bid_id}`` for the jobs that could be assigned.
+    """
+    job_index = {job_id: i for i, job_id in enumerate(job_ids)}
+    bids = [bid for bid in bids if bid[1] in job_index and capacity.get(bid[2], 0) > 0]
+    if not bids:
+        return {}
+
+    # each worker becomes one column per job they can still take, capped by
+    # the number of jobs they bid on
+    bid_counts = {}
+    for _, _, worker_id, _ in bids:
+        bid_counts[worker_id] = bid_counts.get(worker_id, 0) + 1
+    slots = {}
+    columns = 0
+    for worker_id, count in bid_counts.items():
+        slots[worker_id] = (columns, min(count, capacity[worker_id]))
+        columns += slots[worker_id][1]
+
+    n = len(job_ids)
+    costs = np.array([bid[3] for bid in bids], dtype=float)
+    # leaving a job unassigned must cost more than any set of real bids, and a
+    # missing bid more than that, so the optimum assigns as many jobs as it can
+    unassigned = (np.abs(costs).max() + 1) * (n + 1)
+    matrix = np.full((n, columns + n), unassigned * 2)
+    matrix[np.arange(n), columns + np.arange(n)] = unassigned
+
+    rows = np.fromiter((job_index[bid[1]] for bid in bids), dtype=np.int64, count=len(bids))
+    starts = np.fromiter((slots[bid[2]][0] for bid in bids), dtype=np.int64, count=len(bids))
+    widths = np.fromiter((slots[bid[2]][1] for bid in bids), dtype=np.int64, count=len(bids))
+    bid_at = np.full((n, columns), -1, dtype=np.int64)
+    for offset in range(int(widths.max())):
+        has_slot = widths > offset
+        matrix[rows[has_slot], starts[has_slot] + offset] = costs[has_slot]
+        bid_at[rows[has_slot], starts[has_slot] + offset] = np.nonzero(has_slot)[0]
+
+    plan = {}
+    for row, column in enumerate(min_cost_assignment(matrix)):
+        if column < columns and bid_at[row, column] >= 0:
+            plan[job_ids[row]] = bids[bid_at[row, column]][0]
+    return plan
@@ -0,0 +1,135 @@
+import cProfile
+import math
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+from django.http import JsonResponse
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+
+from . import profiling, querylog, throttling
+from .routers import pin_to_primary
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pins a user's reads to the primary database after a successful write.
+    DRF authenticates inside the view and copies the user onto the Django
+    request, so ``request.user`` is the JWT user by the time the response
+    comes back.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated:
+                pin_to_primary(user.pk)
+        return response
+
+
+class ThrottleMiddleware:
+    """
+    Rejects requests over their ``THROTTLE_RATES`` limit before the view,
+    authentication or any query runs. The limit is chosen by URL name and by
+    the role claim in the access token.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return self.get_response(request)
+        # the admin site uses session logins and is only open to staff
+        if match.namespace == "admin":
+            return self.get_response(request)
+
+        wait = throttling.check(match.url_name, request)
+        if wait:
+            retry_after = math.ceil(wait)
+            response = JsonResponse(
+                {
+                    "success": False,
+                    "statusCode": 429,
+                    "message": f"Too many requests. Try again in {retry_after} second(s).",
+                },
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+            )
+            response["Retry-After"] = str(retry_after)
+            return response
+        return self.get_response(request)
+
+
+class ProfilerMiddleware:
+    """
+    Runs a ``PROFILE_SAMPLE_RATE`` fraction of requests, and every request
+    with a valid signed ``X-Profile`` header, under cProfile and stores one
+    ``.pstats`` file per request (see ``manage.py profiles``). Listed first
+    so the other middleware, JWT handling included, shows up in the profile.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        on_request = profiling.requested(request)
+        if not (on_request or profiling.sampled()) or not profiling.acquire():
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        try:
+            started = time.perf_counter()
+            try:
+                profiler.enable()
+            except ValueError:
+                # another profiling tool (a debugger, coverage) owns the hook
+                return self.get_response(request)
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            seconds = time.perf_counter() - started
+
+            # a streamed response is still running; its profile would only cover the setup
+            if not response.streaming:
+                match = getattr(request, "resolver_match", None)
+                name = profiling.save(
+                    profiler, match.view_name if match else None, request.method, response.status_code, seconds,
+                )
+                if on_request:
+                    response["X-Profile-Id"] = name
+            return response
+        finally:
+            profiling.release()
+
+
+class QueryLogMiddleware:
+    """
+    Times every query a request makes, per SQL fingerprint and view, and
+    logs slow ones with their plan (``api.querylog``). The totals are added
+    to the database every ``QUERY_LOG_FLUSH_INTERVAL`` seconds.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not querylog.enabled():
+            return self.get_response(request)
+
+        recorder = querylog.QueryRecorder(request)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        if querylog.flush_due():
+            querylog.flush()
+        return response
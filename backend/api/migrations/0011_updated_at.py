@@ -0,0 +1,33 @@
+# Generated by Django 5.2.2 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_review_review_type_review_reviewee_alter_review_job_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bid',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='worker',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
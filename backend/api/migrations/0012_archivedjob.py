@@ -0,0 +1,36 @@
+# Generated by Django 5.2.2 on 2026-10-19 04:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedJob',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=100)),
+                ('location', models.CharField(max_length=100)),
+                ('budget', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('status', models.CharField(max_length=20)),
+                ('payment_amount', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('payment_status', models.CharField(blank=True, max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('payload', models.JSONField(default=dict)),
+                ('assigned_worker', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_jobs', to='api.worker')),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['customer', '-created_at'], name='api_archive_custome_8884f7_idx'), models.Index(fields=['assigned_worker', '-created_at'], name='api_archive_assigne_d7aa97_idx')],
+            },
+        ),
+    ]
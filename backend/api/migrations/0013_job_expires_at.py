@@ -0,0 +1,22 @@
+# Generated by Django 5.2.2 on 2026-10-19 04:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_archivedjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'expires_at'], name='api_job_status_8e0345_idx'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.2 on 2026-10-19 04:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_feed(apps, schema_editor):
+    Job = apps.get_model('api', 'Job')
+    OpenJobFeed = apps.get_model('api', 'OpenJobFeed')
+    Review = apps.get_model('api', 'Review')
+
+    ratings = {
+        row['reviewee_id']: round(row['rating'], 2)
+        for row in Review.objects.filter(review_type='customer')
+        .values('reviewee_id').annotate(rating=models.Avg('rating'))
+    }
+    entries = []
+    for job in Job.objects.filter(status='open').select_related('assigned_worker__user').annotate(num_bids=models.Count('bids')):
+        worker = job.assigned_worker
+        picture = (worker.profile_picture or worker.user.profile_picture) if worker else None
+        entries.append(OpenJobFeed(
+            job_id=job.id,
+            customer_id=job.customer_id,
+            title=job.title,
+            description=job.description,
+            location=job.location,
+            budget=job.budget,
+            urgency=job.urgency,
+            status=job.status,
+            created_at=job.created_at,
+            expires_at=job.expires_at,
+            bid_count=job.num_bids,
+            customer_rating=ratings.get(job.customer_id),
+            assigned_worker_id=worker.id if worker else None,
+            assigned_worker_username=worker.user.username if worker else '',
+            assigned_worker_skills=worker.skills if worker else '',
+            assigned_worker_experience=worker.experience if worker else None,
+            assigned_worker_location=worker.location if worker else None,
+            assigned_worker_picture=picture.name if picture else '',
+        ))
+    OpenJobFeed.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_job_expires_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OpenJobFeed',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feed_entry', serialize=False, to='api.job')),
+                ('title', models.CharField(max_length=100)),
+                ('description', models.TextField(max_length=255)),
+                ('location', models.CharField(max_length=100)),
+                ('budget', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('urgency', models.PositiveSmallIntegerField(default=1)),
+                ('status', models.CharField(default='open', max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('bid_count', models.PositiveIntegerField(default=0)),
+                ('customer_rating', models.DecimalField(blank=True, decimal_places=2, max_digits=3, null=True)),
+                ('assigned_worker_id', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('assigned_worker_username', models.CharField(blank=True, max_length=150)),
+                ('assigned_worker_skills', models.TextField(blank=True)),
+                ('assigned_worker_experience', models.PositiveIntegerField(blank=True, null=True)),
+                ('assigned_worker_location', models.TextField(blank=True, max_length=100, null=True)),
+                ('assigned_worker_picture', models.CharField(blank=True, max_length=100)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(populate_feed, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.2 on 2026-10-19 04:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_selected_at(apps, schema_editor):
+    # selection time was not recorded before; the bid's last update is the closest value
+    Bid = apps.get_model('api', 'Bid')
+    Bid.objects.filter(status='selected').update(selected_at=models.F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_openjobfeed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyJobPostingRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('title', models.CharField(max_length=100)),
+                ('location', models.CharField(max_length=100)),
+                ('postings', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyWorkerHireRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('hires', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='JobPostingTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=100, unique=True)),
+                ('postings', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RollupState',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('last_day', models.DateField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='WorkerHireTotal',
+            fields=[
+                ('worker', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='hire_total', serialize=False, to='api.worker')),
+                ('hires', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='bid',
+            name='selected_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['created_at'], name='api_job_created_f81cf5_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyjobpostingrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'title', 'location'), name='unique_daily_job_posting'),
+        ),
+        migrations.AddField(
+            model_name='dailyworkerhirerollup',
+            name='worker',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_hires', to='api.worker'),
+        ),
+        migrations.AddIndex(
+            model_name='jobpostingtotal',
+            index=models.Index(fields=['-postings'], name='api_jobpost_posting_97e9af_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workerhiretotal',
+            index=models.Index(fields=['-hires'], name='api_workerh_hires_67f349_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyworkerhirerollup',
+            constraint=models.UniqueConstraint(fields=('day', 'worker'), name='unique_daily_worker_hire'),
+        ),
+        migrations.RunPython(backfill_selected_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.2 on 2026-10-19 05:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_stats(apps, schema_editor):
+    Job = apps.get_model('api', 'Job')
+    Review = apps.get_model('api', 'Review')
+    Worker = apps.get_model('api', 'Worker')
+    WorkerRatingStats = apps.get_model('api', 'WorkerRatingStats')
+
+    weight = getattr(settings, 'LEADERBOARD_PRIOR_WEIGHT', 5)
+    mean = getattr(settings, 'LEADERBOARD_PRIOR_MEAN', 3.5)
+    ratings = {
+        row['reviewee_id']: row
+        for row in Review.objects.filter(review_type='worker')
+        .values('reviewee_id').annotate(count=models.Count('id'), total=models.Sum('rating'))
+    }
+    completed = dict(
+        Job.objects.filter(status='completed', assigned_worker__isnull=False)
+        .values('assigned_worker_id').annotate(count=models.Count('id')).values_list('assigned_worker_id', 'count')
+    )
+    rows = []
+    for worker in Worker.objects.all():
+        rating = ratings.get(worker.user_id)
+        if rating is None and worker.id not in completed:
+            continue
+        rating_count = rating['count'] if rating else 0
+        rating_sum = rating['total'] if rating else 0
+        rows.append(WorkerRatingStats(
+            worker_id=worker.id,
+            location=worker.location or '',
+            rating_count=rating_count,
+            rating_sum=rating_sum,
+            completed_jobs=completed.get(worker.id, 0),
+            score=round((weight * mean + rating_sum) / (weight + rating_count), 6),
+        ))
+    WorkerRatingStats.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_reporting_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkerRatingStats',
+            fields=[
+                ('worker', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_stats', serialize=False, to='api.worker')),
+                ('location', models.CharField(blank=True, default='', max_length=100)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('completed_jobs', models.PositiveIntegerField(default=0)),
+                ('score', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-score', '-completed_jobs'], name='api_workerr_score_70700c_idx'), models.Index(fields=['location', '-score', '-completed_jobs'], name='api_workerr_locatio_03c6a9_idx')],
+            },
+        ),
+        migrations.RunPython(populate_stats, migrations.RunPython.noop),
+    ]
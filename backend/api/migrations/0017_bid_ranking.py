@@ -0,0 +1,33 @@
+# Generated by Django 5.2.2 on 2026-10-19 05:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_worker_leaderboard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bid',
+            name='rank_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='auto_award',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='best_bid',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.bid'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['auto_award', 'status', 'expires_at'], name='api_job_auto_aw_50568e_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.2 on 2026-10-19 05:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_bid_ranking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueryFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view', models.CharField(max_length=200)),
+                ('fingerprint', models.CharField(max_length=40)),
+                ('sql', models.TextField()),
+                ('calls', models.PositiveBigIntegerField(default=0)),
+                ('total_ms', models.FloatField(default=0)),
+                ('max_ms', models.FloatField(default=0)),
+                ('first_seen', models.DateTimeField(auto_now_add=True)),
+                ('last_seen', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-total_ms'], name='api_queryfi_total_m_878992_idx')],
+                'constraints': [models.UniqueConstraint(fields=('view', 'fingerprint'), name='unique_query_fingerprint')],
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.2 on 2026-10-19 05:23
+
+import django.db.models.deletion
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models.functions import TruncMonth
+
+
+def populate_earnings(apps, schema_editor):
+    ArchivedJob = apps.get_model('api', 'ArchivedJob')
+    MonthlyWorkerEarnings = apps.get_model('api', 'MonthlyWorkerEarnings')
+    Payment = apps.get_model('api', 'Payment')
+
+    # payments completed before completed_at existed: the last update is the best guess
+    Payment.objects.filter(status='completed', completed_at__isnull=True).update(completed_at=models.F('updated_at'))
+
+    totals = {}
+    sources = [
+        Payment.objects.filter(status='completed', job__assigned_worker__isnull=False)
+        .annotate(month=TruncMonth('completed_at', output_field=models.DateField()))
+        .values('job__assigned_worker_id', 'month')
+        .annotate(count=models.Count('id'), total=models.Sum('amount'))
+        .values_list('job__assigned_worker_id', 'month', 'count', 'total'),
+        ArchivedJob.objects.filter(payment_status='completed', assigned_worker__isnull=False)
+        .annotate(month=TruncMonth('updated_at', output_field=models.DateField()))
+        .values('assigned_worker_id', 'month')
+        .annotate(count=models.Count('id'), total=models.Sum('payment_amount'))
+        .values_list('assigned_worker_id', 'month', 'count', 'total'),
+    ]
+    for rows in sources:
+        for worker_id, month, count, total in rows:
+            payments, amount = totals.get((worker_id, month), (0, Decimal('0')))
+            totals[(worker_id, month)] = (payments + count, amount + (total or 0))
+    MonthlyWorkerEarnings.objects.bulk_create(
+        [
+            MonthlyWorkerEarnings(worker_id=worker_id, month=month, payments=payments, amount=amount)
+            for (worker_id, month), (payments, amount) in totals.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_query_fingerprints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='MonthlyWorkerEarnings',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('payments', models.PositiveIntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('worker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_earnings', to='api.worker')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('worker', 'month'), name='unique_worker_month_earnings')],
+            },
+        ),
+        migrations.RunPython(populate_earnings, migrations.RunPython.noop),
+    ]
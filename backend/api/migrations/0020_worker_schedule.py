@@ -0,0 +1,49 @@
+# Generated by Django 5.2.2 on 2026-10-19 05:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_worker_earnings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='ends_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='starts_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='WorkerAvailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('starts_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField()),
+                ('worker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability', to='api.worker')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['starts_at'], name='api_workera_starts__8e26ad_idx'), models.Index(fields=['worker', 'starts_at'], name='api_workera_worker__6e3038_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('ends_at__gt', models.F('starts_at'))), name='availability_ends_after_start')],
+            },
+        ),
+        migrations.CreateModel(
+            name='WorkerBooking',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='booking', serialize=False, to='api.job')),
+                ('starts_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField()),
+                ('worker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='api.worker')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['starts_at'], name='api_workerb_starts__497530_idx'), models.Index(fields=['worker', 'starts_at'], name='api_workerb_worker__0f95fe_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.2 on 2026-10-19 05:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_worker_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('location', models.CharField(blank=True, default='', max_length=100)),
+                ('keyword', models.CharField(blank=True, default='', max_length=50)),
+                ('samples', models.PositiveIntegerField(default=0)),
+                ('sketch', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('location', 'keyword'), name='unique_price_sketch_bucket')],
+            },
+        ),
+    ]
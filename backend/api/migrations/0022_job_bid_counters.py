@@ -0,0 +1,62 @@
+# Generated by Django 5.2.2 on 2026-10-19 05:36
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    Bid = apps.get_model('api', 'Bid')
+    Job = apps.get_model('api', 'Job')
+    OpenJobFeed = apps.get_model('api', 'OpenJobFeed')
+
+    bids = Bid.objects.filter(job=models.OuterRef('pk')).order_by().values('job')
+    Job.objects.update(
+        bid_count=Coalesce(models.Subquery(bids.annotate(count=models.Count('pk')).values('count')), 0),
+        lowest_bid=models.Subquery(bids.annotate(lowest=models.Min('bid_amount')).values('lowest')),
+    )
+    feed_bids = Bid.objects.filter(job=models.OuterRef('job')).order_by().values('job')
+    OpenJobFeed.objects.update(
+        lowest_bid=models.Subquery(feed_bids.annotate(lowest=models.Min('bid_amount')).values('lowest')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_price_sketches'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='bid_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='lowest_bid',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='openjobfeed',
+            name='lowest_bid',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'bid_count'], name='api_job_status_714a4d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'lowest_bid'], name='api_job_status_ba2386_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='openjobfeed',
+            index=models.Index(fields=['bid_count', 'job'], name='api_openjob_bid_cou_15fe50_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='openjobfeed',
+            index=models.Index(fields=['lowest_bid', 'job'], name='api_openjob_lowest__e9f3bf_idx'),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.2 on 2026-10-19 05:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_job_bid_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='job_deleted_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.2 on 2026-10-19 05:58
+
+from django.db import migrations, models
+
+
+def create_state(apps, schema_editor):
+    LeaderboardState = apps.get_model('api', 'LeaderboardState')
+    LeaderboardState.objects.get_or_create(id=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_job_soft_delete'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('generation', models.PositiveIntegerField(default=0)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='workerratingstats',
+            name='version',
+            field=models.PositiveBigIntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(create_state, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.2 on 2026-10-19 11:40
+
+from django.db import migrations, models
+
+
+def populate_completed_at(apps, schema_editor):
+    ArchivedJob = apps.get_model('api', 'ArchivedJob')
+    # archived before completed_at was kept: the job's last update is the best guess,
+    # which is also where the earnings rollup already counted the payment
+    ArchivedJob.objects.filter(payment_status='completed').update(payment_completed_at=models.F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_price_sample'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedjob',
+            name='payment_completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(populate_completed_at, migrations.RunPython.noop),
+    ]
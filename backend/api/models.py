@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from rest_framework.utils.encoders import JSONEncoder
 
 # ==================================== User model =================================
 class User(AbstractUser):
@@ -32,11 +33,18 @@ class Worker(models.Model):
     nid = models.CharField(max_length=20, blank=True, null=True)
     verified = models.BooleanField(default=False)
     profile_picture = models.ImageField(upload_to="profile_pic_worker/", blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.user.username
 
 # ==================================== Job model =================================
+class ActiveJobManager(models.Manager):
+    # soft-deleted jobs are invisible everywhere; `manage.py purge_deleted_jobs` removes them
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Job(models.Model):
     STATUS_CHOICE = [
         ("open", "Open"),
@@ -60,10 +68,81 @@ class Job(models.Model):
     urgency = models.PositiveSmallIntegerField(default=1)
     status = models.CharField(max_length=20, choices=STATUS_CHOICE, default="open")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # open jobs past this time are closed by `manage.py expire_jobs`
+    expires_at = models.DateTimeField(null=True, blank=True)
+    # highest-ranked pending bid, kept up to date by `api.bidding` as bids arrive
+    best_bid = models.ForeignKey('Bid', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    # award the best bid at expires_at instead of closing the job (`manage.py auto_award_jobs`)
+    auto_award = models.BooleanField(default=False)
+    # when the work is scheduled; the assigned worker is booked for this window (`api.schedule`)
+    starts_at = models.DateTimeField(null=True, blank=True)
+    ends_at = models.DateTimeField(null=True, blank=True)
+    # bids placed and the lowest amount bid; only ever written with F() updates by `api.bidding`
+    bid_count = models.PositiveIntegerField(default=0)
+    lowest_bid = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    # set by JobDeleteView; the job and its rows are hard-deleted later by `api.purge`
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ActiveJobManager()
+    all_objects = models.Manager()
+
+    # written only by `api.bidding`, with update() as bids come and go
+    BIDDING_FIELDS = ("best_bid", "bid_count", "lowest_bid")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "expires_at"]),
+            models.Index(fields=["created_at"]),
+            models.Index(fields=["auto_award", "status", "expires_at"]),
+            models.Index(fields=["status", "bid_count"]),
+            models.Index(fields=["status", "lowest_bid"]),
+            models.Index(fields=["deleted_at"], condition=models.Q(deleted_at__isnull=False), name="job_deleted_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # a copy loaded before a bid came in must not write its stale bid columns back
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.BIDDING_FIELDS
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
 
+# ==================================== Worker schedule =============================
+# Intervals are at most SCHEDULE_MAX_SPAN_DAYS long, so an overlap search only
+# has to scan the starts_at index from (window start - max span) to the window end.
+class WorkerAvailability(models.Model):
+    worker = models.ForeignKey(Worker, on_delete=models.CASCADE, related_name="availability")
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["starts_at"]),
+            models.Index(fields=["worker", "starts_at"]),
+        ]
+        constraints = [
+            models.CheckConstraint(condition=models.Q(ends_at__gt=models.F("starts_at")), name="availability_ends_after_start"),
+        ]
+
+
+class WorkerBooking(models.Model):
+    """The scheduled window of an assigned job, kept in step with the job by ``api.schedule``."""
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name="booking")
+    worker = models.ForeignKey(Worker, on_delete=models.CASCADE, related_name="bookings")
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["starts_at"]),
+            models.Index(fields=["worker", "starts_at"]),
+        ]
+
 # ==================================== Bid model =================================
 class Bid(models.Model):
     STATUS_CHOICE = [
@@ -77,6 +156,10 @@ class Bid(models.Model):
     bid_amount = models.DecimalField(max_digits=10, decimal_places=2)
     timestamp = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICE, default="not_selected")
+    updated_at = models.DateTimeField(auto_now=True)
+    selected_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    rank_score = models.FloatField(null=True, blank=True)
+
     def __str__(self):
         return f"{self.worker.user.username} -> {self.job.title}"
 
@@ -98,6 +181,9 @@ class Payment(models.Model):
     method = models.CharField(max_length=20, choices=METHOD_CHOICE)
     status = models.CharField(max_length=20, choices=STATUS_CHOICE, default="pending")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # set by release_funds; earnings statements count a payment in the month it completed
+    completed_at = models.DateTimeField(null=True, blank=True, db_index=True)
 
     def __str__(self):
         return f"{self.job.title} - {self.method}"
@@ -106,6 +192,21 @@ class WorkerWallet(models.Model):
     worker = models.OneToOneField(Worker, on_delete=models.CASCADE)
     balance = models.DecimalField(max_digits=10, decimal_places=2, default=0.0)
 
+class MonthlyWorkerEarnings(models.Model):
+    """
+    Completed payments per worker and calendar month, added to by
+    ``release_funds``. ``month`` is the first day of the month.
+    """
+    worker = models.ForeignKey(Worker, on_delete=models.CASCADE, related_name="monthly_earnings")
+    month = models.DateField()
+    payments = models.PositiveIntegerField(default=0)
+    amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["worker", "month"], name="unique_worker_month_earnings"),
+        ]
+
 # ==================================== Review model =================================
 class Review(models.Model):
     REVIEW_TYPE_CHOICES = [
@@ -123,3 +224,233 @@ class Review(models.Model):
 
     def __str__(self):
         return f"Review by {self.reviewer.username} for {self.reviewee.username} ({self.review_type})"
+
+# ==================================== Archived job model ============================
+class ArchivedJob(models.Model):
+    # primary key is the id the job had in the live table
+    id = models.BigIntegerField(primary_key=True)
+    customer = models.ForeignKey(User, on_delete=models.CASCADE, related_name="archived_jobs")
+    assigned_worker = models.ForeignKey(
+        Worker,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="archived_jobs",
+    )
+    title = models.CharField(max_length=100)
+    location = models.CharField(max_length=100)
+    budget = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(max_length=20)
+    payment_amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    payment_status = models.CharField(max_length=20, blank=True)
+    payment_completed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    # description, bids, reviews and payment as they were when archived
+    payload = models.JSONField(default=dict)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["customer", "-created_at"]),
+            models.Index(fields=["assigned_worker", "-created_at"]),
+        ]
+
+    def __str__(self):
+        return self.title
+
+# ==================================== Open job feed model ============================
+class OpenJobFeed(models.Model):
+    """
+    Denormalized copy of the open jobs shown to workers, kept in step with
+    the job, bid, review and assignment write paths by ``api.feed``.
+    """
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name="feed_entry")
+    customer = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    title = models.CharField(max_length=100)
+    description = models.TextField(max_length=255)
+    location = models.CharField(max_length=100)
+    budget = models.DecimalField(max_digits=10, decimal_places=2)
+    urgency = models.PositiveSmallIntegerField(default=1)
+    status = models.CharField(max_length=20, default="open")
+    created_at = models.DateTimeField()
+    expires_at = models.DateTimeField(null=True, blank=True)
+    bid_count = models.PositiveIntegerField(default=0)
+    lowest_bid = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    customer_rating = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True)
+    assigned_worker_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    assigned_worker_username = models.CharField(max_length=150, blank=True)
+    assigned_worker_skills = models.TextField(blank=True)
+    assigned_worker_experience = models.PositiveIntegerField(null=True, blank=True)
+    assigned_worker_location = models.TextField(max_length=100, blank=True, null=True)
+    assigned_worker_picture = models.CharField(max_length=100, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["bid_count", "job"]),
+            models.Index(fields=["lowest_bid", "job"]),
+        ]
+
+    def __str__(self):
+        return self.title
+
+# ==================================== Reporting rollups ============================
+class DailyJobPostingRollup(models.Model):
+    day = models.DateField()
+    title = models.CharField(max_length=100)
+    location = models.CharField(max_length=100)
+    postings = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "title", "location"], name="unique_daily_job_posting"),
+        ]
+
+
+class DailyWorkerHireRollup(models.Model):
+    day = models.DateField()
+    worker = models.ForeignKey(Worker, on_delete=models.CASCADE, related_name="daily_hires")
+    hires = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "worker"], name="unique_daily_worker_hire"),
+        ]
+
+
+class JobPostingTotal(models.Model):
+    title = models.CharField(max_length=100, unique=True)
+    postings = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-postings"]),
+        ]
+
+
+class WorkerHireTotal(models.Model):
+    worker = models.OneToOneField(Worker, on_delete=models.CASCADE, primary_key=True, related_name="hire_total")
+    hires = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-hires"]),
+        ]
+
+
+class RollupState(models.Model):
+    # last fully rolled-up day per rollup, so each run only processes new days
+    name = models.CharField(max_length=50, primary_key=True)
+    last_day = models.DateField(null=True, blank=True)
+
+# ==================================== Worker leaderboard ============================
+class WorkerRatingStats(models.Model):
+    """
+    Running review totals per worker, updated by ``api.leaderboard`` when a
+    review is posted or a job is completed. ``score`` is the Bayesian average.
+    """
+    worker = models.OneToOneField(Worker, on_delete=models.CASCADE, primary_key=True, related_name="rating_stats")
+    location = models.CharField(max_length=100, blank=True, default="")
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    completed_jobs = models.PositiveIntegerField(default=0)
+    score = models.FloatField(default=0)
+    # LeaderboardState.version when the row last changed
+    version = models.PositiveBigIntegerField(default=0, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-score", "-completed_jobs"]),
+            models.Index(fields=["location", "-score", "-completed_jobs"]),
+        ]
+
+
+class LeaderboardState(models.Model):
+    """
+    A single row. ``version`` is bumped by every change to the stats and
+    stamped on the changed row, so a process brings its in-memory board up
+    to date by reading the rows above the version it has. ``rebuild`` bumps
+    ``generation`` and every board is reloaded.
+    """
+    generation = models.PositiveIntegerField(default=0)
+    version = models.PositiveBigIntegerField(default=0)
+
+# ==================================== Price guidance ============================
+class PriceSketch(models.Model):
+    """
+    KLL quantile sketch of accepted bid amounts for one bucket of jobs,
+    added to by ``api.pricing`` when a bid is selected. An empty
+    ``location`` or ``keyword`` covers every location or every title.
+    """
+    location = models.CharField(max_length=100, blank=True, default="")
+    keyword = models.CharField(max_length=50, blank=True, default="")
+    samples = models.PositiveIntegerField(default=0)
+    sketch = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["location", "keyword"], name="unique_price_sketch_bucket"),
+        ]
+
+
+class PriceSample(models.Model):
+    """
+    An accepted bid amount waiting to be added to the price sketches by
+    ``manage.py merge_price_samples``. Selecting a bid only inserts one of
+    these, so assignments never wait on each other for the shared sketches.
+    """
+    title = models.CharField(max_length=100)
+    location = models.CharField(max_length=100, blank=True, default="")
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+# ==================================== Query statistics ============================
+class QueryFingerprint(models.Model):
+    """
+    Running totals for one normalized SQL statement issued by one view,
+    flushed periodically by ``api.querylog``. Read by ``manage.py top_queries``.
+    """
+    view = models.CharField(max_length=200)
+    fingerprint = models.CharField(max_length=40)
+    sql = models.TextField()
+    calls = models.PositiveBigIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["view", "fingerprint"], name="unique_query_fingerprint"),
+        ]
+        indexes = [
+            models.Index(fields=["-total_ms"]),
+        ]
+
+# ==================================== Idempotency keys ============================
+class IdempotencyKey(models.Model):
+    """
+    One ``Idempotency-Key`` per user, claimed by the first request that
+    carries it and holding its response once it finishes. The unique
+    constraint makes the claim atomic across worker processes. Rows older
+    than IDEMPOTENCY_KEY_TTL are removed by ``manage.py purge_idempotency_keys``.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    key = models.CharField(max_length=64)  # sha256 of the header value
+    fingerprint = models.CharField(max_length=64)
+    # another request may take the claim over once this passes
+    locked_until = models.DateTimeField()
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response = models.JSONField(null=True, blank=True, encoder=JSONEncoder)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key"], name="unique_idempotency_key"),
+        ]
+        indexes = [
+            models.Index(fields=["created_at"]),
+        ]
@@ -0,0 +1,191 @@
+import re
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .leaderboard import location_key
+from .models import ArchivedJob, Bid, PriceSample, PriceSketch
+from .sketches import KLLSketch
+
+MAX_KEYWORDS = 5
+QUANTILES = (0.25, 0.5, 0.75)
+STOP_WORDS = {
+    "and", "for", "the", "with", "from", "into", "need", "needed", "want", "job", "work", "urgent", "help",
+    "new", "our", "your", "some",
+}
+
+_WORD = re.compile(r"[^\W\d_]{3,}")
+
+# most specific first; "" in a bucket means every location or every title
+BASES = ("location_keywords", "location", "keywords", "all")
+
+
+def keywords(title):
+    """Up to ``MAX_KEYWORDS`` distinct words of a title, in order, lowercased."""
+    found = []
+    for word in _WORD.findall((title or "").lower()):
+        if word not in STOP_WORDS and word not in found:
+            found.append(word[:50])
+            if len(found) == MAX_KEYWORDS:
+                break
+    return found
+
+
+def buckets(title, location):
+    """``{basis: [(location, keyword), ...]}`` for a job's title and location."""
+    location, words = location_key(location)[:100], keywords(title)
+    return {
+        "location_keywords": [(location, word) for word in words] if location else [],
+        "location": [(location, "")] if location else [],
+        "keywords": [("", word) for word in words],
+        "all": [("", "")],
+    }
+
+
+def _matching(keys):
+    query = Q(pk__in=[])
+    for location, keyword in keys:
+        query |= Q(location=location, keyword=keyword)
+    return PriceSketch.objects.filter(query)
+
+
+def min_samples():
+    return getattr(settings, "PRICE_GUIDE_MIN_SAMPLES", 5)
+
+
+# ======================================== Write path ==================================
+def bid_selected(title, location, amount):
+    """
+    Queues an accepted bid amount for the sketches. Called by ``assign_bid``
+    inside its transaction. An insert takes no lock another assignment waits
+    on, whereas updating the sketches directly would serialize every
+    assignment on the "all jobs" bucket.
+    """
+    PriceSample.objects.create(title=title[:100], location=location[:100], amount=amount)
+
+
+def _add_to_sketches(amounts):
+    """Adds ``{(location, keyword): [amount, ...]}`` to the sketches, creating missing buckets."""
+    keys = set(amounts)
+    existing = set(_matching(keys).values_list("location", "keyword"))
+    PriceSketch.objects.bulk_create(
+        [PriceSketch(location=location, keyword=keyword) for location, keyword in keys - existing],
+        ignore_conflicts=True,
+    )
+    # every row exists by now, so they are all locked in one query, in id order, and two merges cannot deadlock
+    sketches = list(_matching(keys).select_for_update().order_by("id"))
+
+    now = timezone.now()
+    for sketch in sketches:
+        kll = KLLSketch.from_dict(sketch.sketch)
+        for amount in amounts[(sketch.location, sketch.keyword)]:
+            kll.add(amount)
+        sketch.sketch, sketch.samples, sketch.updated_at = kll.to_dict(), kll.count, now
+    PriceSketch.objects.bulk_update(sketches, ["sketch", "samples", "updated_at"])
+
+
+def merge_samples(batch_size=1000):
+    """
+    Adds queued samples to the sketches and deletes them, ``batch_size`` per
+    transaction. Concurrent runs skip each other's locked samples. Returns
+    the number merged.
+    """
+    merged = 0
+    while True:
+        with transaction.atomic():
+            samples = list(
+                PriceSample.objects.select_for_update(skip_locked=True).order_by("id")
+                .values_list("id", "title", "location", "amount")[:batch_size]
+            )
+            if not samples:
+                return merged
+            amounts = {}
+            for _, title, location, amount in samples:
+                for group in buckets(title, location).values():
+                    for key in group:
+                        amounts.setdefault(key, []).append(amount)
+            _add_to_sketches(amounts)
+            PriceSample.objects.filter(id__in=[sample[0] for sample in samples]).delete()
+        merged += len(samples)
+
+
+# ======================================== Reads ==================================
+def guide(title, location):
+    """
+    p25/p50/p75 of accepted bids for jobs like this one, from the most
+    specific basis with at least ``PRICE_GUIDE_MIN_SAMPLES`` bids: same
+    location and title keywords, same location, same keywords, then all
+    jobs. Keyword sketches are merged, so a job sharing several keywords
+    weighs more. One query for a bounded number of rows, whatever the
+    number of bids. Bids selected since the last ``merge_samples`` are not
+    counted yet.
+    """
+    groups = buckets(title, location)
+    rows = {
+        (location, keyword): sketch
+        for location, keyword, sketch in _matching({key for group in groups.values() for key in group})
+        .values_list("location", "keyword", "sketch")
+    }
+
+    best = None
+    for basis in BASES:
+        merged = KLLSketch()
+        for key in groups[basis]:
+            if key in rows:
+                merged.merge(KLLSketch.from_dict(rows[key]))
+        if merged.count >= min_samples():
+            best = (basis, merged)
+            break
+        if merged.count and (best is None or merged.count > best[1].count):
+            best = (basis, merged)
+
+    if best is None:
+        return {"basis": None, "samples": 0, "p25": None, "p50": None, "p75": None}
+    basis, merged = best
+    p25, p50, p75 = (
+        Decimal(value).quantize(Decimal("0.01")) if value is not None else None
+        for value in merged.quantiles(QUANTILES)
+    )
+    return {"basis": basis, "samples": merged.count, "p25": p25, "p50": p50, "p75": p75}
+
+
+# ======================================== Rebuild ==================================
+def _accepted_bids(chunk_size=2000):
+    # (title, location, amount) of every selected bid, archived jobs included
+    yield from (
+        Bid.objects.filter(status="selected")
+        .values_list("job__title", "job__location", "bid_amount")
+        .iterator(chunk_size=chunk_size)
+    )
+    for title, location, payload in (
+        ArchivedJob.objects.values_list("title", "location", "payload").iterator(chunk_size=chunk_size)
+    ):
+        for bid in payload.get("bids", []):
+            if bid.get("status") == "selected":
+                yield title, location, bid["bid_amount"]
+
+
+def rebuild():
+    """Recomputes every sketch from accepted bids. Returns the number of buckets written."""
+    # samples queued so far belong to bids selected before they are read below
+    last_sample = PriceSample.objects.order_by("-id").values_list("id", flat=True).first() or 0
+    sketches = {}
+    for title, location, amount in _accepted_bids():
+        for group in buckets(title, location).values():
+            for key in group:
+                sketches.setdefault(key, KLLSketch()).add(amount)
+
+    with transaction.atomic():
+        PriceSketch.objects.all().delete()
+        PriceSketch.objects.bulk_create(
+            [
+                PriceSketch(location=location, keyword=keyword, samples=kll.count, sketch=kll.to_dict())
+                for (location, keyword), kll in sketches.items()
+            ],
+            batch_size=200,
+        )
+        PriceSample.objects.filter(id__lte=last_sample).delete()
+    return len(sketches)
@@ -0,0 +1,99 @@
+import random
+import threading
+from collections import namedtuple
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+
+HEADER = "X-Profile"
+SALT = "api.profiling"
+SEPARATOR = "--"
+SUFFIX = ".pstats"
+STAMP_FORMAT = "%Y%m%dT%H%M%S%f"
+
+Profile = namedtuple("Profile", "name path captured_at route method status milliseconds")
+
+# cProfile cannot run two profilers at once, so concurrent requests are not profiled
+_active = threading.Lock()
+
+
+def profile_dir():
+    return Path(getattr(settings, "PROFILE_DIR", settings.BASE_DIR / "profiles"))
+
+
+# ======================================== Triggers ==================================
+def make_token():
+    """A value for the ``X-Profile`` header, valid for ``PROFILE_TOKEN_MAX_AGE`` seconds."""
+    return signing.TimestampSigner(salt=SALT).sign("profile")
+
+
+def requested(request):
+    token = request.headers.get(HEADER)
+    if not token:
+        return False
+    try:
+        signing.TimestampSigner(salt=SALT).unsign(token, max_age=getattr(settings, "PROFILE_TOKEN_MAX_AGE", 60 * 60))
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def sampled():
+    rate = getattr(settings, "PROFILE_SAMPLE_RATE", 0)
+    return rate > 0 and random.random() < rate
+
+
+def acquire():
+    return _active.acquire(blocking=False)
+
+
+def release():
+    _active.release()
+
+
+# ======================================== Storage ==================================
+def save(profiler, route, method, status_code, seconds):
+    """Writes the profile as ``<timestamp>--<route>--<method>--<status>--<ms>ms.pstats`` and returns the name."""
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    name = SEPARATOR.join([
+        datetime.now(timezone.utc).strftime(STAMP_FORMAT),
+        (route or "unresolved").replace(":", "."),
+        method,
+        str(status_code),
+        f"{round(seconds * 1000)}ms",
+    ]) + SUFFIX
+    profiler.dump_stats(directory / name)
+    prune()
+    return name
+
+
+def parse_name(path):
+    try:
+        stamp, route, method, status_code, milliseconds = path.name[:-len(SUFFIX)].split(SEPARATOR)
+        captured_at = datetime.strptime(stamp, STAMP_FORMAT).replace(tzinfo=timezone.utc)
+        return Profile(path.name, path, captured_at, route, method, int(status_code), int(milliseconds[:-2]))
+    except ValueError:
+        return None
+
+
+def captured(route=None):
+    """Stored profiles, newest first."""
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    profiles = [parse_name(path) for path in directory.glob(f"*{SUFFIX}")]
+    profiles = [profile for profile in profiles if profile and (route is None or profile.route == route)]
+    return sorted(profiles, key=lambda profile: profile.name, reverse=True)
+
+
+def prune(keep=None):
+    """Deletes all but the newest ``PROFILE_MAX_FILES`` profiles; returns how many were removed."""
+    keep = getattr(settings, "PROFILE_MAX_FILES", 200) if keep is None else keep
+    removed = captured()[keep:]
+    for profile in removed:
+        # another process may be pruning the same directory
+        profile.path.unlink(missing_ok=True)
+    return len(removed)
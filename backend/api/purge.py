@@ -0,0 +1,80 @@
+from django.db import transaction
+from django.utils import timezone
+
+from . import dashboard, feed
+from .models import Bid, Job, Payment, Review, WorkerBooking
+
+
+class DeleteError(Exception):
+    pass
+
+
+def soft_delete(job):
+    """
+    Hides a job from every queryset at once. Its bids, reviews and payment
+    stay until ``purge_deleted_jobs`` removes them, so the request does not
+    wait on the cascade. A job with a completed payment is refused with
+    ``DeleteError``: the payment is what the worker's wallet was credited
+    from, and ``reconcile_payments`` checks wallets against it.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        # release_funds locks the payment together with its job, so a payment cannot complete meanwhile
+        Job.objects.select_for_update().only("id").get(id=job.id)
+        if Payment.objects.filter(job_id=job.id, status="completed").exists():
+            raise DeleteError("A job with a completed payment cannot be deleted.")
+        Job.objects.filter(id=job.id).update(deleted_at=now, updated_at=now)
+        feed.remove_jobs([job.id])
+        # frees the assigned worker's time straight away
+        WorkerBooking.objects.filter(job_id=job.id).delete()
+        dashboard.invalidate(job.customer_id)
+
+
+def deleted_jobs():
+    # served by the partial index on deleted_at
+    return Job.all_objects.filter(deleted_at__isnull=False)
+
+
+def purgeable_jobs():
+    # jobs deleted before soft_delete checked for payments may hold a completed one; it is never purged
+    return deleted_jobs().exclude(payment__status="completed")
+
+
+def _delete_chunk(queryset, chunk_size):
+    with transaction.atomic():
+        ids = list(queryset.order_by("pk").values_list("pk", flat=True)[:chunk_size])
+        if ids:
+            queryset.model.objects.filter(pk__in=ids).delete()
+    return len(ids)
+
+
+def purge_job(job_id, chunk_size=500):
+    """
+    Hard-deletes one soft-deleted job, its bids and reviews first, at most
+    ``chunk_size`` rows per transaction, so no transaction holds many locks.
+    Returns ``False`` for a job that is not purgeable.
+    """
+    if not purgeable_jobs().filter(id=job_id).exists():
+        return False
+    # with no best bid pointing at them, the bids delete without updating the job
+    Job.all_objects.filter(id=job_id).update(best_bid=None)
+    for model in (Bid, Review):
+        while _delete_chunk(model.objects.filter(job_id=job_id), chunk_size):
+            pass
+    with transaction.atomic():
+        Payment.objects.filter(job_id=job_id).exclude(status="completed").delete()
+        purgeable_jobs().filter(id=job_id).delete()
+    return True
+
+
+def purge_deleted_jobs(batch_size=100, chunk_size=500):
+    """Purges every soft-deleted job, ``batch_size`` job ids at a time. Returns the number purged."""
+    purged, last_id = 0, 0
+    while True:
+        job_ids = list(
+            purgeable_jobs().filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:batch_size]
+        )
+        if not job_ids:
+            return purged
+        last_id = job_ids[-1]
+        purged += sum(purge_job(job_id, chunk_size) for job_id in job_ids)
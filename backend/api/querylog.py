@@ -0,0 +1,179 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from .models import QueryFingerprint
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN_PREFIXES = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w\"])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|\?")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ROWS = re.compile(r"(\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+")
+_SPACE = re.compile(r"\s+")
+
+# per process: {(view, fingerprint): [calls, total_ms, max_ms, sql]}, written out by flush()
+_stats = {}
+_stats_lock = threading.Lock()
+_last_flush = time.monotonic()
+_last_explained = {}
+_local = threading.local()
+
+
+# ======================================== Fingerprints ==================================
+def normalize(sql):
+    """
+    SQL with literals and placeholders replaced by ``?``, ``IN`` lists and
+    multi-row ``VALUES`` collapsed, and whitespace squeezed, so statements
+    that differ only in their values share one fingerprint.
+    """
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _LIST.sub("(...)", sql)
+    sql = _ROWS.sub(r"\1", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.sha1(normalized_sql.encode()).hexdigest()
+
+
+# ======================================== Recording ==================================
+def enabled():
+    return getattr(settings, "QUERY_LOG_ENABLED", False)
+
+
+class paused:
+    """Queries run inside this block (the log's own writes, EXPLAIN) are not recorded."""
+
+    def __enter__(self):
+        self.previous = getattr(_local, "paused", False)
+        _local.paused = True
+
+    def __exit__(self, *exc_info):
+        _local.paused = self.previous
+
+
+class QueryRecorder:
+    """
+    ``connection.execute_wrapper`` that times every query of a request and
+    adds it to the totals of the request's view. Queries slower than
+    ``SLOW_QUERY_MS`` are logged with their plan.
+    """
+
+    def __init__(self, request):
+        self.request = request
+
+    def view_name(self):
+        # resolved once URL routing has run; queries made before that are grouped under "-"
+        match = getattr(self.request, "resolver_match", None)
+        return match.view_name if match else "-"
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(_local, "paused", False):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            view = self.view_name()
+            normalized = normalize(sql)
+            key = fingerprint(normalized)
+            record(view, key, normalized, elapsed_ms)
+            if elapsed_ms >= getattr(settings, "SLOW_QUERY_MS", 200):
+                log_slow_query(context["connection"], view, key, sql, None if many else params, elapsed_ms)
+
+
+def record(view, key, normalized_sql, elapsed_ms):
+    with _stats_lock:
+        entry = _stats.get((view, key))
+        if entry is None:
+            _stats[(view, key)] = [1, elapsed_ms, elapsed_ms, normalized_sql]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed_ms
+            entry[2] = max(entry[2], elapsed_ms)
+
+
+def explain(connection, sql, params):
+    """The query plan as text, or ``None`` where the backend or statement has no plan to show."""
+    prefix = EXPLAIN_PREFIXES.get(connection.vendor)
+    if prefix is None or not sql.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+    try:
+        # in its own savepoint: on PostgreSQL a failed EXPLAIN would otherwise abort the request's transaction
+        with paused(), transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            rows = cursor.fetchall()
+    except Exception as exception:
+        return f"(EXPLAIN failed: {exception})"
+    if connection.vendor == "sqlite":
+        # (id, parent, notused, detail)
+        return "\n".join(row[-1] for row in rows)
+    return "\n".join(row[0] for row in rows)
+
+
+def log_slow_query(connection, view, key, sql, params, elapsed_ms):
+    # the plan rarely changes between runs, so each fingerprint is explained at most once per interval
+    now = time.monotonic()
+    interval = getattr(settings, "SLOW_QUERY_EXPLAIN_INTERVAL", 300)
+    plan = None
+    if params is not None and now - _last_explained.get(key, -interval) >= interval:
+        _last_explained[key] = now
+        plan = explain(connection, sql, params)
+    logger.warning(
+        "Slow query: %.0f ms in %s [%s]\n%s%s",
+        elapsed_ms, view, key[:12], sql, f"\nPlan:\n{plan}" if plan else "",
+    )
+
+
+# ======================================== Storage ==================================
+def flush_due():
+    return time.monotonic() - _last_flush >= getattr(settings, "QUERY_LOG_FLUSH_INTERVAL", 60)
+
+
+def flush():
+    """Adds this process's totals to ``QueryFingerprint`` and resets them."""
+    global _stats, _last_flush
+    with _stats_lock:
+        pending, _stats = _stats, {}
+        _last_flush = time.monotonic()
+
+    try:
+        with paused():
+            for (view, key), (calls, total_ms, max_ms, normalized_sql) in pending.items():
+                _add(view, key, normalized_sql, calls, total_ms, max_ms)
+    except DatabaseError:
+        logger.exception("Could not save query statistics; %d fingerprints dropped", len(pending))
+    return len(pending)
+
+
+def _add(view, key, normalized_sql, calls, total_ms, max_ms):
+    changes = {
+        "calls": F("calls") + calls,
+        "total_ms": F("total_ms") + total_ms,
+        "max_ms": Greatest(F("max_ms"), max_ms),
+    }
+    if QueryFingerprint.objects.filter(view=view, fingerprint=key).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            QueryFingerprint.objects.create(
+                view=view, fingerprint=key, sql=normalized_sql, calls=calls, total_ms=total_ms, max_ms=max_ms,
+            )
+    except IntegrityError:
+        # another process inserted it first
+        QueryFingerprint.objects.filter(view=view, fingerprint=key).update(**changes)
@@ -0,0 +1,131 @@
+from collections import namedtuple
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from . import dashboard, feed
+from .models import ArchivedJob, Job, Payment, Worker, WorkerWallet
+
+ZERO = Decimal("0.00")
+
+JobMismatch = namedtuple("JobMismatch", "payment_id job_id customer_id job_status")
+WalletMismatch = namedtuple("WalletMismatch", "worker_id balance expected")
+
+
+# ======================================== Payments vs jobs ==================================
+def job_mismatches(chunk_size=1000):
+    """
+    Completed payments whose job is not completed, in chunks of at most
+    ``chunk_size``. Walks the payments in id order so memory use does not
+    depend on the size of the table.
+    """
+    last_id = 0
+    while True:
+        chunk = [
+            JobMismatch(*row)
+            for row in Payment.objects.filter(status="completed", id__gt=last_id)
+            .exclude(job__status="completed")
+            .order_by("id")
+            .values_list("id", "job_id", "job__customer_id", "job__status")[:chunk_size]
+        ]
+        if not chunk:
+            return
+        last_id = chunk[-1].payment_id
+        yield chunk
+
+
+def repair_jobs(mismatches):
+    """Marks the jobs of completed payments completed, in one update."""
+    job_ids = [mismatch.job_id for mismatch in mismatches]
+    with transaction.atomic():
+        updated = Job.objects.filter(id__in=job_ids).exclude(status="completed").update(
+            status="completed", updated_at=timezone.now(),
+        )
+        feed.remove_jobs(job_ids)
+    dashboard.invalidate(*{mismatch.customer_id for mismatch in mismatches})
+    return updated
+
+
+# ======================================== Wallets ==================================
+def expected_balances(worker_ids):
+    """
+    What each wallet should hold: every completed payment for a job the
+    worker was assigned, archived jobs included. Wallets are only ever
+    credited by ``release_funds``, so nothing is subtracted.
+    """
+    expected = dict.fromkeys(worker_ids, ZERO)
+    live = (
+        Payment.objects.filter(status="completed", job__assigned_worker_id__in=worker_ids)
+        .values("job__assigned_worker_id")
+        .annotate(total=Sum("amount"))
+        .values_list("job__assigned_worker_id", "total")
+    )
+    archived = (
+        ArchivedJob.objects.filter(payment_status="completed", assigned_worker_id__in=worker_ids)
+        .values("assigned_worker_id")
+        .annotate(total=Sum("payment_amount"))
+        .values_list("assigned_worker_id", "total")
+    )
+    for rows in (live, archived):
+        for worker_id, total in rows:
+            expected[worker_id] += total or ZERO
+    return expected
+
+
+def _compare(worker_ids):
+    expected = expected_balances(worker_ids)
+    balances = dict(WorkerWallet.objects.filter(worker_id__in=worker_ids).values_list("worker_id", "balance"))
+    # a worker without a wallet has simply never been paid
+    return [
+        WalletMismatch(worker_id, balances.get(worker_id), amount)
+        for worker_id, amount in expected.items()
+        if balances.get(worker_id, ZERO) != amount
+    ]
+
+
+def wallet_mismatches(chunk_size=1000):
+    """
+    Yields ``(workers_checked, mismatches)`` per chunk of workers. Sums are
+    computed by the database for one chunk at a time, so only a chunk of
+    workers is ever held in memory, however many payments there are.
+    """
+    last_id = 0
+    while True:
+        worker_ids = list(
+            Worker.objects.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:chunk_size]
+        )
+        if not worker_ids:
+            return
+        last_id = worker_ids[-1]
+        yield len(worker_ids), _compare(worker_ids)
+
+
+def repair_wallets(mismatches, allow_decrease=False):
+    """
+    Sets the wallets to their expected balance. The wallets are locked and
+    the balances recomputed first, so a payment completed since the check
+    is not undone. A wallet holding more than its payments add up to is
+    only lowered with ``allow_decrease``: the extra money may be a payment
+    whose record is gone, and taking it back needs someone to look first.
+    Returns the number of wallets changed or created.
+    """
+    worker_ids = [mismatch.worker_id for mismatch in mismatches]
+    with transaction.atomic():
+        wallets = {
+            wallet.worker_id: wallet
+            for wallet in WorkerWallet.objects.select_for_update().filter(worker_id__in=worker_ids)
+        }
+        changed, created = [], []
+        for mismatch in _compare(worker_ids):
+            wallet = wallets.get(mismatch.worker_id)
+            if wallet is None:
+                created.append(WorkerWallet(worker_id=mismatch.worker_id, balance=mismatch.expected))
+            elif allow_decrease or wallet.balance < mismatch.expected:
+                wallet.balance = mismatch.expected
+                changed.append(wallet)
+        WorkerWallet.objects.bulk_update(changed, ["balance"], batch_size=500)
+        # a wallet created by release_funds meanwhile is left for the next run
+        WorkerWallet.objects.bulk_create(created, batch_size=500, ignore_conflicts=True)
+    return len(changed) + len(created)
@@ -0,0 +1,168 @@
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .archive import archived_hires
+from .models import (
+    ArchivedJob,
+    Bid,
+    DailyJobPostingRollup,
+    DailyWorkerHireRollup,
+    Job,
+    JobPostingTotal,
+    RollupState,
+    WorkerHireTotal,
+)
+
+ROLLUP_NAME = "daily"
+
+
+def _start_of(day):
+    return datetime.combine(day, time.min, tzinfo=timezone.get_current_timezone())
+
+
+def _first_unrolled_day(state):
+    if state.last_day:
+        return state.last_day + timedelta(days=1)
+    earliest = [
+        Job.objects.aggregate(first=Min("created_at"))["first"],
+        ArchivedJob.objects.aggregate(first=Min("created_at"))["first"],
+        Bid.objects.filter(status="selected").aggregate(first=Min("selected_at"))["first"],
+    ]
+    earliest = [value for value in earliest if value is not None]
+    return timezone.localdate(min(earliest)) if earliest else None
+
+
+def _add_to_totals(model, key_field, count_field, increments):
+    # increments: {key: count}; existing rows are bumped, new keys inserted
+    existing = {getattr(row, key_field): row for row in model.objects.filter(**{f"{key_field}__in": increments})}
+    for key, row in existing.items():
+        setattr(row, count_field, getattr(row, count_field) + increments[key])
+    model.objects.bulk_update(existing.values(), [count_field], batch_size=500)
+    model.objects.bulk_create(
+        [model(**{key_field: key, count_field: count}) for key, count in increments.items() if key not in existing],
+        batch_size=500,
+    )
+
+
+def roll_up(first_day, last_day):
+    """
+    Builds the daily rows for ``first_day..last_day`` and adds them to the
+    running totals. Archived jobs count like live ones, so a rebuild after
+    archiving gives the same numbers.
+    """
+    start, end = _start_of(first_day), _start_of(last_day + timedelta(days=1))
+
+    postings = {}
+    for jobs in (Job.objects, ArchivedJob.objects):
+        for day, title, location, count in (
+            jobs.filter(created_at__gte=start, created_at__lt=end)
+            .annotate(day=TruncDate("created_at"))
+            .values("day", "title", "location")
+            .annotate(postings=Count("id"))
+            .order_by()
+            .values_list("day", "title", "location", "postings")
+        ):
+            postings[(day, title, location)] = postings.get((day, title, location), 0) + count
+    hires = {
+        (day, worker_id): count
+        for day, worker_id, count in Bid.objects.filter(status="selected", selected_at__gte=start, selected_at__lt=end)
+        .annotate(day=TruncDate("selected_at"))
+        .values("day", "worker_id")
+        .annotate(hires=Count("id"))
+        .order_by()
+        .values_list("day", "worker_id", "hires")
+    }
+    # a bid is selected after its job is posted and no later than the job's last update
+    archived = ArchivedJob.objects.filter(created_at__lt=end, updated_at__gte=start)
+    for worker_id, selected_at in archived_hires(archived):
+        if start <= selected_at < end:
+            key = (timezone.localdate(selected_at), worker_id)
+            hires[key] = hires.get(key, 0) + 1
+
+    daily_postings = [
+        DailyJobPostingRollup(day=day, title=title, location=location, postings=count)
+        for (day, title, location), count in postings.items()
+    ]
+    daily_hires = [
+        DailyWorkerHireRollup(day=day, worker_id=worker_id, hires=count)
+        for (day, worker_id), count in hires.items()
+    ]
+    DailyJobPostingRollup.objects.bulk_create(daily_postings, batch_size=500)
+    DailyWorkerHireRollup.objects.bulk_create(daily_hires, batch_size=500)
+
+    title_increments = {}
+    for row in daily_postings:
+        title_increments[row.title] = title_increments.get(row.title, 0) + row.postings
+    worker_increments = {}
+    for row in daily_hires:
+        worker_increments[row.worker_id] = worker_increments.get(row.worker_id, 0) + row.hires
+    _add_to_totals(JobPostingTotal, "title", "postings", title_increments)
+    _add_to_totals(WorkerHireTotal, "worker_id", "hires", worker_increments)
+    return len(daily_postings), len(daily_hires)
+
+
+def build_rollups(through=None, days_per_batch=31):
+    """
+    Rolls up every complete day after the stored watermark, ``days_per_batch``
+    days per transaction. Yields ``(first_day, last_day)`` for each batch.
+    """
+    through = through or timezone.localdate() - timedelta(days=1)
+    state, _ = RollupState.objects.get_or_create(name=ROLLUP_NAME)
+    first_day = _first_unrolled_day(state)
+    while first_day is not None and first_day <= through:
+        last_day = min(first_day + timedelta(days=days_per_batch - 1), through)
+        with transaction.atomic():
+            roll_up(first_day, last_day)
+            state.last_day = last_day
+            state.save(update_fields=["last_day"])
+        yield first_day, last_day
+        first_day = last_day + timedelta(days=1)
+
+
+def reset_rollups():
+    with transaction.atomic():
+        DailyJobPostingRollup.objects.all().delete()
+        DailyWorkerHireRollup.objects.all().delete()
+        JobPostingTotal.objects.all().delete()
+        WorkerHireTotal.objects.all().delete()
+        RollupState.objects.filter(name=ROLLUP_NAME).delete()
+
+
+# ======================================== Reads ==================================
+def rolled_up_through():
+    state = RollupState.objects.filter(name=ROLLUP_NAME).first()
+    return state.last_day if state else None
+
+
+def popular_titles(limit=5):
+    return JobPostingTotal.objects.order_by("-postings")[:limit]
+
+
+def most_hired_workers(limit=5):
+    return WorkerHireTotal.objects.select_related("worker__user").order_by("-hires")[:limit]
+
+
+def daily_activity(first_day, last_day):
+    days = {}
+    for row in (
+        DailyJobPostingRollup.objects.filter(day__range=(first_day, last_day))
+        .values("day").annotate(total=Sum("postings")).order_by()
+    ):
+        days.setdefault(row["day"], {"postings": 0, "hires": 0})["postings"] = row["total"]
+    for row in (
+        DailyWorkerHireRollup.objects.filter(day__range=(first_day, last_day))
+        .values("day").annotate(total=Sum("hires")).order_by()
+    ):
+        days.setdefault(row["day"], {"postings": 0, "hires": 0})["hires"] = row["total"]
+    return [{"day": day, **days[day]} for day in sorted(days)]
+
+
+def top_locations(first_day, last_day, limit=10):
+    return list(
+        DailyJobPostingRollup.objects.filter(day__range=(first_day, last_day))
+        .values("location").annotate(postings=Sum("postings")).order_by("-postings")[:limit]
+    )
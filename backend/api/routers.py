@@ -0,0 +1,75 @@
+import contextvars
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+# alias that reads are sent to for the current request; None means "default"
+_read_alias = contextvars.ContextVar("read_alias", default=None)
+
+
+def replica_alias():
+    alias = getattr(settings, "REPLICA_DATABASE_ALIAS", "replica")
+    return alias if alias in settings.DATABASES else None
+
+
+def _pin_key(user_id):
+    return f"replica-pin:{user_id}"
+
+
+def pin_to_primary(user_id):
+    # after a write the replica may lag; keep this user's reads on the primary for a while
+    cache.set(_pin_key(user_id), True, getattr(settings, "REPLICA_STICKY_SECONDS", 5))
+
+
+def is_pinned(user_id):
+    return cache.get(_pin_key(user_id), False)
+
+
+def set_read_alias(alias):
+    return _read_alias.set(alias)
+
+
+def reset_read_alias(token):
+    _read_alias.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Sends reads to the replica only while a view marked with
+    ``ReplicaReadMixin`` is handling a safe request; everything else,
+    including all writes, stays on ``default``.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replica holds the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    View annotation: GET/HEAD requests read from the replica unless the user
+    wrote something within the last ``REPLICA_STICKY_SECONDS``.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        alias = replica_alias()
+        if alias and request.method in SAFE_METHODS and not is_pinned(request.user.pk):
+            self._read_alias_token = set_read_alias(alias)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "_read_alias_token", None)
+        if token is not None:
+            reset_read_alias(token)
+            self._read_alias_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .models import Worker, WorkerAvailability, WorkerBooking
+
+
+def max_span():
+    return timedelta(days=getattr(settings, "SCHEDULE_MAX_SPAN_DAYS", 31))
+
+
+def window_error(starts_at, ends_at):
+    """Why ``starts_at..ends_at`` is not a valid interval, or ``None``."""
+    if starts_at is None or ends_at is None:
+        return "Both a start and an end time are required."
+    if ends_at <= starts_at:
+        return "The end time must be after the start time."
+    if ends_at - starts_at > max_span():
+        return f"An interval can be at most {max_span().days} days long."
+    return None
+
+
+def overlapping(intervals, starts_at, ends_at):
+    """
+    Intervals overlapping ``starts_at..ends_at``. No interval is longer than
+    the maximum span, so the ones that overlap all start in a bounded range
+    of the ``starts_at`` index.
+    """
+    return intervals.filter(
+        starts_at__gte=starts_at - max_span(), starts_at__lt=ends_at, ends_at__gt=starts_at,
+    )
+
+
+def covering(intervals, starts_at, ends_at):
+    """Intervals that contain all of ``starts_at..ends_at``; a bounded index range as well."""
+    return intervals.filter(starts_at__gte=ends_at - max_span(), starts_at__lte=starts_at, ends_at__gte=ends_at)
+
+
+# ======================================== Bookings ==================================
+def conflicts(worker_id, starts_at, ends_at, exclude_job_id=None):
+    bookings = overlapping(WorkerBooking.objects.filter(worker_id=worker_id), starts_at, ends_at)
+    if exclude_job_id is not None:
+        bookings = bookings.exclude(job_id=exclude_job_id)
+    return bookings
+
+
+def sync_job(job):
+    """
+    Books the job's worker for its window, or drops the booking. Called
+    whenever an assigned worker or window changes; a job that has never had
+    a window has no booking, so callers skip it.
+    """
+    if job.assigned_worker_id and job.starts_at and job.ends_at:
+        WorkerBooking.objects.update_or_create(
+            job_id=job.id,
+            defaults={"worker_id": job.assigned_worker_id, "starts_at": job.starts_at, "ends_at": job.ends_at},
+        )
+    else:
+        WorkerBooking.objects.filter(job_id=job.id).delete()
+
+
+# ======================================== Search ==================================
+def available_workers(starts_at, ends_at, location=None, limit=20):
+    """
+    Workers with one availability interval covering the whole window and no
+    booking overlapping it, best location match first (exact, then partial),
+    then by leaderboard score.
+    """
+    free = covering(WorkerAvailability.objects.all(), starts_at, ends_at).values("worker_id")
+    busy = overlapping(WorkerBooking.objects.all(), starts_at, ends_at).values("worker_id")
+    workers = (
+        Worker.objects.filter(id__in=free).exclude(id__in=busy)
+        .select_related("user").annotate(score=F("rating_stats__score"))
+    )
+    if location and location.strip():
+        location = location.strip()
+        workers = workers.filter(location__icontains=location).annotate(
+            location_rank=Case(
+                When(location__iexact=location, then=Value(0)), default=Value(1), output_field=IntegerField(),
+            ),
+        ).order_by("location_rank", F("score").desc(nulls_last=True), "id")
+    else:
+        workers = workers.order_by(F("score").desc(nulls_last=True), "id")
+    return workers[:limit]
@@ -1,6 +1,12 @@
 from rest_framework import serializers
-from .models import User, Worker, Job, Payment
+from .models import User, Worker, Job, Payment, ArchivedJob, OpenJobFeed, WorkerAvailability
 from django.contrib.auth.password_validation import validate_password
+from django.utils import timezone
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from .fieldsets import SparseFieldsMixin
+from .images import rejected_upload_error, thumbnail_url, validate_profile_picture
+from .tokens import RoleRefreshToken
+from .schedule import window_error
 
 # ========================================= Register ==================================
 class RegisterSerializer(serializers.ModelSerializer):
@@ -14,7 +20,14 @@ class RegisterSerializer(serializers.ModelSerializer):
         model = User
         fields = ('username', 'email', 'password', 'confirmPassword', 'is_worker', 'is_customer', 'profile_picture')
 
+    def validate_profile_picture(self, value):
+        return validate_profile_picture(value)
+
     def validate(self, attrs):
+        request = self.context.get('request')
+        error = rejected_upload_error(request, 'profile_picture') if request else None
+        if error:
+            raise serializers.ValidationError({"profile_picture": error})
         if attrs['password'] != attrs['confirmPassword']:
             raise serializers.ValidationError({"password": "Passwords do not match."})
         if not (attrs['is_worker'] or attrs['is_customer']):
@@ -35,13 +48,54 @@ class RegisterSerializer(serializers.ModelSerializer):
         )
         return user
 
+# ======================================= Token ======================================
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = RoleRefreshToken
+
 # ================================= Job ==================================
-class JobSerializer(serializers.ModelSerializer):
+class JobSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     assigned_worker = serializers.SerializerMethodField()
 
+    expandable = {
+        "assigned_worker": {
+            "id": "assigned_worker_id",
+            "columns": [
+                "assigned_worker", "assigned_worker__skills", "assigned_worker__experience",
+                "assigned_worker__location", "assigned_worker__profile_picture", "assigned_worker__user",
+                "assigned_worker__user__username", "assigned_worker__user__profile_picture",
+            ],
+            "joins": ["assigned_worker__user"],
+        },
+    }
+
     class Meta:
         model = Job
-        fields = ['id', 'title', 'description', 'location', 'budget', 'status', 'assigned_worker']
+        fields = ['id', 'title', 'description', 'location', 'budget', 'urgency', 'status', 'expires_at', 'auto_award',
+                  'starts_at', 'ends_at', 'best_bid', 'bid_count', 'lowest_bid', 'assigned_worker']
+        read_only_fields = ['best_bid', 'bid_count', 'lowest_bid']
+
+    def validate_urgency(self, value):
+        if not 1 <= value <= 5:
+            raise serializers.ValidationError("Urgency must be from 1 to 5.")
+        return value
+
+    def validate_expires_at(self, value):
+        if value is not None and value <= timezone.now():
+            raise serializers.ValidationError("Expiry time must be in the future.")
+        return value
+
+    def validate(self, attrs):
+        auto_award = attrs.get('auto_award', getattr(self.instance, 'auto_award', False))
+        expires_at = attrs.get('expires_at', getattr(self.instance, 'expires_at', None))
+        if auto_award and not expires_at:
+            raise serializers.ValidationError({"auto_award": "Auto-award needs an expiry time to close bidding."})
+        starts_at = attrs.get('starts_at', getattr(self.instance, 'starts_at', None))
+        ends_at = attrs.get('ends_at', getattr(self.instance, 'ends_at', None))
+        if starts_at or ends_at:
+            error = window_error(starts_at, ends_at)
+            if error:
+                raise serializers.ValidationError({"ends_at": error})
+        return attrs
 
     def get_assigned_worker(self, obj):
         if obj.assigned_worker:
@@ -51,6 +105,54 @@ class JobSerializer(serializers.ModelSerializer):
                 "skills": obj.assigned_worker.skills,
                 "experience": obj.assigned_worker.experience,
                 "location": obj.assigned_worker.location,
+                "thumbnail": thumbnail_url(obj.assigned_worker.profile_picture or obj.assigned_worker.user.profile_picture),
+            }
+        return None
+
+# ============================== Worker availability =============================
+class WorkerAvailabilitySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WorkerAvailability
+        fields = ['id', 'starts_at', 'ends_at']
+
+    def validate(self, attrs):
+        error = window_error(attrs.get('starts_at'), attrs.get('ends_at'))
+        if error:
+            raise serializers.ValidationError({"ends_at": error})
+        return attrs
+
+# ============================== Open job feed =============================
+class OpenJobFeedSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    id = serializers.IntegerField(source='job_id')
+    assigned_worker = serializers.SerializerMethodField()
+
+    columns = {"id": ["job_id"]}
+    # the worker columns are denormalized, so expanding costs columns but no join
+    expandable = {
+        "assigned_worker": {
+            "id": "assigned_worker_id",
+            "columns": [
+                "assigned_worker_id", "assigned_worker_username", "assigned_worker_skills",
+                "assigned_worker_experience", "assigned_worker_location", "assigned_worker_picture",
+            ],
+            "joins": [],
+        },
+    }
+
+    class Meta:
+        model = OpenJobFeed
+        fields = ['id', 'title', 'description', 'location', 'budget', 'status', 'expires_at', 'assigned_worker',
+                  'bid_count', 'lowest_bid', 'customer_rating']
+
+    def get_assigned_worker(self, obj):
+        if obj.assigned_worker_id:
+            return {
+                "id": obj.assigned_worker_id,
+                "username": obj.assigned_worker_username,
+                "skills": obj.assigned_worker_skills,
+                "experience": obj.assigned_worker_experience,
+                "location": obj.assigned_worker_location,
+                "thumbnail": thumbnail_url(obj.assigned_worker_picture),
             }
         return None
 
@@ -68,4 +170,54 @@ class PaymentSerializer(serializers.ModelSerializer):
     def validate_amount(self, value):
         if value <= 0:
             raise serializers.ValidationError("Amount must be greater than 0.")
-        return value
\ No newline at end of file
+        return value
+
+# =============================== Archived job ================================
+class ArchivedJobSerializer(serializers.ModelSerializer):
+    description = serializers.SerializerMethodField()
+    assigned_worker = serializers.SerializerMethodField()
+    bid_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ArchivedJob
+        fields = ['id', 'title', 'description', 'location', 'budget', 'status', 'assigned_worker',
+                  'bid_count', 'payment_amount', 'payment_status', 'created_at', 'archived_at']
+
+    def get_description(self, obj):
+        return obj.payload.get("description", "")
+
+    def get_assigned_worker(self, obj):
+        if obj.assigned_worker:
+            return {
+                "id": obj.assigned_worker.id,
+                "username": obj.assigned_worker.user.username,
+            }
+        return None
+
+    def get_bid_count(self, obj):
+        return len(obj.payload.get("bids", []))
+
+
+class ArchivedJobDetailSerializer(ArchivedJobSerializer):
+    bids = serializers.SerializerMethodField()
+    reviews = serializers.SerializerMethodField()
+    payment = serializers.SerializerMethodField()
+
+    class Meta(ArchivedJobSerializer.Meta):
+        fields = ArchivedJobSerializer.Meta.fields + ['bids', 'reviews', 'payment']
+
+    def get_bids(self, obj):
+        return obj.payload.get("bids", [])
+
+    def get_reviews(self, obj):
+        return obj.payload.get("reviews", [])
+
+    def get_payment(self, obj):
+        return obj.payload.get("payment")
+
+# ============================== Bulk assignment =============================
+class BulkAssignSerializer(serializers.Serializer):
+    job_ids = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=1000)
+    capacity = serializers.IntegerField(min_value=1, default=1)
+    optimize = serializers.ChoiceField(choices=["amount", "rank"], default="amount")
+    dry_run = serializers.BooleanField(default=False)
@@ -0,0 +1,89 @@
+import math
+import random
+
+DEFAULT_K = 200
+_C = 2 / 3
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang and Liberty). Level ``h`` holds items
+    that each stand for ``2 ** h`` of the values added; a full level is
+    sorted and every other item is promoted to the next one. Rank error is
+    about ``1.7 / k`` whatever the number of values, the sketch never holds
+    more than about ``3 * k`` items, and two sketches merge into one that
+    summarizes both streams.
+    """
+
+    def __init__(self, k=DEFAULT_K, levels=None, count=0):
+        self.k = k
+        self.levels = levels or [[]]
+        self.count = count
+
+    # ======================================== Storage ==================================
+    def to_dict(self):
+        return {"k": self.k, "n": self.count, "levels": self.levels}
+
+    @classmethod
+    def from_dict(cls, data):
+        if not data:
+            return cls()
+        return cls(k=data["k"], levels=[list(level) for level in data["levels"]], count=data["n"])
+
+    # ======================================== Updates ==================================
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, math.ceil(self.k * _C ** depth))
+
+    def _size(self):
+        return sum(len(level) for level in self.levels)
+
+    def _max_size(self):
+        return sum(self._capacity(level) for level in range(len(self.levels)))
+
+    def add(self, value):
+        self.levels[0].append(float(value))
+        self.count += 1
+        self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        self.count += other.count
+        self._compress()
+        return self
+
+    def _compress(self):
+        while self._size() >= self._max_size():
+            for level, items in enumerate(self.levels):
+                if len(items) >= self._capacity(level):
+                    if level + 1 == len(self.levels):
+                        self.levels.append([])
+                    items.sort()
+                    # an odd item out stays behind at this level
+                    keep = [items.pop()] if len(items) % 2 else []
+                    offset = random.getrandbits(1)
+                    self.levels[level + 1].extend(items[offset::2])
+                    self.levels[level] = keep
+                    break
+
+    # ======================================== Reads ==================================
+    def quantiles(self, fractions):
+        """Estimated values at each of ``fractions`` (0..1), or ``None``s when empty."""
+        weighted = sorted(
+            (value, 1 << level) for level, items in enumerate(self.levels) for value in items
+        )
+        total = sum(weight for _, weight in weighted)
+        if not total:
+            return [None for _ in fractions]
+        results = []
+        for fraction in fractions:
+            target, seen = fraction * total, 0
+            for value, weight in weighted:
+                seen += weight
+                if seen >= target:
+                    break
+            results.append(value)
+        return results
@@ -0,0 +1,104 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import bidding, feed, leaderboard, rollups
+from api.archive import archive_jobs
+from api.models import ArchivedJob, Bid, Job, JobPostingTotal, Payment, Review, User, Worker, WorkerHireTotal
+from api.reconcile import wallet_mismatches
+from api.utils import release_funds
+
+
+@override_settings(THROTTLE_RATES={})
+class ArchiveTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = timezone.now()
+        self.customer = User.objects.create_user(username="customer", password="pass", is_customer=True)
+        self.worker_user = User.objects.create_user(username="worker", password="pass", is_worker=True)
+        self.worker = Worker.objects.create(user=self.worker_user, skills="Plumbing", experience=3, location="Dhaka")
+        other_user = User.objects.create_user(username="other", password="pass", is_worker=True)
+        self.other = Worker.objects.create(user=other_user, skills="Plumbing", experience=1, location="Dhaka")
+
+        self.done = self.job("Fix sink")
+        selected = bidding.place_bid(self.worker, self.done, "450")
+        bidding.place_bid(self.other, self.done, "480")
+        bidding.assign_bid(selected.id)
+        release_funds(Payment.objects.create(job=self.done, amount=450, method="bkash"))
+        Review.objects.create(job=self.done, reviewer=self.customer, reviewee=self.worker_user, review_type="worker",
+                              rating=5, comment="Great")
+        self.closed = self.job("Paint", status="closed")
+        self.recent = self.job("Roof", status="completed")
+        self.open = self.job("Fence")
+        Job.objects.exclude(id=self.recent.id).update(updated_at=self.now - timedelta(days=100))
+
+    def job(self, title, **fields):
+        return Job.objects.create(customer=self.customer, title=title, description="Details", location="Dhaka",
+                                  budget=500, **fields)
+
+    def test_old_finished_jobs_are_moved(self):
+        self.assertEqual(list(archive_jobs(self.now - timedelta(days=30), chunk_size=1)), [1, 1])
+
+        self.assertEqual(set(ArchivedJob.objects.values_list("id", flat=True)), {self.done.id, self.closed.id})
+        self.assertEqual(set(Job.objects.values_list("id", flat=True)), {self.recent.id, self.open.id})
+        self.assertFalse(Bid.objects.exists() or Review.objects.exists() or Payment.objects.exists())
+
+        archived = ArchivedJob.objects.get(id=self.done.id)
+        self.assertEqual((archived.assigned_worker, archived.payment_amount, archived.payment_status),
+                         (self.worker, Decimal("450"), "completed"))
+        self.assertEqual(sorted(bid["status"] for bid in archived.payload["bids"]), ["ignored", "selected"])
+        self.assertEqual(archived.payload["reviews"][0]["comment"], "Great")
+        self.assertEqual(archived.payload["payment"]["method"], "bkash")
+        # the wallet still matches: archived payments count towards it
+        self.assertEqual([mismatch for _, mismatches in wallet_mismatches() for mismatch in mismatches], [])
+
+    def test_history_endpoints(self):
+        list(archive_jobs(self.now - timedelta(days=30)))
+        client = APIClient()
+
+        client.force_authenticate(self.customer)
+        response = client.get("/jobs/history/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({job["id"] for job in response.json()}, {self.done.id, self.closed.id})
+        detail = client.get(f"/jobs/history/{self.done.id}/").json()["data"]
+        self.assertEqual(detail["assigned_worker"]["username"], "worker")
+        self.assertEqual(detail["payment"]["amount"], "450.00")
+
+        client.force_authenticate(self.worker_user)
+        self.assertEqual([job["id"] for job in client.get("/jobs/history/").json()], [self.done.id])
+        self.assertEqual(client.get(f"/jobs/history/{self.closed.id}/").status_code, 404)
+
+    def test_command(self):
+        output = StringIO()
+        call_command("archive_jobs", "--older-than", "30", "--dry-run", stdout=output)
+        self.assertIn("2 job(s) would be archived.", output.getvalue())
+        self.assertFalse(ArchivedJob.objects.exists())
+
+        output = StringIO()
+        call_command("archive_jobs", "--older-than", "30", stdout=output)
+        self.assertIn("Archived 2 job(s) last updated before", output.getvalue())
+
+    def test_rebuilds_count_archived_jobs(self):
+        Review.objects.create(job=self.done, reviewer=self.worker_user, reviewee=self.customer,
+                              review_type="customer", rating=4)
+        # the jobs were posted and assigned before their last update
+        Job.objects.update(created_at=self.now - timedelta(days=101))
+        Bid.objects.filter(status="selected").update(selected_at=self.now - timedelta(days=101))
+        list(archive_jobs(self.now - timedelta(days=30)))
+        self.addCleanup(setattr, leaderboard, "_board", None)
+
+        leaderboard.rebuild()
+        stats = self.worker.rating_stats
+        self.assertEqual((stats.rating_count, stats.rating_sum, stats.completed_jobs), (1, 5, 1))
+        self.assertEqual(feed.customer_ratings([self.customer.id]), {self.customer.id: Decimal("4.00")})
+
+        list(rollups.build_rollups(through=timezone.localdate()))
+        self.assertEqual(dict(JobPostingTotal.objects.values_list("title", "postings")),
+                         {"Fix sink": 1, "Paint": 1, "Roof": 1, "Fence": 1})
+        self.assertEqual(dict(WorkerHireTotal.objects.values_list("worker_id", "hires")), {self.worker.id: 1})
@@ -0,0 +1,218 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import bidding, feed
+from api.expiry import expire_jobs
+from api.models import Bid, Job, OpenJobFeed, User, Worker
+
+WEIGHTS = {"price": 0.4, "rating": 0.3, "experience": 0.1, "verified": 0.1, "location": 0.1}
+
+
+def make_worker(username, location="Dhaka", experience=3, verified=False):
+    user = User.objects.create_user(username=username, password="pass", is_worker=True)
+    return Worker.objects.create(user=user, skills="Plumbing", experience=experience, location=location,
+                                 verified=verified)
+
+
+@override_settings(BID_RANKING_WEIGHTS=WEIGHTS, LEADERBOARD_PRIOR_MEAN=3.5)
+class ScoreBidTests(SimpleTestCase):
+    def score(self, amount, rating=None, budget=1000, **worker):
+        job = Job(budget=Decimal(budget), location="Dhaka")
+        worker = Worker(**{"experience": 0, "verified": False, "location": "", **worker})
+        return bidding.score_bid(Bid(bid_amount=Decimal(amount)), job, worker, rating)
+
+    def test_components(self):
+        # half the budget: price 1; unrated workers get the prior mean
+        self.assertAlmostEqual(self.score(500), 0.4 + 0.3 * 3.5 / 5)
+        self.assertAlmostEqual(self.score(1500, rating=0), 0.0)
+        self.assertAlmostEqual(
+            self.score(1000, rating=5, experience=20, verified=True, location="dhaka"),
+            0.4 * 0.5 + 0.3 + 0.1 + 0.1 + 0.1,
+        )
+
+    def test_location_match(self):
+        self.assertEqual(bidding.location_match("Dhaka", " dhaka "), 1.0)
+        self.assertEqual(bidding.location_match("Dhaka", "Mirpur, Dhaka"), 0.5)
+        self.assertEqual(bidding.location_match("Dhaka", "Sylhet"), 0.0)
+        self.assertEqual(bidding.location_match("Dhaka", None), 0.0)
+
+    def test_cheaper_bid_scores_higher(self):
+        self.assertGreater(self.score(600), self.score(900))
+
+
+class AutoAwardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = timezone.now()
+        self.customer = User.objects.create_user(username="customer", password="pass", is_customer=True)
+        self.workers = [make_worker(f"worker{n}", experience=n) for n in range(3)]
+        self.job = Job.objects.create(customer=self.customer, title="Fix sink", description="Leaking",
+                                      location="Dhaka", budget=1000, auto_award=True,
+                                      expires_at=self.now + timedelta(hours=1))
+
+    def bid(self, worker, amount):
+        return bidding.place_bid(worker, self.job, amount)
+
+    def test_best_bid_follows_the_ranking(self):
+        high = self.bid(self.workers[0], "900")
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.best_bid, high)
+
+        low = self.bid(self.workers[1], "500")
+        self.bid(self.workers[2], "950")
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.best_bid, low)
+
+    def test_awards_the_best_bid_once_bidding_closes(self):
+        self.bid(self.workers[0], "900")
+        best = self.bid(self.workers[1], "500")
+
+        self.assertEqual(bidding.auto_award_jobs(now=self.now), (0, 0))
+        self.assertEqual(bidding.auto_award_jobs(now=self.now + timedelta(hours=2)), (1, 0))
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.assigned_worker, self.workers[1])
+        self.assertEqual(self.job.status, "in-progress")
+        self.assertIsNone(self.job.best_bid)
+        self.assertEqual(Bid.objects.get(id=best.id).status, "selected")
+        self.assertEqual(Bid.objects.filter(status="ignored").count(), 1)
+
+    def test_reopened_job_is_not_awarded_its_old_selection(self):
+        first = self.bid(self.workers[0], "500")
+        self.bid(self.workers[1], "900")
+        bidding.assign_bid(first.id)
+        self.job.refresh_from_db()
+
+        client = APIClient()
+        client.force_authenticate(self.customer)
+        response = client.post(
+            "/jobs/unassign_worker/", {"job_id": self.job.id, "worker_id": self.workers[0].id}, format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, "open")
+        self.assertIsNone(self.job.best_bid)
+        self.assertEqual(bidding.auto_award_jobs(now=self.now + timedelta(hours=2)), (0, 0))
+
+        fresh = self.bid(self.workers[2], "700")
+        self.assertEqual(bidding.auto_award_jobs(now=self.now + timedelta(hours=2)), (1, 0))
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.assigned_worker_id, fresh.worker_id)
+
+    def test_only_pending_bids_on_open_jobs_are_assigned(self):
+        first = self.bid(self.workers[0], "500")
+        second = self.bid(self.workers[1], "900")
+        Bid.objects.filter(id=second.id).update(status="ignored")
+        with self.assertRaises(bidding.AssignmentError):
+            bidding.assign_bid(second.id)
+
+        Job.objects.filter(id=self.job.id).update(status="closed")
+        with self.assertRaises(bidding.AssignmentError):
+            bidding.assign_bid(first.id)
+
+        # past its window a job without auto-award can no longer be assigned
+        Job.objects.filter(id=self.job.id).update(status="open", auto_award=False,
+                                                  expires_at=self.now - timedelta(minutes=1))
+        with self.assertRaises(bidding.AssignmentError):
+            bidding.assign_bid(first.id)
+        self.assertEqual(Bid.objects.get(id=first.id).status, "not_selected")
+
+    def test_a_job_that_cannot_be_awarded_is_closed_by_expiry(self):
+        best = self.bid(self.workers[0], "500")
+        # the bid was ignored behind the ranking's back
+        Bid.objects.filter(id=best.id).update(status="ignored")
+        later = self.now + timedelta(hours=2)
+
+        self.assertEqual(expire_jobs(now=later), 0)
+        self.assertEqual(bidding.auto_award_jobs(now=later), (0, 1))
+        self.assertIsNone(Job.objects.get(id=self.job.id).best_bid)
+        self.assertEqual(expire_jobs(now=later), 1)
+        self.assertEqual(Job.objects.get(id=self.job.id).status, "closed")
+
+    def test_jobs_without_auto_award_are_left_alone(self):
+        Job.objects.filter(id=self.job.id).update(auto_award=False)
+        self.bid(self.workers[0], "500")
+        self.assertEqual(bidding.auto_award_jobs(now=self.now + timedelta(hours=2)), (0, 0))
+
+
+@override_settings(THROTTLE_RATES={})
+class BidCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = User.objects.create_user(username="customer", password="pass", is_customer=True)
+        self.workers = [make_worker(f"worker{n}") for n in range(3)]
+        self.job = Job.objects.create(customer=self.customer, title="Fix sink", description="Leaking",
+                                      location="Dhaka", budget=1000)
+        feed.rebuild()
+
+    def counters(self):
+        job = Job.objects.get(id=self.job.id)
+        entry = OpenJobFeed.objects.get(job_id=self.job.id)
+        self.assertEqual((entry.bid_count, entry.lowest_bid), (job.bid_count, job.lowest_bid))
+        return job.bid_count, job.lowest_bid
+
+    def test_bids_and_withdrawals_keep_the_counters(self):
+        bids = [bidding.place_bid(worker, self.job, amount)
+                for worker, amount in zip(self.workers, ("700", "500", "900"))]
+        self.assertEqual(self.counters(), (3, Decimal("500")))
+
+        bidding.withdraw_bid(bids[1])
+        self.assertEqual(self.counters(), (2, Decimal("700")))
+        self.assertEqual(Job.objects.get(id=self.job.id).best_bid_id, bids[0].id)
+
+        bidding.withdraw_bid(bids[0])
+        bidding.withdraw_bid(bids[2])
+        self.assertEqual(self.counters(), (0, None))
+        self.assertIsNone(Job.objects.get(id=self.job.id).best_bid)
+
+    def test_counter_updates_change_the_job_list_etag(self):
+        client = APIClient()
+        client.force_authenticate(self.customer)
+        etag = client.get("/jobs/")["ETag"]
+
+        bid = bidding.place_bid(self.workers[0], self.job, "700")
+        self.assertEqual(client.get("/jobs/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        etag = client.get("/jobs/")["ETag"]
+
+        bidding.withdraw_bid(bid)
+        self.assertEqual(client.get("/jobs/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_rescoring_only_touches_jobs_whose_best_bid_changed(self):
+        other = Job.objects.create(customer=self.customer, title="Paint", description="Wall", location="Dhaka",
+                                   budget=1000)
+        bidding.place_bid(self.workers[0], self.job, "700")
+        cheaper = bidding.place_bid(self.workers[1], self.job, "500")
+        bidding.place_bid(self.workers[0], other, "700")
+        stamps = dict(Job.objects.values_list("id", "updated_at"))
+
+        # make the pricier bid the best one behind the ranking's back
+        Bid.objects.filter(id=cheaper.id).update(rank_score=0)
+        Job.objects.filter(id=self.job.id).update(best_bid=Bid.objects.exclude(id=cheaper.id).get(job=self.job))
+        self.assertEqual(bidding.rescore_open_jobs(), 3)
+
+        after = dict(Job.objects.values_list("id", "updated_at"))
+        self.assertEqual(Job.objects.get(id=self.job.id).best_bid_id, cheaper.id)
+        self.assertGreater(after[self.job.id], stamps[self.job.id])
+        self.assertEqual(after[other.id], stamps[other.id])
+
+    def test_repair_bid_counters(self):
+        for worker, amount in zip(self.workers, ("700", "500")):
+            bidding.place_bid(worker, self.job, amount)
+        Job.objects.filter(id=self.job.id).update(bid_count=7, lowest_bid=100)
+        OpenJobFeed.objects.filter(job_id=self.job.id).update(bid_count=7, lowest_bid=100)
+
+        with self.assertRaises(CommandError):
+            call_command("repair_bid_counters", "--verify", stdout=StringIO())
+        output = StringIO()
+        call_command("repair_bid_counters", stdout=output)
+        self.assertIn(f"Job {self.job.id}: bid counters did not match its bids.", output.getvalue())
+        self.assertIn("1 job(s) repaired.", output.getvalue())
+        self.assertEqual(self.counters(), (2, Decimal("500")))
+        call_command("repair_bid_counters", "--verify", stdout=StringIO())
@@ -0,0 +1,42 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import Job, User
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = User.objects.create_user(username="customer", password="pass", is_customer=True)
+        self.jobs = [
+            Job.objects.create(customer=self.customer, title=f"Job {n}", description="Details", location="Dhaka",
+                               budget=500)
+            for n in range(2)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+
+    def test_list_answers_if_none_match(self):
+        response = self.client.get("/jobs/")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Last-Modified", response)
+
+        response = self.client.get("/jobs/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_removing_a_row_changes_the_list_etag(self):
+        etag = self.client.get("/jobs/")["ETag"]
+        Job.objects.filter(id=self.jobs[0].id).delete()
+
+        response = self.client.get("/jobs/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+
+    def test_status_endpoint_answers_if_modified_since(self):
+        url = f"/jobs/{self.jobs[0].id}/"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
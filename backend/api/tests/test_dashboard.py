@@ -0,0 +1,59 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.models import Job, Payment, User, Worker
+
+
+class CustomerDashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = User.objects.create_user(username="customer", password="pass", is_customer=True)
+        worker_user = User.objects.create_user(username="worker", password="pass", is_worker=True)
+        self.worker = Worker.objects.create(user=worker_user, skills="Plumbing", experience=3, location="Dhaka")
+        self.job = Job.objects.create(customer=self.customer, title="Fix sink", description="Leaking",
+                                      location="Dhaka", budget=500)
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+        self.worker_client = APIClient()
+        self.worker_client.force_authenticate(worker_user)
+
+    def dashboard(self):
+        response = self.client.get("/customer/dashboard/")
+        self.assertEqual(response.status_code, 200)
+        return response.json()["data"]
+
+    def test_totals(self):
+        done = Job.objects.create(customer=self.customer, title="Paint", description="Wall", location="Dhaka",
+                                  budget=300, status="completed", assigned_worker=self.worker)
+        Payment.objects.create(job=done, amount=300, method="bkash", status="completed")
+
+        data = self.dashboard()
+        self.assertEqual(data["jobs"], {"total": 2, "open": 1, "in_progress": 0, "closed": 0, "completed": 1})
+        self.assertEqual(Decimal(str(data["total_spent"])), Decimal("300"))
+        self.assertEqual(data["pending_payments"]["count"], 0)
+
+    def test_cached_numbers_are_dropped_by_writes(self):
+        self.assertEqual(self.dashboard()["jobs"]["total"], 1)
+
+        # a change made behind the write paths is not seen until the cache expires
+        Job.objects.create(customer=self.customer, title="Hidden", description="d", location="Dhaka", budget=1)
+        self.assertEqual(self.dashboard()["jobs"]["total"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/jobs/create/",
+                {"title": "Paint wall", "description": "One room", "location": "Dhaka", "budget": "800"},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.dashboard()["jobs"]["total"], 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.worker_client.post(
+                "/worker/bid/", {"job_id": self.job.id, "bid_amount": "450"}, format="json",
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.dashboard()["total_bids"], 1)
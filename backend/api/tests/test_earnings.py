@@ -0,0 +1,106 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import earnings
+from api.archive import archive_jobs
+from api.models import ArchivedJob, Job, MonthlyWorkerEarnings, Payment, User, Worker
+from api.utils import release_funds
+
+
+def at(year, month, day):
+    return timezone.make_aware(datetime(year, month, day, 12))
+
+
+class MonthTests(SimpleTestCase):
+    def test_add_months_crosses_years(self):
+        self.assertEqual(earnings.add_months(date(2026, 11, 1), 3), date(2027, 2, 1))
+        self.assertEqual(earnings.add_months(date(2026, 2, 1), -2), date(2025, 12, 1))
+        self.assertEqual(earnings.month_of(date(2026, 5, 31)), date(2026, 5, 1))
+
+
+class EarningsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = User.objects.create_user(username="customer", password="pass", is_customer=True)
+        self.user = User.objects.create_user(username="worker", password="pass", is_worker=True)
+        self.worker = Worker.objects.create(user=self.user, skills="Plumbing", experience=3, location="Dhaka")
+
+    def payment(self, amount, completed_at, status="completed"):
+        job = Job.objects.create(customer=self.customer, title="Fix sink", description="Leaking", location="Dhaka",
+                                 budget=amount, status="in-progress", assigned_worker=self.worker)
+        return Payment.objects.create(job=job, amount=amount, method="bkash", status=status,
+                                      completed_at=completed_at if status == "completed" else None)
+
+    def paid(self, amount, completed_at):
+        self.payment(amount, completed_at)
+        earnings.payment_completed(self.worker.id, Decimal(amount), completed_at)
+
+    def test_statement_across_months(self):
+        self.paid("100", at(2025, 12, 3))
+        self.paid("50", at(2025, 12, 28))
+        self.paid("200", at(2026, 2, 14))
+        self.paid("75", at(2026, 3, 1))
+
+        statement = earnings.statement(self.worker.id, months=4, today=date(2026, 3, 20))
+        self.assertEqual(
+            [(month["month"], month["payments"], month["amount"]) for month in statement],
+            [("2026-03", 1, Decimal("75")), ("2026-02", 1, Decimal("200")), ("2026-01", 0, Decimal("0")),
+             ("2025-12", 2, Decimal("150"))],
+        )
+        self.assertEqual(len(earnings.statement(self.worker.id, months=2, today=date(2026, 3, 20))), 2)
+
+    def test_rebuild_matches_the_incremental_rollup(self):
+        self.paid("100", at(2025, 12, 3))
+        self.paid("200", at(2026, 2, 14))
+        self.payment("999", None, status="pending")
+        ArchivedJob.objects.create(id=999, customer=self.customer, assigned_worker=self.worker, title="Old",
+                                   location="Dhaka", budget=40, status="completed", payment_amount=40,
+                                   payment_status="completed", created_at=at(2025, 11, 1),
+                                   updated_at=at(2025, 12, 20))
+        earnings.payment_completed(self.worker.id, Decimal("40"), at(2025, 12, 20))
+        incremental = set(MonthlyWorkerEarnings.objects.values_list("worker_id", "month", "payments", "amount"))
+
+        self.assertEqual(earnings.rebuild(), 2)
+        self.assertEqual(
+            set(MonthlyWorkerEarnings.objects.values_list("worker_id", "month", "payments", "amount")), incremental,
+        )
+        self.assertIn((self.worker.id, date(2025, 12, 1), 2, Decimal("140")), incremental)
+
+    def test_archived_payments_stay_in_the_month_they_were_completed(self):
+        self.paid("60", at(2026, 1, 10))
+        Job.objects.update(status="completed", updated_at=at(2026, 3, 5))
+        list(archive_jobs(at(2026, 4, 1)))
+
+        self.assertEqual(ArchivedJob.objects.get().payment_completed_at, at(2026, 1, 10))
+        earnings.rebuild()
+        self.assertEqual(
+            list(MonthlyWorkerEarnings.objects.values_list("month", "payments", "amount")),
+            [(date(2026, 1, 1), 1, Decimal("60"))],
+        )
+
+    def test_release_funds_adds_to_this_month(self):
+        payment = self.payment("300", None, status="pending")
+        release_funds(payment)
+        release_funds(self.payment("20", None, status="pending"))
+
+        row = MonthlyWorkerEarnings.objects.get()
+        self.assertEqual((row.month, row.payments, row.amount), (earnings.month_of(timezone.now()), 2, 320))
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        release_funds(self.payment("300", None, status="pending"))
+
+        response = client.get("/worker/earnings/", {"months": 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(str(response.json()["data"]["total"])), Decimal("300"))
+        self.assertEqual(len(response.json()["data"]["months"]), 3)
+        self.assertEqual(client.get("/worker/earnings/", {"months": 0}).status_code, 400)
+
+        client.force_authenticate(self.customer)
+        self.assertEqual(client.get("/worker/earnings/").status_code, 403)
@@ -0,0 +1,138 @@
+import asyncio
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api import bidding, events
+from api.models import Job, Payment, User, Worker
+from api.tokens import RoleRefreshToken
+from api.utils import release_funds
+
+
+class RecordingBackend(events.BaseEventBackend):
+    def __init__(self):
+        self.published = []
+
+    def publish(self, user_id, event):
+        self.published.append((user_id, event["type"], event["data"]))
+
+
+class InMemoryBackendTests(SimpleTestCase):
+    def test_events_reach_only_the_users_subscribers(self):
+        async def run():
+            backend = events.InMemoryEventBackend()
+            mine, other = backend.subscribe(1), backend.subscribe(2)
+            backend.publish(1, {"id": 1, "type": events.BID_CREATED, "data": {}})
+            event = await mine.get(timeout=1)
+            with self.assertRaises(asyncio.TimeoutError):
+                await other.get(timeout=0.01)
+            mine.close()
+            other.close()
+            self.assertEqual(backend._subscribers, {})
+            return event
+
+        self.assertEqual(asyncio.run(run())["type"], events.BID_CREATED)
+
+    def test_slow_consumers_lose_events(self):
+        async def run():
+            backend = events.InMemoryEventBackend(queue_size=2)
+            subscription = backend.subscribe(1)
+            for n in range(5):
+                backend.publish(1, {"id": n, "type": events.BID_CREATED, "data": {}})
+            await asyncio.sleep(0)
+            return subscription.queue.qsize()
+
+        self.assertEqual(asyncio.run(run()), 2)
+
+    def test_stream_format(self):
+        async def run():
+            backend = events.InMemoryEventBackend()
+            subscription = backend.subscribe(1)
+            stream = events.stream_events(subscription, keepalive=0.01)
+            chunks = [await stream.__anext__(), await stream.__anext__()]
+            backend.publish(1, {"id": 7, "type": events.JOB_ASSIGNED, "data": {"amount": Decimal("1.50")}})
+            chunks.append(await stream.__anext__())
+            await stream.aclose()
+            return chunks, backend._subscribers
+
+        chunks, subscribers = asyncio.run(run())
+        self.assertEqual(chunks, [
+            "retry: 5000\n\n", ": keepalive\n\n", 'id: 7\nevent: job.assigned\ndata: {"amount": "1.50"}\n\n',
+        ])
+        self.assertEqual(subscribers, {})
+
+
+@override_settings(THROTTLE_RATES={})
+class PublishTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.backend = events._backend = RecordingBackend()
+        self.customer = User.objects.create_user(username="customer", password="pass", is_customer=True)
+        self.worker_user = User.objects.create_user(username="worker", password="pass", is_worker=True)
+        self.worker = Worker.objects.create(user=self.worker_user, skills="Plumbing", experience=3, location="Dhaka")
+        self.job = Job.objects.create(customer=self.customer, title="Fix sink", description="Leaking",
+                                      location="Dhaka", budget=500)
+
+    def tearDown(self):
+        events._backend = None
+
+    def test_events_are_published_after_commit(self):
+        client = APIClient()
+        client.force_authenticate(self.worker_user)
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = client.post("/worker/bid/", {"job_id": self.job.id, "bid_amount": "450"}, format="json")
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(self.backend.published, [])
+        for callback in callbacks:
+            callback()
+        self.assertEqual([(user_id, kind) for user_id, kind, _ in self.backend.published],
+                         [(self.customer.id, events.BID_CREATED)])
+
+    def test_assignment_and_payment_events(self):
+        bid = bidding.place_bid(self.worker, self.job, "450")
+        with self.captureOnCommitCallbacks(execute=True):
+            bidding.assign_bid(bid.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            release_funds(Payment.objects.create(job=self.job, amount=450, method="bkash"))
+
+        self.assertEqual(
+            [(user_id, kind) for user_id, kind, _ in self.backend.published],
+            [(self.worker_user.id, events.JOB_ASSIGNED), (self.customer.id, events.PAYMENT_COMPLETED),
+             (self.worker_user.id, events.PAYMENT_COMPLETED)],
+        )
+        self.assertEqual(self.backend.published[1][2]["job_id"], self.job.id)
+
+    def test_rolled_back_changes_publish_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                events.publish_event(self.customer.id, events.BID_CREATED, {})
+                raise RuntimeError
+        self.assertEqual(self.backend.published, [])
+
+
+@override_settings(THROTTLE_RATES={})
+class EventStreamViewTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="customer", password="pass", is_customer=True)
+        self.token = str(RoleRefreshToken.for_user(user).access_token)
+
+    async def test_requires_a_valid_token(self):
+        self.assertEqual((await self.async_client.get("/events/stream/")).status_code, 401)
+        response = await self.async_client.get("/events/stream/", {"token": "nonsense"})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_token_in_the_query_string(self):
+        events._backend = None
+        try:
+            response = await self.async_client.get("/events/stream/", {"token": self.token})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["Content-Type"], "text/event-stream")
+            self.assertEqual(response["Cache-Control"], "no-cache")
+        finally:
+            events._backend = None
+
+    def test_unavailable_under_wsgi(self):
+        self.assertEqual(self.client.get("/events/stream/", {"token": self.token}).status_code, 503)
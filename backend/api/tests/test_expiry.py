@@ -0,0 +1,76 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import feed
+from api.expiry import expire_jobs
+from api.models import Bid, Job, OpenJobFeed, User, Worker
+
+
+class JobExpiryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = timezone.now()
+        self.customer = User.objects.create_user(username="customer", password="pass", is_customer=True)
+        worker_user = User.objects.create_user(username="worker", password="pass", is_worker=True)
+        self.worker = Worker.objects.create(user=worker_user, skills="Plumbing", experience=3, location="Dhaka")
+        self.client = APIClient()
+        self.client.force_authenticate(worker_user)
+
+    def job(self, title, expires_in=None, **fields):
+        expires_at = self.now + expires_in if expires_in is not None else None
+        return Job.objects.create(customer=self.customer, title=title, description="Details", location="Dhaka",
+                                  budget=500, expires_at=expires_at, **fields)
+
+    def test_expired_jobs_are_closed_and_their_bids_ignored(self):
+        expired = [self.job(f"Expired {n}", timedelta(hours=-1)) for n in range(3)]
+        live = self.job("Live", timedelta(hours=1))
+        forever = self.job("No expiry")
+        bid = Bid.objects.create(job=expired[0], worker=self.worker, bid_amount=400)
+        Job.objects.filter(id=expired[0].id).update(best_bid=bid)
+        feed.rebuild()
+
+        self.assertEqual(expire_jobs(now=self.now, batch_size=2), 3)
+
+        self.assertEqual(set(Job.objects.filter(status="closed")), set(expired))
+        self.assertEqual(Bid.objects.get().status, "ignored")
+        self.assertFalse(Job.objects.filter(best_bid__isnull=False).exists())
+        self.assertEqual(set(OpenJobFeed.objects.values_list("job_id", flat=True)), {live.id, forever.id})
+        self.assertEqual(expire_jobs(now=self.now), 0)
+
+    def test_auto_award_jobs_with_a_bid_are_left_open(self):
+        job = self.job("Auto", timedelta(hours=-1), auto_award=True)
+        bid = Bid.objects.create(job=job, worker=self.worker, bid_amount=400)
+        Job.objects.filter(id=job.id).update(best_bid=bid)
+
+        self.assertEqual(expire_jobs(now=self.now), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "open")
+
+    def test_worker_job_list_hides_expired_jobs(self):
+        self.job("Expired", timedelta(hours=-1))
+        live = self.job("Live", timedelta(hours=1))
+        feed.rebuild()
+
+        response = self.client.get("/worker/job_list/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([entry["id"] for entry in response.json()], [live.id])
+
+    def test_bids_on_expired_jobs_are_rejected(self):
+        job = self.job("Expired", timedelta(hours=-1), auto_award=True)
+
+        response = self.client.post("/worker/bid/", {"job_id": job.id, "bid_amount": "400"}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Bid.objects.exists())
+
+    def test_command_reports_closed_jobs(self):
+        self.job("Expired", timedelta(hours=-1))
+        output = StringIO()
+        call_command("expire_jobs", stdout=output)
+        self.assertIn("Closed 1 expired job(s).", output.getvalue())
+
@@ -0,0 +1,92 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api import bidding, feed
+from api.models import Job, OpenJobFeed, Review, User, Worker
+
+
+@override_settings(THROTTLE_RATES={})
+class OpenJobFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = User.objects.create_user(username="customer", password="pass", is_customer=True)
+        self.worker_user = User.objects.create_user(username="worker", password="pass", is_worker=True)
+        self.worker = Worker.objects.create(user=self.worker_user, skills="Plumbing", experience=3, location="Dhaka")
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+        self.worker_client = APIClient()
+        self.worker_client.force_authenticate(self.worker_user)
+
+    def create(self, title, budget, location="Dhaka"):
+        response = self.client.post(
+            "/jobs/create/", {"title": title, "description": "Details", "location": location, "budget": budget},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        return Job.objects.get(id=response.json()["data"]["id"])
+
+    def listed(self, **params):
+        response = self.worker_client.get("/worker/job_list/", params)
+        self.assertEqual(response.status_code, 200)
+        return [entry["id"] for entry in response.json()]
+
+    def test_write_paths_keep_the_feed_in_step(self):
+        job = self.create("Fix sink", "500")
+        self.assertEqual(OpenJobFeed.objects.get(job_id=job.id).title, "Fix sink")
+
+        self.client.patch(f"/jobs/{job.id}/update/", {"title": "Fix kitchen sink", "budget": "600"}, format="json")
+        entry = OpenJobFeed.objects.get(job_id=job.id)
+        self.assertEqual((entry.title, entry.budget), ("Fix kitchen sink", Decimal("600")))
+
+        bid = bidding.place_bid(self.worker, job, "450")
+        entry.refresh_from_db()
+        self.assertEqual((entry.bid_count, entry.lowest_bid), (1, Decimal("450")))
+
+        bidding.assign_bid(bid.id)
+        self.assertFalse(OpenJobFeed.objects.filter(job_id=job.id).exists())
+        self.assertEqual(feed.rebuild(fix=False), ([], [], []))
+
+    def test_filters_and_orderings(self):
+        cheap = self.create("Fix sink", "300")
+        busy = self.create("Paint wall", "800", location="Mirpur, Dhaka")
+        far = self.create("Roof", "900", location="Sylhet")
+        for n in range(2):
+            user = User.objects.create_user(username=f"bidder{n}", password="pass", is_worker=True)
+            bidder = Worker.objects.create(user=user, skills="Painting", experience=1, location="Dhaka")
+            bidding.place_bid(bidder, busy, str(700 - n * 100))
+        bidding.place_bid(self.worker, far, "850")
+
+        self.assertEqual(self.listed(), [cheap.id, busy.id, far.id])
+        self.assertEqual(self.listed(location="dhaka"), [cheap.id, busy.id])
+        self.assertEqual(self.listed(min_budget="500", max_budget="850"), [busy.id])
+        self.assertEqual(self.listed(max_bids="1"), [cheap.id, far.id])
+        self.assertEqual(self.listed(ordering="-bid_count"), [busy.id, far.id, cheap.id])
+        # where a job without bids sorts depends on the database's NULL ordering
+        self.assertEqual([job_id for job_id in self.listed(ordering="lowest_bid") if job_id != cheap.id],
+                         [busy.id, far.id])
+        self.client.force_authenticate(self.customer)
+        self.assertEqual(self.client.get("/worker/job_list/").json(), [])
+
+    def test_rebuild_repairs_missing_stale_and_orphaned_rows(self):
+        missing, stale, orphaned = self.create("Fix sink", "300"), self.create("Paint", "800"), self.create("Roof", "900")
+        OpenJobFeed.objects.filter(job_id=missing.id).delete()
+        Job.objects.filter(id=stale.id).update(title="Paint wall")
+        Job.objects.filter(id=orphaned.id).update(status="closed")
+        Review.objects.create(job=orphaned, reviewer=self.worker_user, reviewee=self.customer, review_type="customer",
+                              rating=4)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_open_job_feed", "--verify", stdout=StringIO())
+        self.assertEqual(feed.rebuild(chunk_size=1), ([missing.id], [stale.id], [orphaned.id]))
+
+        self.assertEqual(OpenJobFeed.objects.get(job_id=stale.id).title, "Paint wall")
+        self.assertEqual(OpenJobFeed.objects.get(job_id=missing.id).customer_rating, Decimal("4.00"))
+        self.assertFalse(OpenJobFeed.objects.filter(job_id=orphaned.id).exists())
+        output = StringIO()
+        call_command("rebuild_open_job_feed", "--verify", stdout=output)
+        self.assertIn("Open job feed matches the source tables.", output.getvalue())
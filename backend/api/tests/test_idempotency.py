@@ -0,0 +1,127 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import bidding
+from api.idempotency import _hash
+from api.models import Bid, IdempotencyKey, Job, User, Worker
+
+FINGERPRINT = "f" * 64
+
+
+class IdempotencyFixture:
+    def setUp(self):
+        cache.clear()
+        customer = User.objects.create_user(username="customer", password="pass", is_customer=True)
+        self.job = Job.objects.create(customer=customer, title="Fix sink", description="Leaking", location="Dhaka",
+                                      budget=500)
+        self.user = User.objects.create_user(username="worker", password="pass", is_worker=True)
+        Worker.objects.create(user=self.user, skills="Plumbing", experience=3, location="Dhaka")
+
+    def bid(self, key, amount="450", user=None):
+        client = APIClient()
+        client.force_authenticate(user or self.user)
+        return client.post(
+            "/worker/bid/", {"job_id": self.job.id, "bid_amount": amount}, format="json", HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+
+@override_settings(THROTTLE_RATES={})
+class IdempotencyKeyTests(IdempotencyFixture, TestCase):
+    def test_repeat_gets_the_stored_response(self):
+        first = self.bid("key-1")
+        second = self.bid("key-1")
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(Bid.objects.count(), 1)
+
+    def test_key_reused_with_a_different_body_is_rejected(self):
+        self.bid("key-1")
+        response = self.bid("key-1", amount="300")
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Bid.objects.get().bid_amount, 450)
+
+    def test_keys_are_per_user(self):
+        other = User.objects.create_user(username="other", password="pass", is_worker=True)
+        Worker.objects.create(user=other, skills="Tiling", experience=1, location="Dhaka")
+        self.bid("key-1")
+        self.assertEqual(self.bid("key-1", user=other).status_code, 201)
+        self.assertEqual(Bid.objects.count(), 2)
+
+    def test_errors_are_replayed_too(self):
+        self.bid("key-1")
+        first = self.bid("key-2")
+        self.assertEqual(first.status_code, 400)
+        self.assertEqual(self.bid("key-2")["Idempotent-Replayed"], "true")
+
+    @override_settings(IDEMPOTENCY_WAIT_SECONDS=0.2)
+    def test_claim_held_elsewhere_answers_conflict(self):
+        # the same request, still running in another process
+        self.claim(locked_until=timezone.now() + timedelta(seconds=30))
+        with mock.patch("api.idempotency._fingerprint", return_value=FINGERPRINT):
+            self.assertEqual(self.bid("key-1").status_code, 409)
+        self.assertFalse(Bid.objects.exists())
+
+    def test_abandoned_claim_is_taken_over(self):
+        self.claim(locked_until=timezone.now() - timedelta(seconds=1))
+        with mock.patch("api.idempotency._fingerprint", return_value=FINGERPRINT):
+            self.assertEqual(self.bid("key-1").status_code, 201)
+        self.assertEqual(IdempotencyKey.objects.get().status_code, 201)
+
+    def test_expired_keys_are_purged(self):
+        self.bid("key-1")
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+        output = StringIO()
+        call_command("purge_idempotency_keys", stdout=output)
+        self.assertIn("Deleted 1", output.getvalue())
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def claim(self, locked_until):
+        IdempotencyKey.objects.create(
+            user=self.user, key=_hash("key-1"), fingerprint=FINGERPRINT, locked_until=locked_until,
+            created_at=timezone.now(),
+        )
+
+
+@override_settings(THROTTLE_RATES={}, IDEMPOTENCY_WAIT_SECONDS=10)
+class ConcurrentDuplicateTests(IdempotencyFixture, TransactionTestCase):
+    def test_duplicate_waits_for_the_first_response(self):
+        started, release = threading.Event(), threading.Event()
+        place_bid = bidding.place_bid
+
+        def slow_place_bid(*args):
+            started.set()
+            release.wait(5)
+            return place_bid(*args)
+
+        responses = {}
+
+        def first():
+            try:
+                responses["first"] = self.bid("key-1")
+            finally:
+                connection.close()
+
+        with mock.patch("api.bidding.place_bid", side_effect=slow_place_bid):
+            thread = threading.Thread(target=first)
+            thread.start()
+            self.assertTrue(started.wait(5))
+            threading.Timer(0.2, release.set).start()
+            responses["second"] = self.bid("key-1")
+            thread.join(5)
+
+        self.assertEqual(responses["first"].status_code, 201)
+        self.assertEqual(responses["second"].status_code, 201)
+        self.assertEqual(responses["second"]["Idempotent-Replayed"], "true")
+        self.assertEqual(Bid.objects.count(), 1)
@@ -0,0 +1,77 @@
+import io
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from api.models import User, Worker
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_file(name="photo.png", fmt="PNG", size=(64, 48)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "red").save(buffer, fmt)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, PROFILE_THUMBNAIL_WORKERS=0)
+class ProfilePictureTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username="worker", password="pass", is_worker=True)
+        self.worker = Worker.objects.create(user=user, skills="Plumbing", experience=3, location="Dhaka")
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def upload(self, upload):
+        return self.client.patch("/worker/profile/update/", {"profile_picture": upload}, format="multipart")
+
+    def test_thumbnails_are_rendered_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.upload(image_file())
+        self.assertEqual(response.status_code, 200)
+        # the response is built before the thumbnails exist
+        self.assertFalse(response.json()["data"]["thumbnails"]["small"]["webp"].endswith(".webp"))
+
+        response = self.client.patch("/worker/profile/update/", {"skills": "Tiling"}, format="multipart")
+        thumbnails = response.json()["data"]["thumbnails"]
+        self.assertTrue(thumbnails["small"]["webp"].endswith("_small.webp"))
+        self.assertTrue(thumbnails["medium"]["jpeg"].endswith("_medium.jpeg"))
+
+    def test_missing_thumbnails_fall_back_to_the_original(self):
+        response = self.upload(image_file())
+        self.worker.refresh_from_db()
+        thumbnails = response.json()["data"]["thumbnails"]
+        self.assertEqual(thumbnails["small"]["webp"], self.worker.profile_picture.url)
+
+    @override_settings(MAX_UPLOAD_SIZE=1024)
+    def test_upload_over_the_size_limit_is_rejected(self):
+        response = self.upload(image_file(size=(400, 400)))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("too large", response.json()["errors"]["profile_picture"][0])
+
+    def test_file_that_is_not_an_image_is_rejected(self):
+        response = self.upload(SimpleUploadedFile("photo.png", b"not an image"))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"]["profile_picture"], ["Upload a valid image."])
+
+    def test_unsupported_format_is_rejected(self):
+        response = self.upload(image_file("photo.gif", "GIF"))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Unsupported image format", response.json()["errors"]["profile_picture"][0])
+
+    @override_settings(PROFILE_PICTURE_MAX_PIXELS=100)
+    def test_image_with_too_many_pixels_is_rejected(self):
+        response = self.upload(image_file())
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"]["profile_picture"], ["Image dimensions are too large."])
@@ -0,0 +1,121 @@
+import json
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api import imports
+from api.imports import JobImportError
+from api.models import Job, OpenJobFeed, User
+
+CSV = (
+    "\ufefftitle,description,location,budget,urgency,notes\n"
+    "Fix sink,Leaking,Dhaka,500,3,ignored\n"
+    "Paint wall,One room,Dhaka,800,,\n"
+)
+
+
+class ParseTests(SimpleTestCase):
+    def test_csv(self):
+        self.assertEqual(imports.parse_csv(CSV), [
+            {"title": "Fix sink", "description": "Leaking", "location": "Dhaka", "budget": "500", "urgency": "3"},
+            {"title": "Paint wall", "description": "One room", "location": "Dhaka", "budget": "800"},
+        ])
+        with self.assertRaisesMessage(JobImportError, "Missing column(s): budget."):
+            imports.parse_csv("title,description,location\nFix,Leaking,Dhaka\n")
+
+    def test_json(self):
+        row = {"title": "Fix sink", "budget": 500, "status": "completed"}
+        self.assertEqual(imports.parse_json([row]), [{"title": "Fix sink", "budget": 500}])
+        self.assertEqual(imports.parse_json(json.dumps({"jobs": [row]})), [{"title": "Fix sink", "budget": 500}])
+        for data in ("{not json", {"jobs": "Fix sink"}, [1, 2]):
+            with self.assertRaises(JobImportError):
+                imports.parse_json(data)
+        with self.assertRaisesMessage(JobImportError, "UTF-8"):
+            imports.parse_file("jobs.csv", "title".encode("utf-16"))
+
+
+@override_settings(THROTTLE_RATES={}, JOB_IMPORT_MAX_ROWS=5)
+class ImportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = User.objects.create_user(username="customer", password="pass", is_customer=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+        Job.objects.create(customer=self.customer, title="Fix sink", description="Leaking", location="Dhaka",
+                           budget=500)
+
+    def rows(self):
+        return [
+            {"title": "Fix sink", "description": "Leaking", "location": "Dhaka", "budget": "500"},
+            {"title": "Paint wall", "description": "One room", "location": "Dhaka", "budget": "800", "urgency": 4},
+            {"title": "Paint wall", "description": "One room", "location": "Sylhet", "budget": "900"},
+            {"title": "Roof", "description": "Tiles", "location": "Dhaka", "budget": "lots"},
+            {"title": "Fence", "description": "Garden", "location": "Dhaka", "budget": "300", "urgency": 9},
+        ]
+
+    def test_rows_are_reported_in_order(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/jobs/import/", self.rows(), format="json")
+        self.assertEqual(response.status_code, 201)
+        data = response.json()["data"]
+        self.assertEqual(data["summary"], {"created": 1, "valid": 0, "duplicate": 2, "invalid": 2})
+        self.assertEqual([row["status"] for row in data["rows"]],
+                         ["duplicate", "created", "duplicate", "invalid", "invalid"])
+        self.assertIn("budget", data["rows"][3]["errors"])
+        self.assertIn("urgency", data["rows"][4]["errors"])
+
+        job = Job.objects.get(id=data["rows"][1]["id"])
+        self.assertEqual((job.title, job.urgency), ("Paint wall", 4))
+        self.assertEqual(OpenJobFeed.objects.get(job_id=job.id).urgency, 4)
+
+    def test_dry_run_creates_nothing(self):
+        response = self.client.post("/jobs/import/?dry_run=true", self.rows(), format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["summary"], {"created": 0, "valid": 1, "duplicate": 2, "invalid": 2})
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_csv_upload(self):
+        upload = SimpleUploadedFile("jobs.csv", CSV.encode(), content_type="text/csv")
+        response = self.client.post("/jobs/import/", {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["data"]["summary"]["created"], 1)
+        self.assertEqual(Job.objects.get(title="Paint wall").urgency, 1)
+
+    @override_settings(MAX_UPLOAD_SIZE=16)
+    def test_upload_over_the_size_limit_is_rejected(self):
+        upload = SimpleUploadedFile("jobs.csv", CSV.encode(), content_type="text/csv")
+        response = self.client.post("/jobs/import/", {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("too large", response.json()["errors"]["file"][0])
+
+    def test_limits_and_permissions(self):
+        response = self.client.post("/jobs/import/", self.rows() * 2, format="json")
+        self.assertEqual(response.status_code, 400)
+
+        worker = User.objects.create_user(username="worker", password="pass", is_worker=True)
+        self.client.force_authenticate(worker)
+        self.assertEqual(self.client.post("/jobs/import/", self.rows(), format="json").status_code, 403)
+
+    def test_command(self):
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / "jobs.json"
+            path.write_text(json.dumps(self.rows()))
+            output = StringIO()
+            call_command("import_jobs", str(path), "--customer", "customer", "--dry-run", stdout=output)
+        self.assertIn("Row 1: duplicate (already posted)", output.getvalue())
+        self.assertIn("0 created, 1 valid (dry run), 2 duplicate, 2 invalid.", output.getvalue())
+
+    def test_created_jobs_keep_their_urgency(self):
+        response = self.client.post(
+            "/jobs/create/",
+            {"title": "Paint", "description": "Wall", "location": "Dhaka", "budget": "800", "urgency": 5},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Job.objects.get(title="Paint").urgency, 5)
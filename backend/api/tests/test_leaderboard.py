@@ -0,0 +1,103 @@
+import random
+
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from api import leaderboard
+from api.leaderboard import RankedIndex, bayesian_score
+from api.models import Job, Review, User, Worker
+
+
+class RankedIndexTests(SimpleTestCase):
+    def test_matches_a_sorted_list(self):
+        index = RankedIndex()
+        index.LOAD = 4
+        expected = {}
+        rng = random.Random(7)
+        for _ in range(2000):
+            worker_id = rng.randrange(60)
+            if rng.random() < 0.2:
+                index.discard(worker_id)
+                expected.pop(worker_id, None)
+            else:
+                key = (-rng.randrange(5), -rng.randrange(3), worker_id)
+                index.add(worker_id, key)
+                expected[worker_id] = key
+
+        ordered = sorted(expected.values())
+        self.assertEqual(len(index), len(ordered))
+        self.assertEqual(index.top(len(ordered) + 5), [key[2] for key in ordered])
+        self.assertEqual(index.top(7), [key[2] for key in ordered[:7]])
+        for position, key in enumerate(ordered, 1):
+            self.assertEqual(index.rank(key[2]), position)
+        self.assertIsNone(index.rank(1000))
+        self.assertTrue(all(len(sublist) <= 2 * index.LOAD for sublist in index.sublists))
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        leaderboard._board = None
+        self.customer = User.objects.create_user(username="customer", password="pass", is_customer=True)
+        self.workers = []
+        for n, location in enumerate(["Dhaka", "Dhaka", "Sylhet"]):
+            user = User.objects.create_user(username=f"worker{n}", password="pass", is_worker=True)
+            self.workers.append(Worker.objects.create(user=user, skills="Plumbing", experience=3, location=location))
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+
+    def tearDown(self):
+        leaderboard._board = None
+
+    def top_ids(self, location=None):
+        return [stats.worker_id for _, stats in leaderboard.top_workers(10, location)]
+
+    def test_reviews_order_the_board(self):
+        leaderboard.review_added(self.workers[0], 3)
+        leaderboard.review_added(self.workers[1], 5)
+        leaderboard.review_added(self.workers[2], 4)
+
+        self.assertEqual(self.top_ids(), [self.workers[1].id, self.workers[2].id, self.workers[0].id])
+        self.assertEqual(self.top_ids("dhaka"), [self.workers[1].id, self.workers[0].id])
+        self.assertEqual(leaderboard.rank_of(self.workers[0].id), (3, 2))
+        self.assertIsNone(leaderboard.rank_of(9999))
+        self.assertEqual(self.workers[1].rating_stats.score, bayesian_score(5, 1))
+
+    def test_a_board_built_earlier_catches_up_with_later_writes(self):
+        # another process's board: built before the write, it only sees the database
+        leaderboard.review_added(self.workers[0], 4)
+        board = leaderboard.get_board()
+        leaderboard.review_added(self.workers[2], 5)
+        self.workers[0].location = "Sylhet"
+        self.workers[0].save()
+        leaderboard.worker_profile_changed(self.workers[0])
+
+        with self.assertNumQueries(2):
+            self.assertIs(leaderboard.get_board(), board)
+        self.assertEqual(self.top_ids("sylhet"), [self.workers[2].id, self.workers[0].id])
+        self.assertEqual(self.top_ids("dhaka"), [])
+        with self.assertNumQueries(1):
+            leaderboard.get_board()
+
+    def test_rebuild_reloads_every_board(self):
+        board = leaderboard.get_board()
+        job = Job.objects.create(customer=self.customer, title="Fix", description="d", location="Dhaka", budget=1,
+                                 status="completed", assigned_worker=self.workers[1])
+        Review.objects.create(job=job, reviewer=self.customer, reviewee=self.workers[1].user, review_type="worker",
+                              rating=5)
+
+        self.assertEqual(leaderboard.rebuild(), 1)
+        self.assertIsNot(leaderboard.get_board(), board)
+        self.assertEqual(self.top_ids(), [self.workers[1].id])
+        self.assertEqual(self.workers[1].rating_stats.completed_jobs, 1)
+
+    def test_endpoints(self):
+        leaderboard.review_added(self.workers[0], 5)
+
+        response = self.client.get("/workers/leaderboard/", {"location": "Dhaka"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([entry["worker_id"] for entry in response.json()["data"]], [self.workers[0].id])
+
+        response = self.client.get(f"/workers/{self.workers[0].id}/rank/")
+        self.assertEqual(response.json()["data"]["rank"], 1)
+        self.assertEqual(response.json()["data"]["location_rank"], 1)
+        self.assertEqual(self.client.get(f"/workers/{self.workers[1].id}/rank/").status_code, 404)
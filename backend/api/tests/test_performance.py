@@ -0,0 +1,301 @@
+"""
+Query and latency budgets for every route in ``api/urls.py``.
+
+Each route is called against databases seeded at every size in ``SIZES``.
+A request must stay within its query budget and issue the same number of
+queries at every size; its time may grow with the data it returns, but not
+faster than the data. Measurements are written to ``--perf-json``.
+"""
+import time
+from collections import namedtuple
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import bidding, feed, leaderboard, pricing
+from api.leaderboard import bayesian_score
+from api.models import (
+    ArchivedJob,
+    Bid,
+    DailyJobPostingRollup,
+    DailyWorkerHireRollup,
+    Job,
+    JobPostingTotal,
+    MonthlyWorkerEarnings,
+    Payment,
+    RollupState,
+    User,
+    Worker,
+    WorkerAvailability,
+    WorkerBooking,
+    WorkerHireTotal,
+    WorkerRatingStats,
+)
+from api.tokens import RoleRefreshToken
+
+SIZES = (10, 50)
+PASSWORD = "perf-pass-123"
+BIDS_PER_JOB = 3
+
+# time at the largest size may be up to this many times the time at the
+# smallest size per unit of data growth, plus a floor for timer noise
+TIME_GROWTH = 2.0
+TIME_FLOOR = 0.05
+SAFE_RUNS = 3
+
+Route = namedtuple("Route", "name method user request status max_queries")
+
+
+# ======================================== Routes ==================================
+# ``request`` builds ``(url kwargs, body)`` from the seeded world
+ROUTES = [
+    Route("token_obtain_pair", "post", None,
+          lambda w: ({}, {"username": "customer", "password": PASSWORD}), 200, 1),
+    Route("token_refresh", "post", None,
+          lambda w: ({}, {"refresh": str(RoleRefreshToken.for_user(w.customer))}), 200, 1),
+    Route("register", "post", None,
+          lambda w: ({}, {"username": "newcomer", "email": "new@example.com", "password": PASSWORD,
+                          "confirmPassword": PASSWORD, "is_worker": False, "is_customer": True}), 201, 2),
+    Route("login", "post", None,
+          lambda w: ({}, {"username": "customer", "password": PASSWORD}), 200, 1),
+    Route("job-list", "get", "customer", lambda w: ({}, None), 200, 2),
+    Route("job-update", "patch", "customer",
+          lambda w: ({"pk": w.jobs[3].id}, {"title": "Updated title"}), 200, 8),
+    Route("job-delete", "delete", "customer", lambda w: ({"pk": w.jobs[4].id}, None), 200, 8),
+    Route("job-create", "post", "customer",
+          lambda w: ({}, {"title": "New job", "description": "Details", "location": "Dhaka", "budget": "900"}),
+          201, 7),
+    Route("job-import", "post", "customer",
+          lambda w: ({}, {"jobs": [
+              {"title": f"Imported job {n}", "description": "Details", "location": "Dhaka", "budget": "700"}
+              for n in range(5)
+          ]}), 201, 7),
+    Route("price-guide", "get", "customer",
+          lambda w: ({}, {"title": "Kitchen plumbing repair", "location": "Dhaka"}), 200, 1),
+    Route("assign-worker", "post", "customer",
+          lambda w: ({}, {"bid_id": w.jobs[0].best_bid_id}), 200, 14),
+    Route("bulk-assign", "post", "customer",
+          lambda w: ({}, {"job_ids": [w.jobs[1].id, w.jobs[2].id]}), 200, 28),
+    Route("unassign-worker", "post", "customer",
+          lambda w: ({}, {"job_id": w.assigned.id, "worker_id": w.actor.id}), 200, 14),
+    Route("worker-bid", "post", "worker",
+          lambda w: ({}, {"job_id": w.fresh.id, "bid_amount": "450"}), 201, 12),
+    Route("bid-withdraw", "delete", "worker", lambda w: ({"bid_id": w.pending_bid.id}, None), 200, 11),
+    Route("job-list-worker", "get", "worker",
+          lambda w: ({}, {"ordering": "bid_count", "max_bids": "5"}), 200, 2),
+    Route("job-bid-list", "get", "customer", lambda w: ({}, None), 200, 4),
+    Route("customer-dashboard", "get", "customer", lambda w: ({}, None), 200, 2),
+    Route("worker-leaderboard", "get", "customer", lambda w: ({}, None), 200, 3),
+    Route("worker-rank", "get", "customer", lambda w: ({"worker_id": w.actor.id}, None), 200, 3),
+    Route("worker-earnings", "get", "worker", lambda w: ({}, None), 200, 3),
+    Route("worker-availability", "get", "worker", lambda w: ({}, None), 200, 2),
+    Route("worker-availability-delete", "delete", "worker", lambda w: ({"pk": w.availability.id}, None), 200, 3),
+    Route("available-workers", "get", "customer",
+          lambda w: ({}, {"start": w.window[0].isoformat(), "end": w.window[1].isoformat(), "location": "Dhaka"}),
+          200, 1),
+    Route("worker-profile-update", "patch", "worker",
+          lambda w: ({}, {"skills": "Plumbing, wiring"}), 200, 11),
+    Route("payment-create", "post", "customer",
+          lambda w: ({}, {"job": w.in_progress.id, "amount": "500", "method": "bkash"}), 201, 7),
+    Route("mark-job-completed", "get", "customer", lambda w: ({"job_id": w.completed.id}, None), 200, 6),
+    Route("review-worker", "post", "customer",
+          lambda w: ({"job_id": w.completed.id}, {"rating": 5, "comment": "Great"}), 201, 11),
+    Route("review-customer", "post", "worker",
+          lambda w: ({"job_id": w.completed.id}, {"rating": 4, "comment": "Fair"}), 201, 8),
+    Route("job-history", "get", "customer", lambda w: ({}, None), 200, 1),
+    Route("job-history-detail", "get", "customer", lambda w: ({"job_id": w.archived[0].id}, None), 200, 1),
+    Route("rollup-report", "get", "admin", lambda w: ({}, None), 200, 6),
+    # the stream itself never ends, and the WSGI test client is turned away before any query
+    Route("event-stream", "get", None, lambda w: ({}, None), 503, 0),
+]
+
+
+# ======================================== Seed data ==================================
+def seed(size):
+    """
+    A customer with ``size`` open jobs, ``size`` workers bidding on them,
+    ``size`` archived jobs, ``size`` days of rollups and ``size`` months of
+    earnings, plus one job in each state the write routes need. Every worker
+    is available for the next week; the acting worker is booked on the
+    assigned job.
+    """
+    now = timezone.now()
+    admin = User.objects.create_user(username="admin", password=PASSWORD, is_staff=True, is_superuser=True)
+    customer = User.objects.create_user(username="customer", password=PASSWORD, is_customer=True)
+    worker_users = User.objects.bulk_create(
+        [User(username=f"worker{i}", is_worker=True, role="worker") for i in range(size)]
+    )
+    workers = Worker.objects.bulk_create(
+        [Worker(user=user, skills="Plumbing", experience=i % 8, location="Dhaka")
+         for i, user in enumerate(worker_users)]
+    )
+    actor = workers[0]
+    WorkerRatingStats.objects.bulk_create(
+        [WorkerRatingStats(worker=worker, location="dhaka", rating_count=2, rating_sum=7 + i % 3,
+                           completed_jobs=1, score=bayesian_score(7 + i % 3, 2))
+         for i, worker in enumerate(workers)]
+    )
+
+    jobs = Job.objects.bulk_create(
+        [Job(customer=customer, title=f"Job {i % 7}", description="Details", location="Dhaka", budget=1000)
+         for i in range(size)]
+    )
+    bids = Bid.objects.bulk_create(
+        [Bid(job=job, worker=workers[(i + k + 1) % size], bid_amount=600 + 10 * k, rank_score=0.5 + k / 10)
+         for i, job in enumerate(jobs) for k in range(BIDS_PER_JOB)]
+    )
+    for job, best in zip(jobs, bids[BIDS_PER_JOB - 1::BIDS_PER_JOB]):
+        job.best_bid = best
+    Job.objects.bulk_update(jobs, ["best_bid"])
+
+    # no bids from the acting worker yet
+    fresh = Job.objects.create(customer=customer, title="Fresh", description="Details", location="Dhaka", budget=800)
+    window = (now + timedelta(days=1), now + timedelta(days=1, hours=4))
+    assigned = Job.objects.create(
+        customer=customer, title="Assigned", description="Details", location="Dhaka", budget=700,
+        assigned_worker=actor, status="in-progress", starts_at=window[0], ends_at=window[1],
+    )
+    WorkerBooking.objects.create(job=assigned, worker=actor, starts_at=window[0], ends_at=window[1])
+    availability = WorkerAvailability.objects.bulk_create(
+        [WorkerAvailability(worker=worker, starts_at=now, ends_at=now + timedelta(days=7)) for worker in workers]
+    )
+    in_progress = Job.objects.create(
+        customer=customer, title="In progress", description="Details", location="Dhaka", budget=500,
+        assigned_worker=actor, status="in-progress",
+    )
+    Bid.objects.create(job=in_progress, worker=actor, bid_amount=500, status="selected", selected_at=now)
+    completed = Job.objects.create(
+        customer=customer, title="Completed", description="Details", location="Dhaka", budget=400,
+        assigned_worker=actor, status="completed",
+    )
+    Bid.objects.create(job=completed, worker=actor, bid_amount=400, status="selected", selected_at=now)
+    Payment.objects.create(job=completed, amount=400, method="bkash", status="completed", completed_at=now)
+    for _ in bidding.repair_bid_counters():
+        pass
+    feed.rebuild()
+    pricing.rebuild()
+
+    archived = ArchivedJob.objects.bulk_create(
+        [ArchivedJob(id=1_000_000 + i, customer=customer, assigned_worker=workers[i], title=f"Old job {i}",
+                     location="Dhaka", budget=Decimal("300"), status="completed", payment_amount=Decimal("300"),
+                     payment_status="completed", created_at=now - timedelta(days=i + 1), updated_at=now)
+         for i in range(size)]
+    )
+
+    today = now.date()
+    DailyJobPostingRollup.objects.bulk_create(
+        [DailyJobPostingRollup(day=today - timedelta(days=i), title=f"Job {i % 7}", location="Dhaka", postings=i + 1)
+         for i in range(size)]
+    )
+    DailyWorkerHireRollup.objects.bulk_create(
+        [DailyWorkerHireRollup(day=today - timedelta(days=i), worker=workers[i], hires=1) for i in range(size)]
+    )
+    JobPostingTotal.objects.bulk_create([JobPostingTotal(title=f"Title {i}", postings=i) for i in range(size)])
+    WorkerHireTotal.objects.bulk_create([WorkerHireTotal(worker=worker, hires=1) for worker in workers])
+    RollupState.objects.create(name="daily", last_day=today)
+    MonthlyWorkerEarnings.objects.bulk_create(
+        [MonthlyWorkerEarnings(worker=actor, month=date(today.year - 1 - i // 12, i % 12 + 1, 1), payments=2,
+                               amount=Decimal("800")) for i in range(size)]
+    )
+
+    # boards are kept per process and dashboards cached; start every world cold
+    cache.clear()
+    leaderboard._board = None
+
+    return SimpleNamespace(
+        size=size, admin=admin, customer=customer, worker=actor.user, actor=actor, jobs=jobs, fresh=fresh,
+        assigned=assigned, in_progress=in_progress, completed=completed, archived=archived,
+        availability=availability[0], window=window,
+        pending_bid=Bid.objects.filter(worker=actor, status="not_selected").order_by("id").first(),
+    )
+
+
+# ======================================== Measuring ==================================
+def call(route, world):
+    client = APIClient()
+    if route.user:
+        client.force_authenticate(getattr(world, route.user))
+    kwargs, body = route.request(world)
+    url = reverse(route.name, kwargs=kwargs)
+    # writes change the world, so only safe methods are repeated
+    runs = SAFE_RUNS if route.method == "get" else 1
+    timings = []
+    queries = None
+    for _ in range(runs):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = getattr(client, route.method)(url, body, format="json")
+            timings.append(time.perf_counter() - started)
+        if queries is None:
+            queries = len(captured)
+            status_code = response.status_code
+    return status_code, queries, min(timings)
+
+
+def measure(route):
+    measured = {}
+    for size in SIZES:
+        with transaction.atomic():
+            world = seed(size)
+            measured[size] = call(route, world)
+            transaction.set_rollback(True)
+    return measured
+
+
+# ======================================== Tests ==================================
+@pytest.fixture(autouse=True)
+def perf_settings(settings):
+    settings.THROTTLE_RATES = {}
+    # a periodic query-stats flush would land inside a measured request
+    settings.QUERY_LOG_ENABLED = False
+    settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    cache.clear()
+    yield
+    cache.clear()
+    leaderboard._board = None
+
+
+def test_every_route_has_a_budget():
+    names = {pattern.name for pattern in get_resolver("api.urls").url_patterns}
+    assert names == {route.name for route in ROUTES}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("route", ROUTES, ids=lambda route: route.name)
+def test_route_budget(route, perf_results):
+    measured = measure(route)
+    for size, (status_code, queries, seconds) in measured.items():
+        perf_results.append({
+            "route": route.name,
+            "method": route.method.upper(),
+            "size": size,
+            "status": status_code,
+            "queries": queries,
+            "max_queries": route.max_queries,
+            "seconds": round(seconds, 6),
+        })
+
+    for size, (status_code, queries, _) in measured.items():
+        assert status_code == route.status, f"{route.name} returned {status_code} at size {size}"
+        assert queries <= route.max_queries, (
+            f"{route.name} ran {queries} queries at size {size}; the budget is {route.max_queries}"
+        )
+
+    counts = {size: queries for size, (_, queries, _) in measured.items()}
+    assert len(set(counts.values())) == 1, f"{route.name} query count grows with the data: {counts}"
+
+    small, large = min(SIZES), max(SIZES)
+    allowed = measured[small][2] * TIME_GROWTH * large / small + TIME_FLOOR
+    assert measured[large][2] <= allowed, (
+        f"{route.name} took {measured[large][2]:.3f}s at size {large}, over {allowed:.3f}s "
+        f"({measured[small][2]:.3f}s at size {small})"
+    )
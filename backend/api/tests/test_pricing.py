@@ -0,0 +1,107 @@
+import random
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from api import pricing
+from api.models import Bid, Job, PriceSample, PriceSketch, User, Worker
+from api.sketches import KLLSketch
+
+
+class KLLSketchTests(SimpleTestCase):
+    def setUp(self):
+        random.seed(11)
+
+    def test_quantiles_are_close_to_the_exact_ones(self):
+        values = list(range(1, 20001))
+        random.shuffle(values)
+        sketch = KLLSketch(k=200)
+        for value in values:
+            sketch.add(value)
+
+        self.assertEqual(sketch.count, 20000)
+        self.assertLess(sum(len(level) for level in sketch.levels), 3 * 200)
+        for fraction, estimate in zip((0.1, 0.5, 0.9), sketch.quantiles((0.1, 0.5, 0.9))):
+            self.assertLess(abs(estimate - fraction * 20000), 0.02 * 20000)
+
+    def test_merge_and_storage(self):
+        low, high = KLLSketch(), KLLSketch()
+        for value in range(1000):
+            low.add(value)
+            high.add(value + 1000)
+        merged = KLLSketch.from_dict(low.to_dict()).merge(KLLSketch.from_dict(high.to_dict()))
+
+        self.assertEqual(merged.count, 2000)
+        self.assertLess(abs(merged.quantiles((0.5,))[0] - 1000), 40)
+        self.assertEqual(KLLSketch.from_dict({}).quantiles((0.5,)), [None])
+
+
+class BucketTests(SimpleTestCase):
+    def test_keywords_skip_stop_words_and_repeats(self):
+        self.assertEqual(pricing.keywords("Need urgent kitchen PLUMBING, kitchen sink 24h"), ["kitchen", "plumbing", "sink"])
+        self.assertEqual(
+            pricing.buckets("Paint wall", " Dhaka "),
+            {
+                "location_keywords": [("dhaka", "paint"), ("dhaka", "wall")],
+                "location": [("dhaka", "")],
+                "keywords": [("", "paint"), ("", "wall")],
+                "all": [("", "")],
+            },
+        )
+        self.assertEqual(pricing.buckets("Paint", "")["location"], [])
+
+
+@override_settings(PRICE_GUIDE_MIN_SAMPLES=3)
+class PriceGuideTests(TestCase):
+    def setUp(self):
+        random.seed(3)
+
+    def accept(self, title, location, *amounts):
+        for amount in amounts:
+            pricing.bid_selected(title, location, Decimal(amount))
+
+    def test_selected_bids_count_once_merged(self):
+        self.accept("Kitchen plumbing", "Dhaka", "100", "200", "300")
+        self.assertEqual(pricing.guide("Kitchen plumbing", "Dhaka")["samples"], 0)
+        self.assertFalse(PriceSketch.objects.exists())
+
+        self.assertEqual(pricing.merge_samples(batch_size=2), 3)
+        self.assertFalse(PriceSample.objects.exists())
+        self.assertEqual(
+            pricing.guide("Kitchen plumbing", "Dhaka"),
+            {"basis": "location_keywords", "samples": 6, "p25": Decimal("100.00"), "p50": Decimal("200.00"),
+             "p75": Decimal("300.00")},
+        )
+        self.assertEqual(pricing.merge_samples(), 0)
+
+    def test_falls_back_to_broader_buckets(self):
+        self.accept("Kitchen plumbing", "Dhaka", "100", "200")
+        self.accept("Roof repair", "Dhaka", "900")
+        self.accept("Bathroom plumbing", "Sylhet", "400", "500")
+        pricing.merge_samples()
+
+        self.assertEqual(pricing.guide("Kitchen plumbing", "Dhaka")["basis"], "location_keywords")
+        self.assertEqual(pricing.guide("Garden fence", "Dhaka")["basis"], "location")
+        self.assertEqual(pricing.guide("Plumbing", "Rajshahi")["basis"], "keywords")
+        self.assertEqual(pricing.guide("Garden fence", "Rajshahi")["basis"], "all")
+        self.assertEqual(pricing.guide("Garden fence", "Rajshahi")["samples"], 5)
+
+    @override_settings(PRICE_GUIDE_MIN_SAMPLES=50)
+    def test_largest_bucket_without_enough_samples(self):
+        self.assertEqual(pricing.guide("Garden fence", "Dhaka")["basis"], None)
+        self.accept("Garden fence", "Dhaka", "100")
+        pricing.merge_samples()
+        self.assertEqual(pricing.guide("Garden fence", "Dhaka")["basis"], "location_keywords")
+
+    def test_rebuild_replaces_the_queue(self):
+        customer = User.objects.create_user(username="customer", password="pass", is_customer=True)
+        user = User.objects.create_user(username="worker", password="pass", is_worker=True)
+        worker = Worker.objects.create(user=user, skills="Plumbing", experience=3, location="Dhaka")
+        job = Job.objects.create(customer=customer, title="Kitchen plumbing", description="d", location="Dhaka",
+                                 budget=500)
+        Bid.objects.create(job=job, worker=worker, bid_amount=450, status="selected")
+        self.accept("Kitchen plumbing", "Dhaka", "450")
+
+        self.assertEqual(pricing.rebuild(), 6)
+        self.assertFalse(PriceSample.objects.exists())
+        self.assertEqual(pricing.guide("Kitchen plumbing", "Dhaka")["samples"], 2)
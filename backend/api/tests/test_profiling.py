@@ -0,0 +1,87 @@
+import cProfile
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api import profiling
+from api.models import User
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.dir = Path(directory.name)
+        settings = override_settings(PROFILE_DIR=self.dir, PROFILE_SAMPLE_RATE=0, THROTTLE_RATES={})
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username="customer", password="pass",
+                                                                is_customer=True))
+
+    def save(self, route, milliseconds):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        profiler.disable()
+        return profiling.save(profiler, route, "GET", 200, milliseconds / 1000)
+
+    def test_signed_header_profiles_the_request(self):
+        response = self.client.get("/jobs/", HTTP_X_PROFILE=profiling.make_token())
+        self.assertEqual(response.status_code, 200)
+        profile, = profiling.captured()
+        self.assertEqual(response["X-Profile-Id"], profile.name)
+        self.assertEqual((profile.route, profile.method, profile.status), ("job-list", "GET", 200))
+
+    def test_other_requests_are_not_profiled(self):
+        self.client.get("/jobs/")
+        response = self.client.get("/jobs/", HTTP_X_PROFILE="forged")
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(profiling.captured(), [])
+
+    def test_sampled_requests_are_profiled_without_the_header(self):
+        with override_settings(PROFILE_SAMPLE_RATE=1):
+            response = self.client.get("/jobs/")
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(len(profiling.captured("job-list")), 1)
+
+    def test_request_is_not_profiled_while_another_one_is(self):
+        self.assertTrue(profiling.acquire())
+        try:
+            self.client.get("/jobs/", HTTP_X_PROFILE=profiling.make_token())
+        finally:
+            profiling.release()
+        self.assertEqual(profiling.captured(), [])
+
+    @override_settings(PROFILE_MAX_FILES=2)
+    def test_only_the_newest_profiles_are_kept(self):
+        names = [self.save("job-list", n) for n in range(3)]
+        (self.dir / "notes.pstats").write_text("")
+        self.assertEqual([profile.name for profile in profiling.captured()], names[:0:-1])
+
+    def test_command(self):
+        self.save("job-list", 10)
+        self.save("job-list", 30)
+        self.save("job-create", 5)
+
+        output = StringIO()
+        call_command("profiles", "--summary", stdout=output)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[1].split(), ["job-list", "2", "20", "30"])
+        self.assertEqual(lines[2].split(), ["job-create", "1", "5", "5"])
+
+        output = StringIO()
+        call_command("profiles", "--route", "job-create", "--stats", stdout=output)
+        self.assertIn("function calls", output.getvalue())
+        with self.assertRaises(CommandError):
+            call_command("profiles", "--stats", "missing.pstats", stdout=StringIO())
+
+        output = StringIO()
+        call_command("profiles", "--clear", stdout=output)
+        self.assertIn("Deleted 3 profile(s).", output.getvalue())
+        self.assertEqual(profiling.captured(), [])
@@ -0,0 +1,102 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import bidding, feed
+from api.models import Bid, Job, OpenJobFeed, Payment, Review, User, Worker, WorkerWallet
+from api.purge import purge_deleted_jobs
+from api.reconcile import wallet_mismatches
+from api.utils import PaymentError, release_funds
+
+
+@override_settings(THROTTLE_RATES={})
+class SoftDeleteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = User.objects.create_user(username="customer", password="pass", is_customer=True)
+        self.worker_user = User.objects.create_user(username="worker", password="pass", is_worker=True)
+        self.worker = Worker.objects.create(user=self.worker_user, skills="Plumbing", experience=3, location="Dhaka")
+        self.job = Job.objects.create(customer=self.customer, title="Fix sink", description="Leaking",
+                                      location="Dhaka", budget=500)
+        self.bid = bidding.place_bid(self.worker, self.job, "450")
+        feed.rebuild()
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+        self.worker_client = APIClient()
+        self.worker_client.force_authenticate(self.worker_user)
+
+    def delete(self, job):
+        return self.client.delete(f"/jobs/{job.id}/delete/")
+
+    def test_deleted_job_disappears_everywhere(self):
+        self.assertEqual(self.delete(self.job).status_code, 200)
+
+        self.assertFalse(Job.objects.filter(id=self.job.id).exists())
+        self.assertTrue(Job.all_objects.filter(id=self.job.id, deleted_at__isnull=False).exists())
+        self.assertFalse(OpenJobFeed.objects.exists())
+        self.assertEqual(self.client.get("/jobs/").json(), [])
+        self.assertEqual(self.worker_client.get("/worker/job_list/").json(), [])
+        self.assertEqual(self.delete(self.job).status_code, 404)
+        response = self.worker_client.post("/worker/bid/", {"job_id": self.job.id, "bid_amount": "400"},
+                                           format="json")
+        self.assertEqual(response.status_code, 404)
+
+    def test_bids_on_a_deleted_job_cannot_be_withdrawn(self):
+        self.delete(self.job)
+        self.assertEqual(self.worker_client.delete(f"/worker/bids/{self.bid.id}/").status_code, 404)
+        self.assertTrue(Bid.objects.filter(id=self.bid.id).exists())
+
+    def test_bids_on_a_deleted_job_cannot_be_assigned(self):
+        self.delete(self.job)
+        response = self.client.post("/jobs/assign_bid/", {"bid_id": self.bid.id}, format="json")
+        self.assertEqual(response.status_code, 404)
+        with self.assertRaises(bidding.AssignmentError):
+            bidding.assign_bid(self.bid.id)
+        self.assertEqual(Bid.objects.get(id=self.bid.id).status, "not_selected")
+
+    def test_paid_jobs_cannot_be_deleted(self):
+        bidding.assign_bid(self.bid.id)
+        payment = Payment.objects.create(job=self.job, amount=450, method="bkash")
+        release_funds(payment)
+
+        self.assertEqual(self.delete(self.job).status_code, 400)
+        self.assertTrue(Job.objects.filter(id=self.job.id).exists())
+
+    def test_payments_on_deleted_jobs_are_not_released(self):
+        bidding.assign_bid(self.bid.id)
+        payment = Payment.objects.create(job=self.job, amount=450, method="bkash")
+        self.delete(self.job)
+
+        with self.assertRaises(PaymentError):
+            release_funds(payment)
+        self.assertFalse(WorkerWallet.objects.exists())
+
+    def test_purge_removes_the_job_and_its_rows(self):
+        other = Job.objects.create(customer=self.customer, title="Paint", description="Wall", location="Dhaka",
+                                   budget=300)
+        bidding.assign_bid(self.bid.id)
+        Payment.objects.create(job=self.job, amount=450, method="bkash")
+        Review.objects.create(job=self.job, reviewer=self.customer, reviewee=self.worker_user, review_type="worker",
+                              rating=4)
+        self.delete(self.job)
+
+        output = StringIO()
+        call_command("purge_deleted_jobs", "--chunk-size", "1", stdout=output)
+        self.assertIn("Purged 1 deleted job(s).", output.getvalue())
+        self.assertFalse(Job.all_objects.filter(id=self.job.id).exists())
+        self.assertFalse(Bid.objects.exists() or Review.objects.exists() or Payment.objects.exists())
+        self.assertTrue(Job.objects.filter(id=other.id).exists())
+
+    def test_purge_keeps_completed_payments(self):
+        # deleted before soft_delete refused paid jobs
+        bidding.assign_bid(self.bid.id)
+        release_funds(Payment.objects.create(job=self.job, amount=450, method="bkash"))
+        Job.objects.filter(id=self.job.id).update(deleted_at=timezone.now())
+
+        self.assertEqual(purge_deleted_jobs(), 0)
+        self.assertTrue(Payment.objects.filter(job_id=self.job.id, status="completed").exists())
+        self.assertEqual([mismatch for _, mismatches in wallet_mismatches() for mismatch in mismatches], [])
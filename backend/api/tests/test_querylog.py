@@ -0,0 +1,81 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api import querylog
+from api.models import Job, QueryFingerprint, User
+
+
+class NormalizeTests(SimpleTestCase):
+    def test_literals_and_lists_are_collapsed(self):
+        self.assertEqual(
+            querylog.normalize("SELECT * FROM \"api_job\"  WHERE id IN (1, 2, 3) AND title = 'it''s' AND budget > 2.5"),
+            "SELECT * FROM \"api_job\" WHERE id IN (...) AND title = ? AND budget > ?",
+        )
+        self.assertEqual(
+            querylog.normalize("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)"),
+            "INSERT INTO t (a, b) VALUES (...)",
+        )
+
+    def test_same_shape_shares_a_fingerprint(self):
+        first = querylog.normalize("SELECT 1 FROM t WHERE id = 4")
+        second = querylog.normalize("SELECT 1 FROM t WHERE id = 17")
+        self.assertEqual(querylog.fingerprint(first), querylog.fingerprint(second))
+
+
+class ExplainTests(TestCase):
+    def test_plan(self):
+        plan = querylog.explain(connection, 'SELECT * FROM "api_job" WHERE "id" = %s', (1,))
+        self.assertTrue(plan)
+        self.assertIsNone(querylog.explain(connection, "PRAGMA foreign_keys", ()))
+
+    def test_failed_explain_leaves_the_transaction_usable(self):
+        with transaction.atomic(), CaptureQueriesContext(connection) as queries:
+            plan = querylog.explain(connection, "SELECT * FROM missing_table", ())
+            self.assertTrue(plan.startswith("(EXPLAIN failed"))
+            self.assertEqual(Job.objects.count(), 0)
+        self.assertTrue(any(query["sql"].startswith("ROLLBACK TO SAVEPOINT") for query in queries))
+
+
+@override_settings(THROTTLE_RATES={}, QUERY_LOG_ENABLED=True)
+class QueryLogMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        querylog._stats.clear()
+        querylog._last_explained.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username="customer", password="pass",
+                                                                is_customer=True))
+
+    def tearDown(self):
+        querylog._stats.clear()
+
+    @override_settings(SLOW_QUERY_MS=0)
+    def test_slow_queries_are_logged_with_their_plan(self):
+        with self.assertLogs("api.querylog", "WARNING") as logs:
+            self.assertEqual(self.client.get("/customer/dashboard/").status_code, 200)
+        self.assertTrue(any("in customer-dashboard" in line and "Plan:" in line for line in logs.output))
+
+    @override_settings(QUERY_LOG_FLUSH_INTERVAL=3600)
+    def test_totals_are_flushed_per_view(self):
+        self.client.get("/customer/jobs/bids/")
+        self.client.get("/customer/jobs/bids/")
+        self.assertTrue(querylog.flush())
+        self.assertFalse(querylog._stats)
+
+        entry = QueryFingerprint.objects.filter(view="job-bid-list").order_by("-calls").first()
+        self.assertEqual(entry.calls, 2)
+
+        output = StringIO()
+        call_command("top_queries", "--view", "job-bid-list", stdout=output)
+        self.assertIn("job-bid-list", output.getvalue())
+
+    @override_settings(QUERY_LOG_ENABLED=False, QUERY_LOG_FLUSH_INTERVAL=3600)
+    def test_nothing_is_recorded_when_disabled(self):
+        self.client.get("/customer/jobs/bids/")
+        self.assertFalse(querylog._stats)
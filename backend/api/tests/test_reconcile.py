@@ -0,0 +1,91 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import ArchivedJob, Job, Payment, User, Worker, WorkerWallet
+from api.reconcile import job_mismatches, repair_wallets, wallet_mismatches
+
+
+class ReconcileTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = User.objects.create_user(username="customer", password="pass", is_customer=True)
+        self.workers = []
+        for n in range(3):
+            user = User.objects.create_user(username=f"worker{n}", password="pass", is_worker=True)
+            self.workers.append(Worker.objects.create(user=user, skills="Plumbing", experience=3, location="Dhaka"))
+
+    def paid_job(self, worker, amount, job_status="completed"):
+        job = Job.objects.create(customer=self.customer, title="Fix sink", description="Leaking", location="Dhaka",
+                                 budget=amount, status=job_status, assigned_worker=worker)
+        Payment.objects.create(job=job, amount=amount, method="bkash", status="completed",
+                               completed_at=timezone.now())
+        return job
+
+    def wallet_mismatches(self):
+        return [mismatch for _, mismatches in wallet_mismatches(chunk_size=2) for mismatch in mismatches]
+
+    def test_balanced_wallets_have_no_mismatches(self):
+        self.paid_job(self.workers[0], 300)
+        self.paid_job(self.workers[0], 200)
+        ArchivedJob.objects.create(id=999, customer=self.customer, assigned_worker=self.workers[0], title="Old",
+                                   location="Dhaka", budget=100, status="completed", payment_amount=100,
+                                   payment_status="completed", created_at=timezone.now(), updated_at=timezone.now())
+        WorkerWallet.objects.create(worker=self.workers[0], balance=600)
+
+        self.assertEqual(self.wallet_mismatches(), [])
+        self.assertEqual(list(job_mismatches()), [])
+
+    def test_mismatches_are_found(self):
+        self.paid_job(self.workers[0], 300)
+        self.paid_job(self.workers[1], 200)
+        self.paid_job(self.workers[2], 100)
+        WorkerWallet.objects.create(worker=self.workers[0], balance=100)
+        WorkerWallet.objects.create(worker=self.workers[2], balance=400)
+
+        found = {mismatch.worker_id: (mismatch.balance, mismatch.expected) for mismatch in self.wallet_mismatches()}
+        self.assertEqual(found, {
+            self.workers[0].id: (Decimal("100"), Decimal("300")),
+            self.workers[1].id: (None, Decimal("200")),
+            self.workers[2].id: (Decimal("400"), Decimal("100")),
+        })
+
+    def test_repair_only_lowers_balances_when_allowed(self):
+        self.paid_job(self.workers[0], 300)
+        self.paid_job(self.workers[1], 200)
+        self.paid_job(self.workers[2], 100)
+        WorkerWallet.objects.create(worker=self.workers[0], balance=100)
+        WorkerWallet.objects.create(worker=self.workers[2], balance=400)
+
+        self.assertEqual(repair_wallets(self.wallet_mismatches()), 2)
+        balances = dict(WorkerWallet.objects.values_list("worker_id", "balance"))
+        self.assertEqual(balances, {self.workers[0].id: 300, self.workers[1].id: 200, self.workers[2].id: 400})
+
+        self.assertEqual(repair_wallets(self.wallet_mismatches(), allow_decrease=True), 1)
+        self.assertEqual(WorkerWallet.objects.get(worker=self.workers[2]).balance, 100)
+        self.assertEqual(self.wallet_mismatches(), [])
+
+    def test_command_repairs_jobs_and_wallets(self):
+        job = self.paid_job(self.workers[0], 300, job_status="in-progress")
+        WorkerWallet.objects.create(worker=self.workers[1], balance=50)
+
+        output = StringIO()
+        call_command("reconcile_payments", stdout=output)
+        self.assertIn(f"Payment {job.payment.id} is completed but job {job.id} is in-progress.", output.getvalue())
+        self.assertIn("Wallets (3 workers checked): 2 mismatch(es)", output.getvalue())
+
+        output = StringIO()
+        call_command("reconcile_payments", "--repair", stdout=output)
+        self.assertIn("Jobs: 1 mismatch(es), 1 repaired.", output.getvalue())
+        self.assertIn("--allow-decrease", output.getvalue())
+        job.refresh_from_db()
+        self.assertEqual(job.status, "completed")
+        self.assertEqual(WorkerWallet.objects.get(worker=self.workers[0]).balance, 300)
+        self.assertEqual(WorkerWallet.objects.get(worker=self.workers[1]).balance, 50)
+
+        call_command("reconcile_payments", "--repair", "--allow-decrease", stdout=StringIO())
+        self.assertEqual(WorkerWallet.objects.get(worker=self.workers[1]).balance, 0)
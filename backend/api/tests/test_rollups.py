@@ -0,0 +1,89 @@
+from datetime import date, datetime, timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import rollups
+from api.models import Bid, DailyJobPostingRollup, Job, JobPostingTotal, User, Worker, WorkerHireTotal
+
+
+def at(day, hour=12):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()) + timedelta(hours=hour))
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = User.objects.create_user(username="customer", password="pass", is_customer=True)
+        self.workers = []
+        for n in range(2):
+            user = User.objects.create_user(username=f"worker{n}", password="pass", is_worker=True)
+            self.workers.append(Worker.objects.create(user=user, skills="Plumbing", experience=3, location="Dhaka"))
+        self.days = [date(2026, 3, 1) + timedelta(days=n) for n in range(4)]
+        self.post("Fix sink", "Dhaka", self.days[0], hired=self.workers[0])
+        self.post("Fix sink", "Dhaka", self.days[0])
+        self.post("Paint wall", "Sylhet", self.days[1], hired=self.workers[0])
+        self.post("Fix sink", "Sylhet", self.days[2], hired=self.workers[1])
+        self.post("Roof", "Dhaka", self.days[3])
+
+    def post(self, title, location, day, hired=None):
+        job = Job.objects.create(customer=self.customer, title=title, description="d", location=location, budget=500)
+        Job.objects.filter(id=job.id).update(created_at=at(day))
+        if hired is not None:
+            Bid.objects.create(job=job, worker=hired, bid_amount=400, status="selected", selected_at=at(day, 18))
+
+    def totals(self):
+        return (dict(JobPostingTotal.objects.values_list("title", "postings")),
+                dict(WorkerHireTotal.objects.values_list("worker_id", "hires")))
+
+    def test_incremental_runs_add_up(self):
+        batches = list(rollups.build_rollups(through=self.days[1], days_per_batch=1))
+        self.assertEqual(batches, [(self.days[0], self.days[0]), (self.days[1], self.days[1])])
+        self.assertEqual(rollups.rolled_up_through(), self.days[1])
+        self.assertEqual(list(rollups.build_rollups(through=self.days[1])), [])
+
+        list(rollups.build_rollups(through=self.days[3]))
+        self.assertEqual(self.totals(), (
+            {"Fix sink": 3, "Paint wall": 1, "Roof": 1},
+            {self.workers[0].id: 2, self.workers[1].id: 1},
+        ))
+        self.assertEqual(DailyJobPostingRollup.objects.get(day=self.days[0], title="Fix sink").postings, 2)
+
+    def test_reads(self):
+        list(rollups.build_rollups(through=self.days[3]))
+        self.assertEqual(rollups.daily_activity(self.days[0], self.days[2]), [
+            {"day": self.days[0], "postings": 2, "hires": 1},
+            {"day": self.days[1], "postings": 1, "hires": 1},
+            {"day": self.days[2], "postings": 1, "hires": 1},
+        ])
+        self.assertEqual(rollups.top_locations(self.days[0], self.days[3]),
+                         [{"location": "Dhaka", "postings": 3}, {"location": "Sylhet", "postings": 2}])
+        self.assertEqual([total.title for total in rollups.popular_titles(1)], ["Fix sink"])
+        self.assertEqual([total.worker_id for total in rollups.most_hired_workers(1)], [self.workers[0].id])
+
+    def test_rebuild_gives_the_same_totals(self):
+        call_command("build_rollups", "--through", self.days[3].isoformat(), "--days-per-batch", "2", stdout=StringIO())
+        before = self.totals()
+        output = StringIO()
+        call_command("build_rollups", "--through", self.days[3].isoformat(), "--rebuild", stdout=output)
+        self.assertIn("Existing rollups removed.", output.getvalue())
+        self.assertEqual(self.totals(), before)
+
+    def test_report_endpoint(self):
+        list(rollups.build_rollups(through=self.days[3]))
+        client = APIClient()
+        client.force_authenticate(self.customer)
+        self.assertEqual(client.get("/reports/rollups/").status_code, 403)
+
+        client.force_authenticate(User.objects.create_user(username="admin", password="pass", is_staff=True))
+        data = client.get("/reports/rollups/").json()["data"]
+        self.assertEqual(data["rolled_up_through"], "2026-03-04")
+        self.assertEqual(len(data["daily_activity"]), 4)
+        self.assertEqual(data["most_hired_workers"][0]["username"], "worker0")
+        response = client.get("/reports/rollups/", {"from": "2026-03-02", "to": "2026-03-02"})
+        self.assertEqual(response.json()["data"]["top_locations"], [{"location": "Sylhet", "postings": 1}])
+        self.assertEqual(client.get("/reports/rollups/", {"from": "March"}).status_code, 400)
@@ -0,0 +1,87 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.checks import check_shared_cache
+from api.models import Job, User
+from api.routers import PrimaryReplicaRouter, is_pinned, pin_to_primary, reset_read_alias, set_read_alias
+
+
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = PrimaryReplicaRouter()
+
+    def test_reads_use_default_outside_replica_views(self):
+        self.assertIsNone(self.router.db_for_read(Job))
+
+    def test_reads_follow_the_request_alias(self):
+        token = set_read_alias("replica")
+        try:
+            self.assertEqual(self.router.db_for_read(Job), "replica")
+        finally:
+            reset_read_alias(token)
+        self.assertIsNone(self.router.db_for_read(Job))
+
+    def test_writes_always_use_primary(self):
+        token = set_read_alias("replica")
+        try:
+            self.assertEqual(self.router.db_for_write(Job), "default")
+        finally:
+            reset_read_alias(token)
+
+    def test_pin_to_primary(self):
+        self.assertFalse(is_pinned(1))
+        pin_to_primary(1)
+        self.assertTrue(is_pinned(1))
+        self.assertFalse(is_pinned(2))
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    def test_process_local_cache_is_reported(self):
+        self.assertEqual([error.id for error in check_shared_cache(None)], ["api.W001"])
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache",
+                                           "LOCATION": "redis://127.0.0.1:6379/1"}})
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+
+# Run with a second SQLite file configured, e.g.
+#   REPLICA_DB_NAME=db_replica.sqlite3 python manage.py test api
+# The test databases are separate and nothing replicates between them, so a
+# row written in a test is only visible through the primary.
+@skipUnless("replica" in settings.DATABASES, "REPLICA_DB_NAME is not set")
+class ReplicaReadTests(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        cache.clear()
+        self.customer = User.objects.create_user(username="customer", password="pass", is_customer=True)
+        Job.objects.create(customer=self.customer, title="Fix sink", description="Leaking", location="Dhaka", budget=500)
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+
+    def test_list_reads_from_replica(self):
+        response = self.client.get("/jobs/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+    def test_reads_stick_to_primary_after_a_write(self):
+        response = self.client.post(
+            "/jobs/create/",
+            {"title": "Paint wall", "description": "One room", "location": "Dhaka", "budget": "800"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.get("/jobs/")
+        self.assertEqual(len(response.json()), 2)
+
+    def test_status_endpoint_reads_from_replica(self):
+        job = Job.objects.get()
+        response = self.client.get(f"/jobs/{job.id}/")
+        self.assertEqual(response.status_code, 404)
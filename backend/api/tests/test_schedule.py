@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import bidding
+from api.models import Bid, Job, User, Worker, WorkerAvailability, WorkerBooking
+
+
+@override_settings(THROTTLE_RATES={})
+class ScheduleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.start = (timezone.now() + timedelta(days=2)).replace(minute=0, second=0, microsecond=0)
+        self.customer = User.objects.create_user(username="customer", password="pass", is_customer=True)
+        self.workers = []
+        for n, location in enumerate(["Dhaka", "Mirpur, Dhaka", "Sylhet"]):
+            user = User.objects.create_user(username=f"worker{n}", password="pass", is_worker=True)
+            self.workers.append(Worker.objects.create(user=user, skills="Plumbing", experience=3, location=location))
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+
+    def hours(self, start, end):
+        return self.start + timedelta(hours=start), self.start + timedelta(hours=end)
+
+    def job(self, start, end, title="Fix sink"):
+        starts_at, ends_at = self.hours(start, end)
+        return Job.objects.create(customer=self.customer, title=title, description="Leaking", location="Dhaka",
+                                  budget=1000, starts_at=starts_at, ends_at=ends_at)
+
+    def bid(self, job, worker, amount):
+        return Bid.objects.create(job=job, worker=worker, bid_amount=amount)
+
+    def test_assignment_books_the_worker(self):
+        first, second = self.job(0, 4), self.job(2, 6)
+        bidding.assign_bid(self.bid(first, self.workers[0], 500).id)
+        self.assertTrue(WorkerBooking.objects.filter(job=first, worker=self.workers[0]).exists())
+
+        with self.assertRaises(bidding.AssignmentError):
+            bidding.assign_bid(self.bid(second, self.workers[0], 500).id)
+        bidding.assign_bid(self.bid(second, self.workers[1], 500).id)
+
+    def test_bulk_assign_does_not_plan_overlapping_jobs_for_one_worker(self):
+        first, second, later = self.job(0, 4), self.job(2, 6), self.job(6, 8)
+        # worker 0 is cheapest everywhere; worker 1 only bid on the second job
+        for job in (first, second, later):
+            self.bid(job, self.workers[0], 300)
+        self.bid(second, self.workers[1], 600)
+
+        assignments, unassigned = bidding.bulk_assign(self.customer, capacity=3)
+        self.assertEqual(
+            {assignment["job_id"]: assignment["worker_id"] for assignment in assignments},
+            {first.id: self.workers[0].id, second.id: self.workers[1].id, later.id: self.workers[0].id},
+        )
+        self.assertEqual(unassigned, [])
+        self.assertEqual(WorkerBooking.objects.filter(worker=self.workers[0]).count(), 2)
+
+    def test_bulk_assign_leaves_a_clashing_job_without_other_bids(self):
+        first, second = self.job(0, 4), self.job(2, 6)
+        self.bid(first, self.workers[0], 300)
+        self.bid(second, self.workers[0], 300)
+
+        assignments, unassigned = bidding.bulk_assign(self.customer, capacity=2)
+        self.assertEqual([assignment["job_id"] for assignment in assignments], [first.id])
+        self.assertEqual(unassigned, [second.id])
+
+    def test_moving_a_job_onto_a_booking_is_rejected(self):
+        first, second = self.job(0, 4), self.job(6, 8)
+        bidding.assign_bid(self.bid(first, self.workers[0], 500).id)
+        bidding.assign_bid(self.bid(second, self.workers[0], 500).id)
+        starts_at, ends_at = self.hours(3, 7)
+
+        response = self.client.patch(f"/jobs/{second.id}/update/", {"starts_at": starts_at, "ends_at": ends_at},
+                                     format="json")
+        self.assertEqual(response.status_code, 409)
+
+        starts_at, ends_at = self.hours(5, 9)
+        response = self.client.patch(f"/jobs/{second.id}/update/", {"starts_at": starts_at, "ends_at": ends_at},
+                                     format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(WorkerBooking.objects.get(job=second).starts_at, starts_at)
+
+    def test_available_worker_search(self):
+        for worker in self.workers:
+            WorkerAvailability.objects.create(worker=worker, starts_at=self.start, ends_at=self.start + timedelta(days=1))
+        WorkerAvailability.objects.create(worker=self.workers[0], starts_at=self.start + timedelta(days=3),
+                                          ends_at=self.start + timedelta(days=4))
+        bidding.assign_bid(self.bid(self.job(1, 3), self.workers[1], 500).id)
+
+        def search(start, end, **params):
+            starts_at, ends_at = self.hours(start, end)
+            response = self.client.get("/workers/available/", {"start": starts_at.isoformat(),
+                                                                "end": ends_at.isoformat(), **params})
+            self.assertEqual(response.status_code, 200)
+            return [worker["worker_id"] for worker in response.json()["data"]]
+
+        self.assertEqual(search(2, 4), [self.workers[0].id, self.workers[2].id])
+        self.assertEqual(search(4, 6, location="dhaka"), [self.workers[0].id, self.workers[1].id])
+        # no single interval covers the window
+        self.assertEqual(search(20, 80), [])
+        self.assertEqual(self.client.get("/workers/available/", {"start": "soon"}).status_code, 400)
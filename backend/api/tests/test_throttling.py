@@ -0,0 +1,101 @@
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api import throttling
+from api.throttling import CacheTokenBuckets, LocalTokenBuckets, get_rate, identify, parse_rate
+from api.tokens import RoleRefreshToken
+from api.models import User
+
+RATES = {
+    "login": {"*": "2/min"},
+    "job-list-worker": {"worker": "30/min", "*": "10/min"},
+    "*": {"anonymous": "60/min", "*": None},
+}
+
+
+class RateTests(SimpleTestCase):
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("60/min"), (60, 60))
+        self.assertEqual(parse_rate("10/hour"), (10, 3600))
+        self.assertEqual(parse_rate("5/s"), (5, 1))
+
+    @override_settings(THROTTLE_RATES=RATES)
+    def test_view_and_role_lookup(self):
+        self.assertEqual(get_rate("job-list-worker", "worker"), ("job-list-worker", "30/min"))
+        self.assertEqual(get_rate("job-list-worker", "customer"), ("job-list-worker", "10/min"))
+        self.assertEqual(get_rate("job-list", "anonymous"), ("*", "60/min"))
+        self.assertEqual(get_rate("job-list", "customer"), ("*", None))
+
+
+class BucketTests(SimpleTestCase):
+    def check_buckets(self, buckets):
+        # a bucket of 2 refilled every 60 seconds: one token per 30 seconds
+        self.assertEqual(buckets.consume("key", 2, 60, now=1000), 0)
+        self.assertEqual(buckets.consume("key", 2, 60, now=1000), 0)
+        self.assertAlmostEqual(buckets.consume("key", 2, 60, now=1000), 30)
+        self.assertAlmostEqual(buckets.consume("key", 2, 60, now=1020), 10)
+        self.assertEqual(buckets.consume("key", 2, 60, now=1030), 0)
+        self.assertEqual(buckets.consume("other", 2, 60, now=1030), 0)
+
+    def test_local_buckets(self):
+        self.check_buckets(LocalTokenBuckets())
+
+    def test_cache_buckets(self):
+        self.check_buckets(CacheTokenBuckets())
+
+    def test_full_buckets_are_swept(self):
+        buckets = LocalTokenBuckets(max_buckets=2)
+        for n in range(3):
+            buckets.consume(f"key{n}", 2, 60, now=0)
+        buckets.consume("late", 2, 60, now=1000)
+        self.assertEqual(set(buckets._buckets), {"late"})
+
+
+class IdentifyTests(SimpleTestCase):
+    def request(self, **meta):
+        return RequestFactory().get("/jobs/", REMOTE_ADDR="127.0.0.1", **meta)
+
+    def test_remote_address_without_proxies(self):
+        request = self.request(HTTP_X_FORWARDED_FOR="203.0.113.9")
+        self.assertEqual(identify(request), ("ip:127.0.0.1", "anonymous"))
+
+    @override_settings(THROTTLE_NUM_PROXIES=1)
+    def test_forwarded_address_added_by_the_trusted_proxy(self):
+        # the client sent the first entry itself; nginx appended the second
+        request = self.request(HTTP_X_FORWARDED_FOR="10.0.0.1, 198.51.100.7")
+        self.assertEqual(identify(request), ("ip:198.51.100.7", "anonymous"))
+        self.assertEqual(identify(self.request()), ("ip:127.0.0.1", "anonymous"))
+
+    @override_settings(THROTTLE_NUM_PROXIES=2)
+    def test_forwarded_address_behind_two_proxies(self):
+        request = self.request(HTTP_X_FORWARDED_FOR="10.0.0.1, 198.51.100.7, 192.0.2.1")
+        self.assertEqual(identify(request)[0], "ip:198.51.100.7")
+
+
+@override_settings(THROTTLE_RATES=RATES, THROTTLE_NUM_PROXIES=1)
+class ThrottleMiddlewareTests(TestCase):
+    def setUp(self):
+        throttling._backend = LocalTokenBuckets()
+
+    def tearDown(self):
+        throttling._backend = None
+
+    def login(self, address):
+        return APIClient().post("/login/", {"username": "nobody", "password": "x"}, format="json",
+                                REMOTE_ADDR="127.0.0.1", HTTP_X_FORWARDED_FOR=address)
+
+    def test_clients_behind_the_proxy_have_their_own_buckets(self):
+        self.assertNotEqual(self.login("198.51.100.7").status_code, 429)
+        self.assertNotEqual(self.login("198.51.100.7").status_code, 429)
+        response = self.login("198.51.100.7")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn(int(response["Retry-After"]), (29, 30))
+        self.assertNotEqual(self.login("198.51.100.8").status_code, 429)
+
+    def test_users_are_counted_by_token(self):
+        worker = User.objects.create_user(username="worker", password="pass", is_worker=True)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {RoleRefreshToken.for_user(worker).access_token}")
+        for _ in range(30):
+            self.assertNotEqual(client.get("/worker/job_list/").status_code, 429)
+        self.assertEqual(client.get("/worker/job_list/").status_code, 429)
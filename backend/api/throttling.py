@@ -0,0 +1,159 @@
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+DURATIONS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+ANONYMOUS = "anonymous"
+DEFAULT_SCOPE = "*"
+
+
+def parse_rate(rate):
+    """``"60/min"`` -> ``(60, 60)``: bucket size and seconds to refill it completely."""
+    count, period = rate.split("/")
+    return int(count), DURATIONS[period.strip()[0]]
+
+
+def get_rate(view_name, role):
+    """
+    Returns ``(scope, rate)`` from ``THROTTLE_RATES``: the view's own limits
+    first, then the ``"*"`` defaults. Within a scope the role's limit wins
+    over its ``"*"`` entry; a rate of ``None`` means unlimited.
+    """
+    rates = getattr(settings, "THROTTLE_RATES", {})
+    for scope in (view_name, DEFAULT_SCOPE):
+        by_role = rates.get(scope)
+        if not by_role:
+            continue
+        if role in by_role:
+            return scope, by_role[role]
+        if DEFAULT_SCOPE in by_role:
+            return scope, by_role[DEFAULT_SCOPE]
+    return None, None
+
+
+def client_ip(request):
+    """
+    The client's address. Behind ``THROTTLE_NUM_PROXIES`` trusted proxies it
+    is the X-Forwarded-For entry added by the outermost of them: entries to
+    its left were sent by the client and could be anything.
+    """
+    proxies = getattr(settings, "THROTTLE_NUM_PROXIES", 0)
+    if proxies:
+        forwarded = [
+            address.strip() for address in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if address.strip()
+        ]
+        if forwarded:
+            return forwarded[-min(proxies, len(forwarded))]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def identify(request):
+    """
+    ``(identity, role)`` for the request, from the access token's claims
+    when it carries a valid one (signature and expiry only, no user lookup),
+    otherwise from the client address.
+    """
+    header = request.headers.get("Authorization", "")
+    raw_token = header[7:] if header.startswith("Bearer ") else request.GET.get("token")
+    if raw_token:
+        try:
+            token = AccessToken(raw_token)
+        except TokenError:
+            pass
+        else:
+            user_id = token.get(settings.SIMPLE_JWT.get("USER_ID_CLAIM", "user_id"))
+            if user_id is not None:
+                return f"user:{user_id}", token.get("role") or "user"
+    return f"ip:{client_ip(request)}", ANONYMOUS
+
+
+# ======================================== Backends ==================================
+class LocalTokenBuckets:
+    """
+    Per-process buckets. Keys are spread over a fixed set of locks so that
+    concurrent requests rarely wait on each other; idle buckets are swept
+    once the table grows past ``max_buckets``.
+    """
+
+    stripes = 64
+
+    def __init__(self, max_buckets=50_000):
+        self.max_buckets = max_buckets
+        self._buckets = {}
+        self._locks = [threading.Lock() for _ in range(self.stripes)]
+        self._sweep_lock = threading.Lock()
+
+    def consume(self, key, capacity, period, now=None):
+        """Takes one token; returns 0 if allowed, else the seconds until a token is free."""
+        now = time.monotonic() if now is None else now
+        refill = capacity / period
+        with self._locks[hash(key) % self.stripes]:
+            tokens, last, _ = self._buckets.get(key, (capacity, now, now))
+            tokens = min(capacity, tokens + (now - last) * refill)
+            wait = 0 if tokens >= 1 else (1 - tokens) / refill
+            if not wait:
+                tokens -= 1
+            # the third field is when the bucket will be full again
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / refill)
+        if len(self._buckets) > self.max_buckets:
+            self._sweep(now)
+        return wait
+
+    def _sweep(self, now):
+        if not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            # a bucket that has refilled completely is the same as no bucket
+            for key, (_, _, full_at) in list(self._buckets.items()):
+                if full_at <= now:
+                    self._buckets.pop(key, None)
+        finally:
+            self._sweep_lock.release()
+
+
+class CacheTokenBuckets:
+    """
+    Buckets shared through the default cache, stored as one timestamp per key
+    (the generic cell rate algorithm). The read and write are not atomic, so
+    concurrent requests from the same client may slightly exceed the limit.
+    """
+
+    def consume(self, key, capacity, period, now=None):
+        now = time.time() if now is None else now
+        interval = period / capacity
+        earliest = cache.get(key, now)
+        next_free = max(earliest, now) + interval
+        if next_free - now > period:
+            return next_free - now - period
+        cache.set(key, next_free, math.ceil(next_free - now) + 1)
+        return 0
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                backend_path = getattr(settings, "THROTTLE_BACKEND", "api.throttling.LocalTokenBuckets")
+                _backend = import_string(backend_path)()
+    return _backend
+
+
+def check(view_name, request):
+    """Seconds the client must wait before this request is allowed; 0 if it may proceed."""
+    identity, role = identify(request)
+    scope, rate = get_rate(view_name, role)
+    if rate is None:
+        return 0
+    capacity, period = parse_rate(rate)
+    return get_backend().consume(f"throttle:{scope}:{identity}", capacity, period)
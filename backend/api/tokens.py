@@ -0,0 +1,14 @@
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class RoleRefreshToken(RefreshToken):
+    """
+    Refresh token whose access tokens carry the user's role, so the throttle
+    middleware can pick a limit without loading the user.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token["role"] = user.role or ""
+        return token
@@ -3,7 +3,7 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
-from .views import RegisterView, LoginView, AssignWorkerView, JobPostView, JobListView, JobDeleteView, JobUpdateView, WorkerBidView, JobBidListView, WorkerProfileUpdateView, UnassignWorkerView, WorkerJobListView, PaymentCreateView,  JobPaymentStatusView, CustomerReviewWorkerView, WorkerReviewCustomerView
+from .views import RegisterView, LoginView, AssignWorkerView, JobPostView, JobImportView, JobListView, JobDeleteView, JobUpdateView, WorkerBidView, WorkerBidWithdrawView, JobBidListView, WorkerProfileUpdateView, UnassignWorkerView, WorkerJobListView, PaymentCreateView,  JobPaymentStatusView, CustomerReviewWorkerView, WorkerReviewCustomerView, EventStreamView, JobHistoryListView, JobHistoryDetailView, CustomerDashboardView, RollupReportView, WorkerLeaderboardView, WorkerRankView, BulkAssignView, WorkerEarningsView, WorkerAvailabilityView, WorkerAvailabilityDeleteView, AvailableWorkerSearchView, PriceGuideView
 
 urlpatterns = [
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -13,15 +13,30 @@ urlpatterns = [
     path('jobs/', JobListView.as_view(), name='job-list'),
     path('jobs/<int:pk>/update/', JobUpdateView.as_view(), name='job-update'),
     path('jobs/<int:pk>/delete/', JobDeleteView.as_view(), name='job-delete'),
+    path('jobs/price_guide/', PriceGuideView.as_view(), name='price-guide'),
     path('jobs/create/', JobPostView.as_view(), name='job-create'),
+    path('jobs/import/', JobImportView.as_view(), name='job-import'),
     path('jobs/assign_bid/', AssignWorkerView.as_view(), name='assign-worker'),
+    path('jobs/bulk_assign/', BulkAssignView.as_view(), name='bulk-assign'),
     path('jobs/unassign_worker/', UnassignWorkerView.as_view(), name='unassign-worker'),
     path('worker/bid/', WorkerBidView.as_view(), name='worker-bid'),
+    path('worker/bids/<int:bid_id>/', WorkerBidWithdrawView.as_view(), name='bid-withdraw'),
     path('worker/job_list/', WorkerJobListView.as_view(), name='job-list-worker'),
     path('customer/jobs/bids/', JobBidListView.as_view(), name='job-bid-list'),
+    path('customer/dashboard/', CustomerDashboardView.as_view(), name='customer-dashboard'),
+    path('workers/leaderboard/', WorkerLeaderboardView.as_view(), name='worker-leaderboard'),
+    path('workers/available/', AvailableWorkerSearchView.as_view(), name='available-workers'),
+    path('workers/<int:worker_id>/rank/', WorkerRankView.as_view(), name='worker-rank'),
+    path('worker/availability/', WorkerAvailabilityView.as_view(), name='worker-availability'),
+    path('worker/availability/<int:pk>/', WorkerAvailabilityDeleteView.as_view(), name='worker-availability-delete'),
+    path('worker/earnings/', WorkerEarningsView.as_view(), name='worker-earnings'),
     path('worker/profile/update/', WorkerProfileUpdateView.as_view(), name='worker-profile-update'),
     path('payments/', PaymentCreateView.as_view(), name='payment-create'),
     path('jobs/<int:job_id>/', JobPaymentStatusView.as_view(), name='mark-job-completed'),
     path('jobs/<int:job_id>/review_worker/', CustomerReviewWorkerView.as_view(), name='review-worker'),
     path('jobs/<int:job_id>/review_customer/', WorkerReviewCustomerView.as_view(), name='review-customer'),
+    path('jobs/history/', JobHistoryListView.as_view(), name='job-history'),
+    path('jobs/history/<int:job_id>/', JobHistoryDetailView.as_view(), name='job-history-detail'),
+    path('reports/rollups/', RollupReportView.as_view(), name='rollup-report'),
+    path('events/stream/', EventStreamView.as_view(), name='event-stream'),
 ]
\ No newline at end of file
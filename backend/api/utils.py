@@ -1,15 +1,61 @@
 from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Payment, WorkerWallet
+from . import dashboard, earnings, events, feed, leaderboard
+
+
+class PaymentError(Exception):
+    pass
+
 
 def release_funds(payment):
-    if payment.status != 'pending':
-        raise Exception("Payment already released or invalid.")
+    """
+    Completes a pending payment: credits the assigned worker's wallet and
+    marks the job completed. Every payment is completed through here, so
+    ``manage.py reconcile_payments`` can check the three agree.
+    """
+    with transaction.atomic():
+        payment = Payment.objects.select_for_update().select_related("job__assigned_worker").get(id=payment.id)
+        if payment.status != 'pending':
+            raise PaymentError("Payment already released or invalid.")
+        job = payment.job
+        if job.deleted_at:
+            raise PaymentError("This job has been deleted.")
+        if not job.assigned_worker:
+            raise PaymentError("No worker is assigned to this job.")
+
+        # the wallet lock also keeps reconcile_payments from repairing it mid-update
+        wallet, _ = WorkerWallet.objects.select_for_update().get_or_create(worker=job.assigned_worker)
+        WorkerWallet.objects.filter(id=wallet.id).update(balance=F("balance") + payment.amount)
 
-    worker_wallet = WorkerWallet.objects.get(worker=payment.job.assigned_worker)
-    worker_wallet.balance += payment.amount
-    worker_wallet.save()
+        payment.status = 'completed'
+        payment.completed_at = timezone.now()
+        payment.save()
+        earnings.payment_completed(job.assigned_worker_id, payment.amount, payment.completed_at)
+        newly_completed = job.status != 'completed'
+        job.status = 'completed'
+        job.save()
+        if newly_completed:
+            leaderboard.job_completed(job.assigned_worker)
+        feed.sync_job(job)
 
-    payment.status = 'completed'
-    payment.save()
+    dashboard.invalidate(job.customer_id)
+    publish_payment_completed(payment)
+    return payment
+
+def publish_payment_completed(payment):
+    job = payment.job
+    data = {
+        "job_id": job.id,
+        "payment_id": payment.id,
+        "amount": payment.amount,
+        "method": payment.method,
+    }
+    events.publish_event(job.customer_id, events.PAYMENT_COMPLETED, data)
+    if job.assigned_worker:
+        events.publish_event(job.assigned_worker.user_id, events.PAYMENT_COMPLETED, data)
 
 def send_payment_notification(customer_email, worker_email, job_title, amount):
     try:
@@ -31,4 +77,16 @@ def send_payment_notification(customer_email, worker_email, job_title, amount):
             fail_silently=False,
         )
     except Exception as e:
-        print(f"Failed to send payment notification: {e}")
\ No newline at end of file
+        print(f"Failed to send payment notification: {e}")
+
+def send_bid_notification(worker_email, job_title):
+    try:
+        send_mail(
+            subject="Bid Selected",
+            message=f"Your bid for the job '{job_title}' has been selected.",
+            from_email="noreply@yourdomain.com",
+            recipient_list=[worker_email],
+            fail_silently=False,
+        )
+    except Exception as e:
+        print(f"Failed to send email notification: {e}")
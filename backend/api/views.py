@@ -1,29 +1,35 @@
+from datetime import date, timedelta
+
+from asgiref.sync import sync_to_async
 from django.contrib.auth import authenticate
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
 from rest_framework import generics, permissions, serializers
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
 from rest_framework import status
-from django.core.mail import send_mail
 from django.shortcuts import get_object_or_404
-from django.core.exceptions import PermissionDenied
-from .models import User, Payment, Job, Worker, Review, Bid
-from .serializers import RegisterSerializer, JobSerializer, PaymentSerializer
+from django.core.exceptions import PermissionDenied, ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import User, Payment, Job, Worker, Review, Bid, OpenJobFeed, WorkerAvailability, WorkerRatingStats
+from .serializers import RegisterSerializer, JobSerializer, BulkAssignSerializer, PaymentSerializer, ArchivedJobSerializer, ArchivedJobDetailSerializer, OpenJobFeedSerializer, WorkerAvailabilitySerializer
+from .archive import job_history
+from .expiry import has_expired, not_expired
 from .utils import release_funds, send_payment_notification
-
-def send_bid_notification(worker_email, job_title):
-    try:
-        send_mail(
-            subject="Bid Selected",
-            message=f"Your bid for the job '{job_title}' has been selected.",
-            from_email="noreply@yourdomain.com",
-            recipient_list=[worker_email],
-            fail_silently=False,
-        )
-    except Exception as e:
-        print(f"Failed to send email notification: {e}")
+from .images import rejected_upload_error, schedule_thumbnails, thumbnail_url, thumbnail_urls, validate_profile_picture
+from . import bidding, dashboard, earnings, events, feed, imports, leaderboard, pricing, purge, rollups, schedule
+from .fieldsets import is_expanded, requested, sparse_context
+from .idempotency import idempotent
+from .tokens import RoleRefreshToken
+from .routers import ReplicaReadMixin
+from .conditional import ConditionalListMixin, build_validators, not_modified, set_validators, summarize
 
 # ======================================== Registration API ==================================
 class RegisterView(APIView):
@@ -31,10 +37,11 @@ class RegisterView(APIView):
     authentication_classes = [JWTAuthentication]
 
     def post(self, request):
-        serializer = RegisterSerializer(data=request.data)
+        serializer = RegisterSerializer(data=request.data, context={"request": request})
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
+            schedule_thumbnails(user.profile_picture)
+            refresh = RoleRefreshToken.for_user(user)
             if user.is_worker:
                 Worker.objects.create(user=user, skills="", experience=0, location="")
                 return Response(
@@ -47,6 +54,7 @@ class RegisterView(APIView):
                             "name": user.get_username(),
                             "email": user.email,
                             "role": user.role,
+                            "thumbnails": thumbnail_urls(user.profile_picture),
                             "refresh": str(refresh),
                             "access": str(refresh.access_token)
                         }
@@ -61,6 +69,7 @@ class RegisterView(APIView):
                         "name": user.get_username(),
                         "email": user.email,
                         "role": user.role,
+                        "thumbnails": thumbnail_urls(user.profile_picture),
                         "refresh": str(refresh),
                         "access": str(refresh.access_token)
                     }
@@ -79,7 +88,7 @@ class LoginView(APIView):
         user = authenticate(username=username, password=password)
         if user is not None:
             if user.is_active:
-                refresh = RefreshToken.for_user(user)
+                refresh = RoleRefreshToken.for_user(user)
                 return Response(
                     {
                         "success": True,
@@ -139,7 +148,9 @@ class JobPostView(APIView):
 
         serializer = JobSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(customer=request.user)
+            job = serializer.save(customer=request.user)
+            feed.sync_job(job)
+            dashboard.invalidate(request.user.id)
             return Response(
                 {
                     "success": True,
@@ -159,11 +170,76 @@ class JobPostView(APIView):
             status=status.HTTP_400_BAD_REQUEST
         )
 
+# bulk job import from a CSV or JSON file, or a JSON body
+class JobImportView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        if not request.user.is_customer:
+            return Response(
+                {
+                    "success": False,
+                    "statusCode": 403,
+                    "message": "Only customers can import jobs.",
+                },
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        # an oversized file is dropped by the upload handler and would read as a missing one
+        upload = request.FILES.get('file')
+        error = rejected_upload_error(request, 'file')
+        if error:
+            return Response(
+                {
+                    "success": False,
+                    "statusCode": 400,
+                    "message": "Invalid import file.",
+                    "errors": {"file": [error]},
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            rows = imports.parse_file(upload.name, upload.read()) if upload else imports.parse_json(request.data)
+            results = imports.import_jobs(
+                request.user, rows, dry_run=request.query_params.get('dry_run') in ('1', 'true'),
+            )
+        except imports.JobImportError as e:
+            return Response(
+                {
+                    "success": False,
+                    "statusCode": 400,
+                    "message": str(e),
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        summary = imports.summarize(results)
+        status_code = status.HTTP_201_CREATED if summary["created"] else status.HTTP_200_OK
+        return Response(
+            {
+                "success": True,
+                "statusCode": status_code,
+                "message": f"{summary['created']} job(s) imported.",
+                "data": {
+                    "summary": summary,
+                    "rows": results,
+                },
+            },
+            status=status_code
+        )
+
 # to see the list of jobs
-class JobListView(generics.ListAPIView):
+class JobListView(ReplicaReadMixin, ConditionalListMixin, generics.ListAPIView):
     serializer_class = JobSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), **sparse_context(self.request)}
+
+    def get_validator_parts(self):
+        return [summarize(self.get_queryset(), ("updated_at", "assigned_worker__updated_at"))]
+
     def get_queryset(self):
         if not self.request.user.is_customer:
             return Job.objects.none()
@@ -186,22 +262,35 @@ class JobListView(generics.ListAPIView):
         if max_budget:
             queryset = queryset.filter(budget__lte=max_budget)
 
-        return queryset
+        return JobSerializer.prune(queryset, **sparse_context(self.request))
 
 # worker can see job list
-class WorkerJobListView(generics.ListAPIView):
-    serializer_class = JobSerializer
+# served from the OpenJobFeed projection: one ordered scan, no joins
+class WorkerJobListView(ReplicaReadMixin, ConditionalListMixin, generics.ListAPIView):
+    serializer_class = OpenJobFeedSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ORDERINGS = {
+        "bid_count": ("bid_count", "job_id"),
+        "-bid_count": ("-bid_count", "-job_id"),
+        "lowest_bid": ("lowest_bid", "job_id"),
+        "-lowest_bid": ("-lowest_bid", "-job_id"),
+    }
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), **sparse_context(self.request)}
 
     def get_queryset(self):
         if not self.request.user.is_worker:
-            return Job.objects.none()
+            return OpenJobFeed.objects.none()
 
-        queryset = Job.objects.filter(status="open")
+        # expired jobs drop out of the feed even before expire_jobs closes them
+        queryset = not_expired(OpenJobFeed.objects.order_by("job_id"))
 
         location = self.request.query_params.get('location', None)
         min_budget = self.request.query_params.get('min_budget', None)
         max_budget = self.request.query_params.get('max_budget', None)
+        max_bids = self.request.query_params.get('max_bids', None)
+        ordering = self.request.query_params.get('ordering', None)
 
         if location:
             queryset = queryset.filter(location__icontains=location)
@@ -209,8 +298,13 @@ class WorkerJobListView(generics.ListAPIView):
             queryset = queryset.filter(budget__gte=min_budget)
         if max_budget:
             queryset = queryset.filter(budget__lte=max_budget)
+        if max_bids and max_bids.isdigit():
+            queryset = queryset.filter(bid_count__lte=int(max_bids))
+        # served by the (bid_count, job) and (lowest_bid, job) indexes on the feed
+        if ordering in self.ORDERINGS:
+            queryset = queryset.order_by(*self.ORDERINGS[ordering])
 
-        return queryset
+        return OpenJobFeedSerializer.prune(queryset, **sparse_context(self.request))
 
 # update job informations
 class JobUpdateView(APIView):
@@ -228,28 +322,49 @@ class JobUpdateView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        job = get_object_or_404(Job, pk=pk, customer=request.user)
-        serializer = JobSerializer(job, data=request.data, partial=True)
-        if serializer.is_valid():
-            serializer.save()
+        with transaction.atomic():
+            # the job, then its worker, locked in assign_bid's order: no assignment or other update can book
+            # the worker between the conflict check and the save
+            job = get_object_or_404(Job.objects.select_for_update(), pk=pk, customer=request.user)
+            serializer = JobSerializer(job, data=request.data, partial=True)
+            if serializer.is_valid():
+                starts_at = serializer.validated_data.get('starts_at', job.starts_at)
+                ends_at = serializer.validated_data.get('ends_at', job.ends_at)
+                if job.assigned_worker_id and starts_at and ends_at:
+                    Worker.objects.select_for_update().only("id").get(id=job.assigned_worker_id)
+                    if schedule.conflicts(job.assigned_worker_id, starts_at, ends_at, exclude_job_id=job.id).exists():
+                        return Response(
+                            {
+                                "success": False,
+                                "statusCode": 409,
+                                "message": "The assigned worker is already booked during the new time window.",
+                            },
+                            status=status.HTTP_409_CONFLICT,
+                        )
+                had_window = bool(job.starts_at and job.ends_at)
+                job = serializer.save()
+                if had_window or (job.starts_at and job.ends_at):
+                    schedule.sync_job(job)
+                feed.sync_job(job)
+                dashboard.invalidate(request.user.id)
+                return Response(
+                    {
+                        "success": True,
+                        "statusCode": 200,
+                        "message": "Job successfully updated.",
+                        "data": serializer.data,
+                    },
+                    status=status.HTTP_200_OK
+                )
             return Response(
                 {
-                    "success": True,
-                    "statusCode": 200,
-                    "message": "Job successfully updated.",
-                    "data": serializer.data,
+                    "success": False,
+                    "statusCode": 400,
+                    "message": "Invalid job data.",
+                    "errors": serializer.errors,
                 },
-                status=status.HTTP_200_OK
+                status=status.HTTP_400_BAD_REQUEST
             )
-        return Response(
-            {
-                "success": False,
-                "statusCode": 400,
-                "message": "Invalid job data.",
-                "errors": serializer.errors,
-            },
-            status=status.HTTP_400_BAD_REQUEST
-        )
 
 # delete a job
 class JobDeleteView(generics.DestroyAPIView):
@@ -267,7 +382,17 @@ class JobDeleteView(generics.DestroyAPIView):
             )
 
         job = get_object_or_404(Job, pk=pk, customer=request.user)
-        job.delete()
+        try:
+            purge.soft_delete(job)
+        except purge.DeleteError as e:
+            return Response(
+                {
+                    "success": False,
+                    "statusCode": 400,
+                    "message": str(e),
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         return Response(
             {
                 "success": True,
@@ -282,6 +407,7 @@ class WorkerBidView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     # post request to the sever for worker to bid
+    @idempotent
     def post(self, request):
         job_id = request.data.get('job_id')
         bid_amount = request.data.get('bid_amount')
@@ -296,7 +422,8 @@ class WorkerBidView(APIView):
 
         job = get_object_or_404(Job, id=job_id)
         # print("worker bid view is accessed.")
-        if job.status != 'open':
+        # an expired job stays open until expire_jobs or auto_award_jobs reaches it
+        if job.status != 'open' or has_expired(job):
             return Response({
                     "success": False,
                     "statusCode": 400,
@@ -328,7 +455,14 @@ class WorkerBidView(APIView):
             )
 
         # response get from the server for successful bidding
-        bid = Bid.objects.create(worker=worker, job=job, bid_amount=bid_amount)
+        bid = bidding.place_bid(worker, job, bid_amount)
+        dashboard.invalidate(job.customer_id)
+        events.publish_event(job.customer_id, events.BID_CREATED, {
+            "job_id": job.id,
+            "bid_id": bid.id,
+            "bid_amount": bid.bid_amount,
+            "worker_id": worker.id,
+        })
 
         return Response(
             {
@@ -345,6 +479,43 @@ class WorkerBidView(APIView):
             },
             status=status.HTTP_201_CREATED)
 
+class WorkerBidWithdrawView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def delete(self, request, bid_id):
+        bid = get_object_or_404(
+            Bid.objects.select_related("job"), id=bid_id, worker__user=request.user, job__deleted_at__isnull=True,
+        )
+        try:
+            job = bidding.withdraw_bid(bid)
+        except bidding.AssignmentError as e:
+            return Response(
+                {
+                    "success": False,
+                    "statusCode": 400,
+                    "message": str(e),
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        dashboard.invalidate(bid.job.customer_id)
+        events.publish_event(bid.job.customer_id, events.BID_WITHDRAWN, {
+            "job_id": job.id,
+            "bid_id": bid_id,
+            "worker_id": bid.worker_id,
+        })
+        return Response(
+            {
+                "success": True,
+                "statusCode": 200,
+                "message": "Bid withdrawn.",
+                "data": {
+                    "bid_id": bid_id,
+                    "job_id": job.id,
+                },
+            },
+            status=status.HTTP_200_OK)
+
 # ============================================ Worker assign API ====================================
 class AssignWorkerView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -364,7 +535,7 @@ class AssignWorkerView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        bid = get_object_or_404(Bid, id=bid_id)
+        bid = get_object_or_404(Bid, id=bid_id, job__deleted_at__isnull=True)
         job = bid.job
 
         # only customers can assign the worker
@@ -378,55 +549,85 @@ class AssignWorkerView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        # if job is assigned to any worker
-        if job.assigned_worker:
+        try:
+            job = bidding.assign_bid(bid.id)
+        except bidding.AssignmentError as e:
             return Response(
                 {
                     "success": False,
                     "statusCode": 400,
-                    "message": "This job has already been assigned.",
+                    "message": str(e),
                 },
                 status=status.HTTP_400_BAD_REQUEST
             )
+        serialized_job = JobSerializer(job)
+
+        return Response(
+            {
+                "success": True,
+                "statusCode": 200,
+                "message": "Job successfully assigned.",
+                "data": serialized_job.data,
+            },
+            status=status.HTTP_200_OK
+        )
+
+class BulkAssignView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
 
-        # if the job is already assigned
-        if job.assigned_worker:
+    # assigns many of the customer's open jobs at once, at most `capacity` per worker
+    def post(self, request):
+        if not request.user.is_customer:
             return Response(
                 {
                     "success": False,
-                    "statusCode": 400,
-                    "message": "This job has already been assigned.",
+                    "statusCode": 403,
+                    "message": "Only customers can assign jobs.",
                 },
-                status=status.HTTP_400_BAD_REQUEST
+                status=status.HTTP_403_FORBIDDEN,
             )
 
-        # if the job is in progress
-        job.assigned_worker = bid.worker
-        job.status = 'in-progress'
-        job.budget = bid.bid_amount
-        job.save()
-
-        # if the bid is selected
-        bid.status = "selected"
-        bid.save()
-        Bid.objects.filter(job=job).exclude(id=bid_id).update(status="ignored")
-        serialized_job = JobSerializer(job)
+        serializer = BulkAssignSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {
+                    "success": False,
+                    "statusCode": 400,
+                    "message": "Invalid bulk assignment request.",
+                    "errors": serializer.errors,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        # an email notification will send to the worker email if his bid is accepted
-        send_bid_notification(bid.worker.user.email, job.title)
+        try:
+            assignments, unassigned = bidding.bulk_assign(request.user, **serializer.validated_data)
+        except bidding.AssignmentError as e:
+            return Response(
+                {
+                    "success": False,
+                    "statusCode": 409,
+                    "message": str(e),
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
 
+        dry_run = serializer.validated_data["dry_run"]
         return Response(
             {
                 "success": True,
                 "statusCode": 200,
-                "message": "Job successfully assigned.",
-                "data": serialized_job.data,
+                "message": "Assignment plan computed." if dry_run else f"{len(assignments)} job(s) assigned.",
+                "data": {
+                    "assignments": assignments,
+                    "unassigned_job_ids": unassigned,
+                    "total_amount": sum(assignment["bid_amount"] for assignment in assignments),
+                },
             },
-            status=status.HTTP_200_OK
+            status=status.HTTP_200_OK,
         )
 
 # ========================================== Bid list view ====================================
-class JobBidListView(APIView):
+class JobBidListView(ReplicaReadMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
@@ -440,29 +641,76 @@ class JobBidListView(APIView):
                 status=status.HTTP_403_FORBIDDEN)
 
         jobs = Job.objects.filter(customer=request.user) # job bid filtering for each customer
-        job_bids = [
-            {
-                "job_id": job.id,
-                "job_title": job.title,
-                "bid_count": job.bids.count(),
-                "bids": [
-                    {
-                        "bid_id": bid.id,
-                        "bid_amount": bid.bid_amount,
-                        "worker": {
-                            "worker_id": bid.worker.id,
-                            "username": bid.worker.user.username,
-                            "skills": bid.worker.skills,
-                            "experience": bid.worker.experience,
-                            "location": bid.worker.location,
-                        },
-                    }
-                    for bid in job.bids.all()
-                ],
-            }
-            for job in jobs
+        etag, last_modified = build_validators(
+            request,
+            summarize(jobs),
+            summarize(
+                Bid.objects.filter(job__customer=request.user, job__deleted_at__isnull=True),
+                ("updated_at", "worker__updated_at"),
+            ),
+        )
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        # ?fields= picks job keys, ?expand= without "worker" collapses each bid's worker to its id;
+        # only the columns and joins behind the requested keys are queried
+        fields, expand = requested(request, "fields"), requested(request, "expand")
+        wanted = [
+            key for key in ("job_id", "job_title", "bid_count", "best_bid_id", "bids")
+            if fields is None or key in fields
         ]
-        return Response(
+        job_columns = {"job_title": "title", "bid_count": "bid_count", "best_bid_id": "best_bid"}
+        jobs = jobs.order_by("id").only("id", *[job_columns[key] for key in wanted if key in job_columns])
+
+        bids_by_job = {}
+        if "bids" in wanted:
+            bids = (
+                Bid.objects.filter(job__customer=request.user, job__deleted_at__isnull=True)
+                .order_by("job_id", F("rank_score").desc(nulls_last=True), "id")
+            )
+            if is_expanded("worker", expand):
+                bids = bids.select_related("worker__user").only(
+                    "id", "job_id", "bid_amount", "rank_score", "worker__skills", "worker__experience",
+                    "worker__location", "worker__profile_picture", "worker__user__username",
+                    "worker__user__profile_picture",
+                )
+            else:
+                bids = bids.only("id", "job_id", "bid_amount", "rank_score", "worker_id")
+            for bid in bids:
+                bids_by_job.setdefault(bid.job_id, []).append(bid)
+
+        def bid_entry(bid):
+            entry = {"bid_id": bid.id, "bid_amount": bid.bid_amount, "rank_score": bid.rank_score}
+            if is_expanded("worker", expand):
+                entry["worker"] = {
+                    "worker_id": bid.worker_id,
+                    "username": bid.worker.user.username,
+                    "skills": bid.worker.skills,
+                    "experience": bid.worker.experience,
+                    "location": bid.worker.location,
+                    "thumbnail": thumbnail_url(bid.worker.profile_picture or bid.worker.user.profile_picture),
+                }
+            else:
+                entry["worker"] = bid.worker_id
+            return entry
+
+        job_bids = []
+        for job in jobs:
+            job_bid_list = bids_by_job.get(job.id, [])
+            entry = {}
+            if "job_id" in wanted:
+                entry["job_id"] = job.id
+            if "job_title" in wanted:
+                entry["job_title"] = job.title
+            if "bid_count" in wanted:
+                entry["bid_count"] = job.bid_count
+            if "best_bid_id" in wanted:
+                entry["best_bid_id"] = job.best_bid_id
+            if "bids" in wanted:
+                entry["bids"] = [bid_entry(bid) for bid in job_bid_list]
+            job_bids.append(entry)
+        response = Response(
             {
                 "success": True,
                 "statusCode": 200,
@@ -470,6 +718,7 @@ class JobBidListView(APIView):
                 "data": job_bids,
             },
             status=status.HTTP_200_OK,)
+        return set_validators(response, etag, last_modified)
 
 # =========================================== Worker Profile update view ======================================
 class WorkerProfileUpdateView(APIView):
@@ -489,13 +738,37 @@ class WorkerProfileUpdateView(APIView):
         worker = get_object_or_404(Worker, user=request.user)
         data = request.data
 
+        # uploads are streamed to disk and size-checked before they reach the view
+        picture = request.FILES.get("profile_picture")
+        error = rejected_upload_error(request, "profile_picture")
+        if picture and not error:
+            try:
+                validate_profile_picture(picture)
+            except DjangoValidationError as e:
+                error = e.messages[0]
+        if error:
+            return Response(
+                {
+                    "success": False,
+                    "statusCode": 400,
+                    "message": "Invalid profile picture.",
+                    "errors": {"profile_picture": [error]},
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
         # worker profile fields that can be updated
         worker.skills = data.get("skills", worker.skills)
         worker.experience = data.get("experience", worker.experience)
         worker.location = data.get("location", worker.location)
         worker.nid = data.get("nid", worker.nid)
-        worker.profile_picture = data.get("profile_picture", worker.profile_picture)
+        if picture:
+            worker.profile_picture = picture
         worker.save()
+        if picture:
+            schedule_thumbnails(worker.profile_picture)
+        feed.worker_profile_changed(worker)
+        leaderboard.worker_profile_changed(worker)
 
         return Response(
             {
@@ -509,6 +782,7 @@ class WorkerProfileUpdateView(APIView):
                     "experience": worker.experience,
                     "location": worker.location,
                     "nid": worker.nid,
+                    "thumbnails": thumbnail_urls(worker.profile_picture),
                 },
             },
             status=status.HTTP_200_OK,
@@ -555,9 +829,7 @@ class UnassignWorkerView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        job.assigned_worker = None
-        job.status = 'open'
-        job.save()
+        bidding.unassign_worker(job)
 
         return Response(
             {
@@ -578,6 +850,7 @@ class PaymentCreateView(APIView):
     serializer_class = PaymentSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    @idempotent
     def post(self, request):
         serializer = PaymentSerializer(data=request.data)
 
@@ -639,6 +912,7 @@ class PaymentCreateView(APIView):
 
             # Save the payment as pending
             payment = serializer.save(status='pending')
+            dashboard.invalidate(job.customer_id)
 
             # send_mail(
             #     subject="Payment Approval Needed",
@@ -675,10 +949,24 @@ class PaymentCreateView(APIView):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-class JobPaymentStatusView(APIView):
+class JobPaymentStatusView(ReplicaReadMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, job_id):
+        # answer revalidation from one row before loading the job and payment objects
+        stamp = Job.objects.filter(id=job_id).values(
+            "customer_id", "assigned_worker__user_id", "updated_at", "assigned_worker__updated_at", "payment__updated_at",
+        ).first()
+        if stamp and request.user.id in (stamp["customer_id"], stamp["assigned_worker__user_id"]):
+            etag, last_modified = build_validators(
+                request, stamp["updated_at"], stamp["assigned_worker__updated_at"], stamp["payment__updated_at"],
+            )
+            response = not_modified(request, etag, last_modified)
+            if response is not None:
+                return response
+        else:
+            etag = last_modified = None
+
         # Get the job
         job = get_object_or_404(Job, id=job_id)
 
@@ -703,7 +991,7 @@ class JobPaymentStatusView(APIView):
                 "created_at": job.payment.created_at,
             }
 
-        return Response(
+        response = Response(
             {
                 "success": True,
                 "statusCode": 200,
@@ -725,6 +1013,9 @@ class JobPaymentStatusView(APIView):
             },
             status=status.HTTP_200_OK,
         )
+        if etag is not None:
+            set_validators(response, etag, last_modified)
+        return response
 
 # ============================================ Review api ======================================
 class CustomerReviewWorkerView(APIView):
@@ -787,6 +1078,7 @@ class CustomerReviewWorkerView(APIView):
             rating=rating,
             comment=comment,
         )
+        leaderboard.review_added(job.assigned_worker, rating)
 
         return Response(
             {
@@ -846,6 +1138,7 @@ class WorkerReviewCustomerView(APIView):
             rating=rating,
             comment=comment,
         )
+        feed.customer_rating_changed(job.customer_id)
 
         return Response(
             {
@@ -854,4 +1147,430 @@ class WorkerReviewCustomerView(APIView):
                 "message": "Review submitted successfully.",
             },
             status=status.HTTP_201_CREATED,
-        )
\ No newline at end of file
+        )
+# ============================================ Customer dashboard ======================================
+class CustomerDashboardView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_customer:
+            return Response(
+                {
+                    "success": False,
+                    "statusCode": 403,
+                    "message": "Only customers can view the dashboard.",
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        return Response(
+            {
+                "success": True,
+                "statusCode": 200,
+                "message": "Dashboard retrieved successfully.",
+                "data": dashboard.get_dashboard(request.user.id),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+# ============================================ Job history ======================================
+# archived (completed or closed) jobs moved out of the live tables by `manage.py archive_jobs`
+class JobHistoryListView(ReplicaReadMixin, generics.ListAPIView):
+    serializer_class = ArchivedJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return job_history(self.request.user)
+
+
+class JobHistoryDetailView(ReplicaReadMixin, APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, job_id):
+        archived_job = get_object_or_404(job_history(request.user), id=job_id)
+        return Response(
+            {
+                "success": True,
+                "statusCode": 200,
+                "message": "Archived job retrieved successfully.",
+                "data": ArchivedJobDetailSerializer(archived_job).data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+# ============================================ Leaderboard ======================================
+def leaderboard_entry(position, stats):
+    return {
+        "rank": position,
+        "worker_id": stats.worker_id,
+        "username": stats.worker.user.username,
+        "location": stats.worker.location,
+        "rating": round(stats.rating_sum / stats.rating_count, 2) if stats.rating_count else None,
+        "rating_count": stats.rating_count,
+        "score": round(stats.score, 3),
+        "completed_jobs": stats.completed_jobs,
+    }
+
+
+class WorkerLeaderboardView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            limit = min(max(int(request.query_params.get("limit", 10)), 1), 100)
+        except ValueError:
+            limit = 10
+        location = request.query_params.get("location")
+
+        return Response(
+            {
+                "success": True,
+                "statusCode": 200,
+                "message": "Leaderboard retrieved successfully.",
+                "data": [
+                    leaderboard_entry(position, stats)
+                    for position, stats in leaderboard.top_workers(limit, location)
+                ],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class WorkerRankView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, worker_id):
+        ranks = leaderboard.rank_of(worker_id)
+        if ranks is None:
+            return Response(
+                {
+                    "success": False,
+                    "statusCode": 404,
+                    "message": "This worker has no reviews or completed jobs yet.",
+                },
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        overall_rank, location_rank = ranks
+        stats = get_object_or_404(WorkerRatingStats.objects.select_related("worker__user"), worker_id=worker_id)
+        data = leaderboard_entry(overall_rank, stats)
+        data["location_rank"] = location_rank
+        return Response(
+            {
+                "success": True,
+                "statusCode": 200,
+                "message": "Worker rank retrieved successfully.",
+                "data": data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+# ============================================ Worker earnings ======================================
+class WorkerEarningsView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        worker = Worker.objects.filter(user=request.user).only("id").first() if request.user.is_worker else None
+        if worker is None:
+            return Response(
+                {
+                    "success": False,
+                    "statusCode": 403,
+                    "message": "Only workers have earnings statements.",
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        try:
+            months = int(request.query_params.get("months", 12))
+        except ValueError:
+            months = 0
+        if not 1 <= months <= earnings.MAX_MONTHS:
+            return Response(
+                {
+                    "success": False,
+                    "statusCode": 400,
+                    "message": f"'months' must be a number from 1 to {earnings.MAX_MONTHS}.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        statement = earnings.statement(worker.id, months)
+        return Response(
+            {
+                "success": True,
+                "statusCode": 200,
+                "message": "Earnings statement retrieved successfully.",
+                "data": {
+                    "total": sum(month["amount"] for month in statement),
+                    "months": statement,
+                },
+            },
+            status=status.HTTP_200_OK,
+        )
+
+# ============================================ Worker availability ======================================
+def _own_worker(request):
+    return Worker.objects.filter(user=request.user).only("id").first() if request.user.is_worker else None
+
+
+def _not_a_worker():
+    return Response(
+        {
+            "success": False,
+            "statusCode": 403,
+            "message": "Only workers can manage availability.",
+        },
+        status=status.HTTP_403_FORBIDDEN,
+    )
+
+
+class WorkerAvailabilityView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        worker = _own_worker(request)
+        if worker is None:
+            return _not_a_worker()
+        upcoming = WorkerAvailability.objects.filter(worker=worker, ends_at__gt=timezone.now()).order_by("starts_at")
+        return Response(
+            {
+                "success": True,
+                "statusCode": 200,
+                "message": "Availability retrieved successfully.",
+                "data": WorkerAvailabilitySerializer(upcoming, many=True).data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    def post(self, request):
+        worker = _own_worker(request)
+        if worker is None:
+            return _not_a_worker()
+        serializer = WorkerAvailabilitySerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {
+                    "success": False,
+                    "statusCode": 400,
+                    "message": "Invalid availability data.",
+                    "errors": serializer.errors,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        starts_at, ends_at = serializer.validated_data["starts_at"], serializer.validated_data["ends_at"]
+        if schedule.overlapping(WorkerAvailability.objects.filter(worker=worker), starts_at, ends_at).exists():
+            return Response(
+                {
+                    "success": False,
+                    "statusCode": 400,
+                    "message": "This interval overlaps availability you already added.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer.save(worker=worker)
+        return Response(
+            {
+                "success": True,
+                "statusCode": 201,
+                "message": "Availability added.",
+                "data": serializer.data,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class WorkerAvailabilityDeleteView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def delete(self, request, pk):
+        worker = _own_worker(request)
+        if worker is None:
+            return _not_a_worker()
+        get_object_or_404(WorkerAvailability, pk=pk, worker=worker).delete()
+        return Response(
+            {
+                "success": True,
+                "statusCode": 200,
+                "message": "Availability removed.",
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class AvailableWorkerSearchView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        starts_at, ends_at = (parse_datetime(request.query_params.get(name, "")) for name in ("start", "end"))
+        starts_at, ends_at = (
+            timezone.make_aware(value) if value and timezone.is_naive(value) else value for value in (starts_at, ends_at)
+        )
+        error = schedule.window_error(starts_at, ends_at)
+        try:
+            limit = min(int(request.query_params.get("limit", 20)), 100)
+        except ValueError:
+            error = error or "'limit' must be a number."
+        if error:
+            return Response(
+                {
+                    "success": False,
+                    "statusCode": 400,
+                    "message": f"'start' and 'end' must be ISO 8601 date-times. {error}",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        workers = schedule.available_workers(starts_at, ends_at, request.query_params.get("location"), limit)
+        return Response(
+            {
+                "success": True,
+                "statusCode": 200,
+                "message": "Available workers retrieved successfully.",
+                "data": [
+                    {
+                        "worker_id": worker.id,
+                        "username": worker.user.username,
+                        "location": worker.location,
+                        "skills": worker.skills,
+                        "experience": worker.experience,
+                        "verified": worker.verified,
+                        "score": round(worker.score, 3) if worker.score is not None else None,
+                    }
+                    for worker in workers
+                ],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+# ============================================ Price guidance ======================================
+class PriceGuideView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        title = request.query_params.get("title", "").strip()
+        location = request.query_params.get("location", "").strip()
+        if not title and not location:
+            return Response(
+                {
+                    "success": False,
+                    "statusCode": 400,
+                    "message": "Give a 'title', a 'location' or both.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(
+            {
+                "success": True,
+                "statusCode": 200,
+                "message": "Price guide retrieved successfully.",
+                "data": {
+                    "keywords": pricing.keywords(title),
+                    **pricing.guide(title, location),
+                },
+            },
+            status=status.HTTP_200_OK,
+        )
+
+# ============================================ Reports ======================================
+# precomputed by `manage.py build_rollups`; nothing here scans the live job or bid tables
+class RollupReportView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        through = rollups.rolled_up_through()
+        try:
+            last_day = date.fromisoformat(request.query_params["to"]) if "to" in request.query_params else through
+            first_day = (
+                date.fromisoformat(request.query_params["from"]) if "from" in request.query_params
+                else last_day - timedelta(days=29) if last_day else None
+            )
+        except ValueError:
+            return Response(
+                {
+                    "success": False,
+                    "statusCode": 400,
+                    "message": "'from' and 'to' must be dates in YYYY-MM-DD format.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        data = {
+            "rolled_up_through": through,
+            "popular_titles": [
+                {"title": total.title, "postings": total.postings} for total in rollups.popular_titles(5)
+            ],
+            "most_hired_workers": [
+                {"worker_id": total.worker_id, "username": total.worker.user.username, "hires": total.hires}
+                for total in rollups.most_hired_workers(5)
+            ],
+            "daily_activity": [],
+            "top_locations": [],
+        }
+        if first_day and last_day:
+            data["daily_activity"] = rollups.daily_activity(first_day, last_day)
+            data["top_locations"] = rollups.top_locations(first_day, last_day)
+
+        return Response(
+            {
+                "success": True,
+                "statusCode": 200,
+                "message": "Report retrieved successfully.",
+                "data": data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+# ============================================ Event stream ======================================
+class EventStreamView(View):
+    """
+    Server-Sent Events feed of bid, assignment and payment updates for the
+    requesting user. Browsers' EventSource cannot send headers, so the access
+    token is also accepted as ``?token=``. Only served under ASGI: a WSGI
+    server would buffer the endless stream and tie up a worker for good.
+    """
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse(
+                {
+                    "success": False,
+                    "statusCode": 503,
+                    "message": "The event stream is only available when the API is served over ASGI.",
+                },
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        user = await sync_to_async(self.authenticate)(request)
+        if user is None:
+            return JsonResponse(
+                {
+                    "success": False,
+                    "statusCode": 401,
+                    "message": "Authentication credentials were not provided or are invalid.",
+                },
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+
+        subscription = events.get_backend().subscribe(user.id)
+        response = StreamingHttpResponse(events.stream_events(subscription), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def authenticate(self, request):
+        authentication = JWTAuthentication()
+        try:
+            raw_token = request.GET.get("token")
+            if raw_token:
+                validated_token = authentication.get_validated_token(raw_token)
+                user = authentication.get_user(validated_token)
+            else:
+                result = authentication.authenticate(request)
+                user = result[0] if result else None
+        except (InvalidToken, AuthenticationFailed):
+            return None
+        if user is None or not user.is_active:
+            return None
+        return user
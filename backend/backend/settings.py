@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -45,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.middleware.ProfilerMiddleware",
+    "api.middleware.QueryLogMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -53,6 +56,8 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
+    "api.middleware.ThrottleMiddleware",
+    "api.middleware.ReadYourWritesMiddleware",
 ]
 
 ROOT_URLCONF = "backend.urls"
@@ -85,6 +90,37 @@ DATABASES = {
     }
 }
 
+# Optional read replica. Views using api.routers.ReplicaReadMixin read from it,
+# except for users who wrote within the last REPLICA_STICKY_SECONDS. The sticky
+# window is tracked in the cache, which must be shared between workers. The
+# replica uses the primary's settings; REPLICA_DB_NAME, REPLICA_DB_HOST,
+# REPLICA_DB_PORT, REPLICA_DB_USER and REPLICA_DB_PASSWORD override them.
+REPLICA_OVERRIDES = {
+    key: os.environ[f"REPLICA_DB_{key}"]
+    for key in ("NAME", "HOST", "PORT", "USER", "PASSWORD")
+    if os.environ.get(f"REPLICA_DB_{key}")
+}
+if REPLICA_OVERRIDES:
+    DATABASES["replica"] = {**DATABASES["default"], **REPLICA_OVERRIDES}
+
+DATABASE_ROUTERS = ["api.routers.PrimaryReplicaRouter"]
+REPLICA_DATABASE_ALIAS = "replica"
+REPLICA_STICKY_SECONDS = 5
+
+
+# Cache. Replica pins, dashboard invalidation and throttle buckets (with
+# api.throttling.CacheTokenBuckets) are shared through it, so with
+# more than one worker process set REDIS_URL (needs the redis package). The
+# default per-process cache is only right for a single process; `manage.py
+# check --deploy` warns about it.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -122,6 +158,20 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+MEDIA_URL = "media/"
+MEDIA_ROOT = BASE_DIR / "media"
+
+# Uploads are always streamed to a temporary file and rejected once they pass
+# MAX_UPLOAD_SIZE, so a large photo never sits in memory.
+FILE_UPLOAD_HANDLERS = ["api.images.LimitedTemporaryFileUploadHandler"]
+MAX_UPLOAD_SIZE = 5 * 1024 * 1024
+PROFILE_PICTURE_MAX_PIXELS = 40_000_000
+
+# Profile picture thumbnails (WebP and JPEG) rendered in a background process pool.
+# Set PROFILE_THUMBNAIL_WORKERS to 0 to render them inline.
+PROFILE_THUMBNAIL_SIZES = {"small": 96, "medium": 320}
+PROFILE_THUMBNAIL_WORKERS = 2
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -139,6 +189,7 @@ REST_FRAMEWORK = {
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=360),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    "TOKEN_OBTAIN_SERIALIZER": "api.serializers.RoleTokenObtainPairSerializer",
 }
 
 AUTH_USER_MODEL = "api.user"
@@ -149,4 +200,100 @@ EMAIL_HOST = 'smtp.gmail.com'  # Replace with your email server
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = 'your_email@example.com'  # Replace with your email address
-EMAIL_HOST_PASSWORD = 'your_email_password'  # Replace with your email password
\ No newline at end of file
+EMAIL_HOST_PASSWORD = 'your_email_password'  # Replace with your email password
+
+# Customer dashboard numbers are cached per user and dropped by the job, bid and
+# payment write paths; the timeout only bounds staleness from edits made elsewhere.
+# A write only drops the copy other worker processes see if the cache is shared
+# (REDIS_URL above).
+DASHBOARD_CACHE_TIMEOUT = 300
+
+# Server-Sent Events stream (/events/stream/). The in-memory backend only reaches
+# subscribers connected to the same process; point this at a shared backend when
+# running several ASGI workers.
+EVENT_STREAM_BACKEND = "api.events.InMemoryEventBackend"
+EVENT_STREAM_KEEPALIVE = 15  # seconds between keepalive comments
+
+# Worker leaderboard: ratings are averaged towards LEADERBOARD_PRIOR_MEAN as if
+# every worker had LEADERBOARD_PRIOR_WEIGHT extra reviews at that rating, so a
+# single 5-star review does not outrank a long record of 4.8s.
+LEADERBOARD_PRIOR_MEAN = 3.5
+LEADERBOARD_PRIOR_WEIGHT = 5
+
+# Bid ranking (api.bidding): each component is scored 0..1 and weighted. Run
+# `manage.py rescore_bids` after changing the weights.
+BID_RANKING_WEIGHTS = {
+    "price": 0.4,  # bid amount relative to the job budget
+    "rating": 0.3,  # leaderboard score
+    "experience": 0.1,
+    "verified": 0.1,
+    "location": 0.1,  # worker location matches the job location
+}
+
+# Worker availability and bookings (api.schedule). No interval may be longer than
+# SCHEDULE_MAX_SPAN_DAYS, which bounds the index range an overlap query scans.
+SCHEDULE_MAX_SPAN_DAYS = 31
+
+# Price guidance (api.pricing): an answer falls back to a broader bucket of jobs
+# until it is based on at least PRICE_GUIDE_MIN_SAMPLES accepted bids.
+PRICE_GUIDE_MIN_SAMPLES = 5
+
+# Bulk job import (POST /jobs/import/ and `manage.py import_jobs`): rows per file.
+JOB_IMPORT_MAX_ROWS = 5000
+
+# Idempotency-Key support for bid and payment creation (api.idempotency).
+# Keys and stored responses live in the IdempotencyKey table, shared by every
+# worker process, for IDEMPOTENCY_KEY_TTL seconds (run `manage.py
+# purge_idempotency_keys` daily to delete older ones); a duplicate that arrives
+# mid-request waits up to IDEMPOTENCY_WAIT_SECONDS, and a claim left by a
+# request that died is taken over after IDEMPOTENCY_LOCK_SECONDS.
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+IDEMPOTENCY_LOCK_SECONDS = 30
+IDEMPOTENCY_WAIT_SECONDS = 10
+
+# Request throttling (api.middleware.ThrottleMiddleware). Limits are token
+# buckets, "<requests>/<s|min|hour|day>", looked up by URL name and then under
+# "*"; within each, by role ("anonymous", "worker", "customer", "user" for
+# tokens without a role) and then "*". None means unlimited. Per-view limits
+# guard sign-in, sign-up, job import and event stream connections; everything
+# else gets the generous "*" defaults so existing clients are not cut off.
+# Clients without a token are counted by address: behind a reverse proxy set
+# THROTTLE_NUM_PROXIES to the number of proxies in front of the app (1 for the
+# nginx setup in docs/DEPLOYMENT_GUIDE.md), or every client shares the proxy's.
+# LocalTokenBuckets counts per process, so each limit is multiplied by the
+# number of worker processes; with REDIS_URL set, CacheTokenBuckets counts in
+# the shared cache instead.
+THROTTLE_BACKEND = (
+    "api.throttling.CacheTokenBuckets" if os.environ.get("REDIS_URL") else "api.throttling.LocalTokenBuckets"
+)
+THROTTLE_NUM_PROXIES = int(os.environ.get("THROTTLE_NUM_PROXIES", 0))
+THROTTLE_RATES = {
+    "login": {"*": "5/min"},
+    "token_obtain_pair": {"*": "5/min"},
+    "register": {"*": "10/hour"},
+    "job-import": {"*": "10/hour"},
+    "event-stream": {"*": "10/min"},
+    "*": {"anonymous": "60/min", "*": "300/min"},
+}
+
+# Request profiling (api.middleware.ProfilerMiddleware). A PROFILE_SAMPLE_RATE
+# fraction of requests, and any request whose X-Profile header carries a token
+# from `manage.py profiles --token`, runs under cProfile. Profiles are saved to
+# PROFILE_DIR as .pstats files (snakeviz, flameprof and gprof2dot read them);
+# only the newest PROFILE_MAX_FILES are kept.
+PROFILE_SAMPLE_RATE = 0.0
+PROFILE_DIR = BASE_DIR / "profiles"
+PROFILE_MAX_FILES = 200
+PROFILE_TOKEN_MAX_AGE = 60 * 60
+
+# Query statistics (api.middleware.QueryLogMiddleware). Each process adds up query
+# counts and time per SQL fingerprint and view, and writes them to the
+# QueryFingerprint table every QUERY_LOG_FLUSH_INTERVAL seconds (see
+# `manage.py top_queries`). Queries slower than SLOW_QUERY_MS are logged to the
+# "api.querylog" logger with their EXPLAIN plan on SQLite and PostgreSQL, at most
+# once per statement every SLOW_QUERY_EXPLAIN_INTERVAL seconds. Off unless the
+# QUERY_LOG_ENABLED environment variable is set to 1 or true.
+QUERY_LOG_ENABLED = os.environ.get("QUERY_LOG_ENABLED", "").lower() in ("1", "true")
+QUERY_LOG_FLUSH_INTERVAL = 60
+SLOW_QUERY_MS = 200
+SLOW_QUERY_EXPLAIN_INTERVAL = 300
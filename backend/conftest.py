@@ -0,0 +1,23 @@
+import json
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--perf-json",
+        default=os.environ.get("PERF_RESULTS_FILE", "perf-results.json"),
+        help="Where the endpoint performance suite writes its measurements.",
+    )
+
+
+@pytest.fixture(scope="session")
+def perf_results(request):
+    """Collects one record per route and data size; written out as JSON at the end of the session."""
+    results = []
+    yield results
+    if results:
+        with open(request.config.getoption("--perf-json"), "w") as output:
+            json.dump({"generated_at": datetime.now(timezone.utc).isoformat(), "results": results}, output, indent=2, default=str)